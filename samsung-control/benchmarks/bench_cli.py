@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""Wall-clock cost of one samsung-control CLI call.
+
+Usage: bench_cli.py [-n RUNS] [ARGS ...]
+
+Runs "samsung-control.py get" (or the given arguments) RUNS times and
+reports the median and worst time next to a bare interpreter start. Fails
+if the call imports any GUI module.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "samsung-control.py"
+)
+GUI_MODULES = ("gi", "cairo", "samsung_control.gui")
+
+
+def measure(command, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times), max(times)
+
+
+def gui_imports(args):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", SCRIPT] + args,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    modules = [line.rsplit("|", 1)[-1].strip() for line in result.stderr.splitlines()]
+    return [m for m in modules if m.split(".")[0] in GUI_MODULES or m in GUI_MODULES]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=50)
+    parser.add_argument("args", nargs="*")
+    args = parser.parse_args()
+    cli_args = args.args or ["get"]
+
+    baseline, baseline_worst = measure([sys.executable, "-c", "pass"], args.runs)
+    cli, cli_worst = measure([sys.executable, SCRIPT] + cli_args, args.runs)
+
+    print(f"{'':24}{'median':>10}{'worst':>10}")
+    print(
+        f"{'python -c pass':24}{baseline * 1e3:>8.1f}ms{baseline_worst * 1e3:>8.1f}ms"
+    )
+    label = "samsung-control " + cli_args[0]
+    print(f"{label:24}{cli * 1e3:>8.1f}ms{cli_worst * 1e3:>8.1f}ms")
+    print(f"CLI overhead: {(cli - baseline) * 1e3:.1f}ms")
+
+    imported = gui_imports(cli_args)
+    if imported:
+        print(f"GUI modules imported: {', '.join(imported)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
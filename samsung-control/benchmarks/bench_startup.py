@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Time from exec to the first frame and to fully populated controls.
+
+Usage: bench_startup.py [-n RUNS] [--save FILE] [--compare FILE]
+                        [--max-first-frame MS] [--max-populated MS]
+                        [-- GUI ARGS ...]
+
+Starts samsung-control.py --startup-trace RUNS times and reports the median
+of both times. Fails if either exceeds its limit (by default 1 s to the
+first frame and 2 s to populated), or if --compare is given and either is
+more than --tolerance slower than the saved baseline.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "samsung-control.py"
+)
+EVENTS = ("first-frame", "populated")
+# Default limits in ms, so a plain run guards the startup time too
+MAX_FIRST_FRAME = 1000
+MAX_POPULATED = 2000
+
+
+def run_once(gui_args, timeout):
+    # The GUI prints CLOCK_MONOTONIC stamps, the same clock as ours
+    start = time.monotonic()
+    result = subprocess.run(
+        [sys.executable, SCRIPT, "--startup-trace"] + gui_args,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        timeout=timeout,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        fields = line.split()
+        if len(fields) == 3 and fields[0] == "startup" and fields[1] in EVENTS:
+            times[fields[1]] = float(fields[2]) - start
+    missing = [event for event in EVENTS if event not in times]
+    if missing:
+        raise RuntimeError(
+            f"No {', '.join(missing)} trace (exit {result.returncode}):\n"
+            + result.stderr
+        )
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--runs", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30, metavar="S")
+    parser.add_argument(
+        "--max-first-frame", type=float, default=MAX_FIRST_FRAME, metavar="MS"
+    )
+    parser.add_argument(
+        "--max-populated", type=float, default=MAX_POPULATED, metavar="MS"
+    )
+    parser.add_argument("--save", metavar="FILE", help="write the medians as JSON")
+    parser.add_argument("--compare", metavar="FILE", help="baseline from --save")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown against --compare, as a fraction (default 0.2)",
+    )
+    parser.add_argument("gui_args", nargs="*")
+    args = parser.parse_args()
+
+    samples = {event: [] for event in EVENTS}
+    try:
+        for _ in range(args.runs):
+            for event, seconds in run_once(args.gui_args, args.timeout).items():
+                samples[event].append(seconds * 1e3)
+    except (RuntimeError, subprocess.TimeoutExpired) as e:
+        print(f"Startup failed: {e}", file=sys.stderr)
+        return 1
+
+    medians = {event: statistics.median(samples[event]) for event in EVENTS}
+    print(f"{'':16}{'median':>10}{'worst':>10}")
+    for event in EVENTS:
+        print(f"{event:16}{medians[event]:>8.1f}ms{max(samples[event]):>8.1f}ms")
+
+    failures = []
+    limits = {"first-frame": args.max_first_frame, "populated": args.max_populated}
+    for event, limit in limits.items():
+        if medians[event] > limit:
+            failures.append(f"{event} {medians[event]:.1f}ms > {limit:.1f}ms")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for event in EVENTS:
+            allowed = baseline[event] * (1 + args.tolerance)
+            if medians[event] > allowed:
+                failures.append(
+                    f"{event} {medians[event]:.1f}ms, baseline {baseline[event]:.1f}ms"
+                )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(medians, f, indent=2)
+
+    for failure in failures:
+        print(f"Regression: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
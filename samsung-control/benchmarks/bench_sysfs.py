@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Per-tick cost of open/read/close versus the persistent pread() reader.
+
+Usage: bench_sysfs.py [-n ITERATIONS] [PATH ...]
+
+Without paths, the attributes sampled by the dashboard on every tick are
+used (whichever of them exist on this machine) plus /proc/stat.
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from samsung_control.sysfs import SysfsReader  # noqa: E402
+
+DEFAULT_PATHS = [
+    "/proc/stat",
+    "/sys/class/power_supply/BAT1/capacity",
+    "/sys/class/power_supply/BAT1/status",
+    "/sys/class/leds/samsung-galaxybook::kbd_backlight/brightness",
+    "/sys/firmware/acpi/platform_profile",
+] + sorted(glob.glob("/sys/class/hwmon/hwmon*/fan1_input"))[:1]
+
+
+def read_with_open(paths):
+    for path in paths:
+        with open(path, "r") as f:
+            f.read().strip()
+
+
+def read_with_reader(reader, paths):
+    for path in paths:
+        reader.read(path)
+
+
+def measure(func, iterations):
+    func()  # warm up (and open descriptors for the reader)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[1]
+    tracemalloc.reset_peak()
+    func()
+    peak = tracemalloc.get_traced_memory()[1] - before
+    tracemalloc.stop()
+    return elapsed / iterations, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--iterations", type=int, default=20000)
+    parser.add_argument("paths", nargs="*")
+    args = parser.parse_args()
+
+    paths = [p for p in (args.paths or DEFAULT_PATHS) if os.access(p, os.R_OK)]
+    if not paths:
+        print("No readable attributes", file=sys.stderr)
+        return 1
+
+    reader = SysfsReader()
+    baseline, baseline_peak = measure(lambda: read_with_open(paths), args.iterations)
+    cached, cached_peak = measure(
+        lambda: read_with_reader(reader, paths), args.iterations
+    )
+    reader.close()
+
+    print(f"Attributes per tick: {len(paths)}")
+    for path in paths:
+        print(f"  {path}")
+    print(f"{'':20}{'per tick':>12}{'peak alloc':>14}")
+    print(f"{'open/read/close':20}{baseline * 1e6:>10.1f}us{baseline_peak:>12} B")
+    print(f"{'persistent pread':20}{cached * 1e6:>10.1f}us{cached_peak:>12} B")
+    print(f"Speed-up: {baseline / cached:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
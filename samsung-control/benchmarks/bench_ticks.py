@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Per-tick cost of every sampler and dashboard data path on a fake Galaxy Book.
+
+Usage: bench_ticks.py [-n TICKS] [--cpus N] [--acpi-delay MS] [NAME ...]
+
+Builds a fake sysfs tree (samsung_control.fakehw) in a temporary directory
+and runs each sampler, and the GTK-free halves of the dashboard updates,
+once per tick with the tree's values moving in between. Reports wall and
+CPU time, read/write syscalls (from /proc/self/io) and the peak of
+allocated memory per tick. --acpi-delay slows down the attributes that are
+ACPI calls on the real hardware.
+"""
+
+import argparse
+import functools
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from samsung_control.automation import Automation, parse_rule  # noqa: E402
+from samsung_control.automation import HYSTERESIS  # noqa: E402
+from samsung_control.fakehw import ACPI_PATHS, FakeGalaxyBook  # noqa: E402
+from samsung_control.hardware import CONTROL_ATTRS  # noqa: E402
+from samsung_control.history import MinMaxDecimator, RingBuffer  # noqa: E402
+from samsung_control.history import to_points  # noqa: E402
+from samsung_control.sysfs import SysfsAttribute  # noqa: E402
+from samsung_control.telemetry import TelemetryStore  # noqa: E402
+
+
+class SyscallCounter:
+    """Read and write syscalls of this process so far."""
+
+    def __init__(self):
+        self.io = SysfsAttribute("/proc/self/io")
+        # Reading the counters is a syscall too, measure() subtracts it
+        first = self.count()
+        self.cost = self.count() - first
+
+    def count(self):
+        counts = {}
+        for line in self.io.read_bytes().splitlines():
+            name, value = line.split(b":")
+            counts[name] = int(value)
+        return counts[b"syscr"] + counts[b"syscw"]
+
+
+def samplers(hw):
+    cases = {
+        "sensors": hw.read_sensors,
+        "cpu": hw.read_cpu_usage,
+        "thermal": hw.read_thermal,
+        "battery": hw.read_battery_info,
+        "ac": hw.read_ac_online,
+        "kbd_backlight": hw.read_kbd_backlight,
+        "platform_profile": hw.read_platform_profile,
+    }
+    for attr in CONTROL_ATTRS:
+        cases[attr] = functools.partial(hw.read_value, attr)
+    return cases
+
+
+def dashboard(hw, state_dir):
+    # What the GUI does with each snapshot, minus the GTK calls
+    ring = RingBuffer()
+    decimator = MinMaxDecimator()
+    clock = [0.0]
+
+    def graph():
+        clock[0] += 2
+        ring.append(clock[0], hw.read_sensors()[0][1])
+        decimator.update(ring, clock[0] - 3600, 3600 / 600)
+        times, values = decimator.series()
+        to_points(times, values, clock[0] - 3600, 600 / 3600, 200, 200 / 6000)
+
+    store = TelemetryStore(os.path.join(state_dir, "telemetry.rrd"))
+
+    def telemetry():
+        clock[0] += 1
+        for metric in ("fan", "temp", "cpu", "battery", "profile"):
+            store.add(metric, 50.0, now=clock[0] + 1e9)
+
+    hysteresis = dict(HYSTERESIS)
+    rules = [
+        parse_rule("battery and cpu < 20 for 60s -> low-power", hysteresis),
+        parse_rule("ac and temp > 85 -> balanced", hysteresis),
+        parse_rule("ac -> performance", hysteresis),
+    ]
+    automation = Automation(rules, lambda profile: True)
+    values = {}
+
+    def rules_tick():
+        clock[0] += 2
+        values.update(
+            cpu=hw.read_cpu_usage(),
+            thermal=hw.read_thermal(),
+            ac=hw.read_ac_online(),
+            platform_profile="balanced",
+        )
+        automation.update(values, clock[0])
+
+    return {
+        "ui: graph": graph,
+        "ui: telemetry": telemetry,
+        "ui: automation": rules_tick,
+    }, store
+
+
+def measure(func, fake, ticks, syscalls):
+    for _ in range(3):  # Warm up, opens the descriptors
+        fake.advance(2)
+        func()
+
+    wall = cpu = calls = 0
+    for _ in range(ticks):
+        fake.advance(2)
+        before_calls = syscalls.count()
+        before_cpu = time.thread_time()
+        before_wall = time.perf_counter()
+        func()
+        wall += time.perf_counter() - before_wall
+        cpu += time.thread_time() - before_cpu
+        calls += syscalls.count() - before_calls - syscalls.cost
+
+    # Separate pass, tracing slows everything down
+    peak = 0
+    tracemalloc.start()
+    for _ in range(min(ticks, 100)):
+        fake.advance(2)
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return wall / ticks, cpu / ticks, calls / ticks, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-n", "--ticks", type=int, default=1000)
+    parser.add_argument("--cpus", type=int, default=16)
+    parser.add_argument("--acpi-delay", type=float, default=0, metavar="MS")
+    parser.add_argument("names", nargs="*", help="only run these cases")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        delays = {path: args.acpi_delay / 1000 for path in ACPI_PATHS}
+        fake = FakeGalaxyBook(root, args.cpus, delays if args.acpi_delay else None)
+        fake.create()
+        hw = fake.galaxybook()
+        ui_cases, store = dashboard(hw, root)
+        cases = {**samplers(hw), **ui_cases}
+        syscalls = SyscallCounter()
+
+        print(f"{args.ticks} ticks, {args.cpus} CPUs")
+        print(f"{'':30}{'wall':>10}{'cpu':>10}{'syscalls':>10}{'peak alloc':>12}")
+        for name, func in cases.items():
+            if args.names and name not in args.names:
+                continue
+            wall, cpu, calls, peak = measure(func, fake, args.ticks, syscalls)
+            print(
+                f"{name:30}{wall * 1e6:>8.1f}us{cpu * 1e6:>8.1f}us"
+                f"{calls:>10.1f}{peak:>10} B"
+            )
+        store.close()
+        hw.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,55 +7,52 @@ if [ "$EUID" -ne 0 ]; then
 fi
 
 # Install dependencies
-pacman -S --needed python-gobject gtk4 libadwaita python-cairo polkit dbus xorg-xhost
-
-# Create wrapper script
-cat > /usr/local/bin/samsung-control-wrapper << 'EOL'
-#!/bin/bash
-
-# Function to get current desktop session user
-get_session_user() {
-    who | grep -E '(:0|tty7)' | head -1 | cut -d' ' -f1
-}
-
-if [ "$EUID" -eq 0 ]; then
-    # Get the user who is running the desktop session
-    DESKTOP_USER=$(get_session_user)
-    
-    # Get user's home directory
-    USER_HOME=$(getent passwd "$DESKTOP_USER" | cut -d: -f6)
-    
-    # Get DISPLAY if not set
-    if [ -z "$DISPLAY" ]; then
-        export DISPLAY=:0
-    fi
-    
-    # Get XAUTHORITY if not set
-    if [ -z "$XAUTHORITY" ]; then
-        export XAUTHORITY="$USER_HOME/.Xauthority"
-    fi
-    
-    # Get dbus session
-    DBUS_SESSION_BUS_ADDRESS=$(grep -z DBUS_SESSION_BUS_ADDRESS /proc/$(pgrep -u "$DESKTOP_USER" gnome-session|head -n1)/environ 2>/dev/null | tr '\0' '\n' | cut -d= -f2-)
-    if [ -n "$DBUS_SESSION_BUS_ADDRESS" ]; then
-        export DBUS_SESSION_BUS_ADDRESS
-    fi
-    
-    # Allow root to connect to X server
-    xhost +SI:localuser:root >/dev/null 2>&1
-    
-    # Run the application with proper environment
-    exec /usr/local/bin/samsung-control "$@"
-else
-    # If not root, use pkexec
-    exec pkexec samsung-control-wrapper "$@"
-fi
+pacman -S --needed python-gobject gtk4 libadwaita python-cairo polkit dbus
+
+# The GUI used to run as root through this wrapper
+rm -f /usr/local/bin/samsung-control-wrapper
+
+# Copy program and its support package
+install -Dm755 samsung-control.py /usr/local/lib/samsung-control/samsung-control.py
+install -Dm644 -t /usr/local/lib/samsung-control/samsung_control samsung_control/*.py
+install -Dm755 samsung-controld.py /usr/local/lib/samsung-control/samsung-controld.py
+ln -sf /usr/local/lib/samsung-control/samsung-control.py /usr/local/bin/samsung-control
+ln -sf /usr/local/lib/samsung-control/samsung-controld.py /usr/local/bin/samsung-controld
+
+# The daemon owns all hardware access, the GUI talks to it over the system
+# bus and starts it on demand through D-Bus activation
+cat > /etc/systemd/system/samsung-controld.service << EOL
+[Unit]
+Description=Samsung Galaxy Book hardware daemon
+
+[Service]
+Type=dbus
+BusName=org.samsung.control.Daemon
+ExecStart=/usr/local/bin/samsung-controld
 EOL
 
-chmod +x /usr/local/bin/samsung-control-wrapper
+cat > /usr/share/dbus-1/system-services/org.samsung.control.Daemon.service << EOL
+[D-BUS Service]
+Name=org.samsung.control.Daemon
+Exec=/bin/false
+User=root
+SystemdService=samsung-controld.service
+EOL
 
-# Copy program
-install -Dm755 samsung-control.py /usr/local/bin/samsung-control
+cat > /usr/share/dbus-1/system.d/org.samsung.control.Daemon.conf << EOL
+<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE busconfig PUBLIC
+ "-//freedesktop//DTD D-BUS Bus Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/dbus/1.0/busconfig.dtd">
+<busconfig>
+  <policy user="root">
+    <allow own="org.samsung.control.Daemon"/>
+  </policy>
+  <policy context="default">
+    <allow send_destination="org.samsung.control.Daemon"/>
+  </policy>
+</busconfig>
+EOL
 
 # Install icons
 install -Dm644 icons/samsung-control.svg /usr/share/icons/hicolor/scalable/apps/samsung-control.svg
@@ -65,7 +62,7 @@ cat > /usr/share/applications/org.samsung.control.desktop << EOL
 [Desktop Entry]
 Name=Samsung Galaxy Book Control
 Comment=Control Samsung Galaxy Book features
-Exec=samsung-control-wrapper
+Exec=samsung-control
 Icon=samsung-control
 Terminal=false
 Type=Application
@@ -80,16 +77,23 @@ cat > /usr/share/polkit-1/actions/org.samsung.control.policy << EOL
  "-//freedesktop//DTD PolicyKit Policy Configuration 1.0//EN"
  "http://www.freedesktop.org/standards/PolicyKit/1/policyconfig.dtd">
 <policyconfig>
-  <action id="org.samsung.control">
-    <description>Run Samsung Galaxy Book Control</description>
-    <message>Authentication is required to control Samsung Galaxy Book settings</message>
+  <action id="org.samsung.control.set">
+    <description>Change Samsung Galaxy Book settings</description>
+    <message>Authentication is required to change Samsung Galaxy Book settings</message>
     <defaults>
-      <allow_any>auth_admin</allow_any>
-      <allow_inactive>auth_admin</allow_inactive>
-      <allow_active>auth_admin</allow_active>
+      <allow_any>auth_admin_keep</allow_any>
+      <allow_inactive>auth_admin_keep</allow_inactive>
+      <allow_active>auth_admin_keep</allow_active>
+    </defaults>
+  </action>
+  <action id="org.samsung.control.set-session">
+    <description>Change the Samsung Galaxy Book keyboard backlight and performance profile</description>
+    <message>Authentication is required to change the keyboard backlight or performance profile</message>
+    <defaults>
+      <allow_any>auth_admin_keep</allow_any>
+      <allow_inactive>auth_admin_keep</allow_inactive>
+      <allow_active>yes</allow_active>
     </defaults>
-    <annotate key="org.freedesktop.policykit.exec.path">/usr/local/bin/samsung-control-wrapper</annotate>
-    <annotate key="org.freedesktop.policykit.exec.allow_gui">true</annotate>
   </action>
 </policyconfig>
 EOL
@@ -112,6 +116,10 @@ SUBSYSTEM=="firmware", KERNEL=="acpi", RUN+="/bin/chmod 666 /sys/firmware/acpi/p
 SUBSYSTEM=="hwmon", KERNEL=="hwmon*", MODE="0666"
 EOL
 
+# Pick up the new service and bus policy
+systemctl daemon-reload
+systemctl reload dbus.service
+
 # Reload udev rules
 udevadm control --reload-rules
 udevadm trigger
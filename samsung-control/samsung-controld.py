@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+import sys
+
+from samsung_control.daemon import main
+
+if __name__ == "__main__":
+    sys.exit(main())
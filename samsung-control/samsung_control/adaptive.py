@@ -0,0 +1,65 @@
+"""Whether a sampled signal is moving, for adaptive sampling intervals.
+
+The Monitor samples a metric faster while this says it is moving and lets
+the TickScheduler back it off while it holds still.
+"""
+
+import math
+
+
+def _fans(sensors):
+    return [value for sensor, value in sensors if sensor.kind == "fan"]
+
+
+def _battery(info):
+    return [info.power, info.capacity]
+
+
+# How far a sampler's values must move between two samples to count as
+# moving: name -> (values of a sample, threshold per value)
+SIGNALS = {
+    "sensors": (_fans, 150),  # RPM, fan ramps
+    "cpu": (lambda cpu: [cpu.total], 10),  # percentage points
+    "thermal": (lambda thermal: [thermal.package], 2),  # °C
+    "battery": (_battery, 1),  # W, or a percent of charge
+}
+
+
+class VolatilityTracker:
+    """Compares every sample with the one before it.
+
+    A value that disappears or turns up (a fan that stops reporting, a
+    battery that is plugged in) counts as moving. Values that can't be
+    compared, such as an unknown temperature, count as still.
+    """
+
+    def __init__(self, signals=SIGNALS):
+        self.signals = dict(signals)
+        self.last = {}
+
+    def tracks(self, name):
+        return name in self.signals
+
+    def moving(self, name, value):
+        extract, threshold = self.signals[name]
+        try:
+            current = extract(value) if value is not None else []
+        except (AttributeError, TypeError, ValueError):
+            current = []
+        last, self.last[name] = self.last.get(name), current
+        if last is None:
+            return False
+        if len(last) != len(current):
+            return True
+        for before, after in zip(last, current):
+            if (before is None) != (after is None):
+                return True
+            if before is None or not _finite(before, after):
+                continue
+            if abs(after - before) >= threshold:
+                return True
+        return False
+
+
+def _finite(*values):
+    return all(math.isfinite(v) for v in values)
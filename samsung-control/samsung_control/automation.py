@@ -0,0 +1,234 @@
+"""Automatic platform profile switching.
+
+Rules are read from a file, one per line, first match wins:
+
+    # conditions [for DURATION] -> profile
+    battery and cpu < 20 for 60s -> low-power
+    ac and temp > 85 -> balanced
+    ac -> performance
+
+Conditions are "ac", "battery", "charging" or METRIC OP NUMBER, joined
+with "and". The metrics are cpu (total %), temp (package °C), fan (RPM)
+and capacity (battery %), OP is one of < <= > >=. "for" takes seconds
+("60", "60s") or minutes ("5m") and requires the conditions to hold for
+that long.
+
+A comparison that is true stays true until the value moves back past
+the threshold by the metric's hysteresis, and the profile is switched
+at most once per dwell time. Both can be changed in the file, before the
+rules they apply to:
+
+    dwell 30
+    hysteresis temp 5
+"""
+
+import logging
+import math
+
+DEFAULT_PATH = "/etc/samsung-control/automation.conf"
+DEFAULT_DWELL = 30  # seconds
+
+# Band a true comparison must leave before it turns false again
+HYSTERESIS = {"cpu": 5, "temp": 3, "fan": 300, "capacity": 2}
+OPERATORS = ("<=", ">=", "<", ">")
+
+
+def _fan(values):
+    sensors = values.get("sensors")
+    fans = [value for sensor, value in sensors or () if sensor.kind == "fan"]
+    return fans[0] if fans else None
+
+
+# Read each metric from a snapshot's values, None if it isn't known yet
+METRICS = {
+    "cpu": lambda values: getattr(values.get("cpu"), "total", None),
+    "temp": lambda values: getattr(values.get("thermal"), "package", None),
+    "fan": _fan,
+    "capacity": lambda values: (values.get("battery") or (None,))[0],
+}
+STATES = {
+    "ac": lambda values: values.get("ac") is True,
+    "battery": lambda values: values.get("ac") is False,
+    "charging": lambda values: (values.get("battery") or (None, False))[1],
+}
+
+
+class Comparison:
+    def __init__(self, metric, operator, threshold, hysteresis):
+        self.metric = metric
+        self.read = METRICS[metric]
+        self.below = operator.startswith("<")
+        self.inclusive = operator.endswith("=")
+        self.threshold = threshold
+        self.hysteresis = hysteresis
+        self.state = False
+
+    def update(self, values):
+        value = self.read(values)
+        if value is None:
+            self.state = False
+            return False
+        # Once true, the threshold moves out by the hysteresis band
+        band = self.hysteresis if self.state else 0
+        if self.below:
+            limit = self.threshold + band
+            self.state = value <= limit if self.inclusive else value < limit
+        else:
+            limit = self.threshold - band
+            self.state = value >= limit if self.inclusive else value > limit
+        return self.state
+
+
+class State:
+    def __init__(self, name):
+        self.read = STATES[name]
+
+    def update(self, values):
+        return bool(self.read(values))
+
+
+class Rule:
+    """Conditions that select a profile once they have held for duration
+    seconds. Only the time they started holding is kept, so every update
+    is constant work however long the window."""
+
+    def __init__(self, text, conditions, duration, profile):
+        self.text = text
+        self.conditions = conditions
+        self.duration = duration
+        self.profile = profile
+        self.since = None
+
+    def update(self, values, now):
+        # Every condition is updated, their hysteresis depends on it
+        results = [condition.update(values) for condition in self.conditions]
+        if not all(results):
+            self.since = None
+            return False
+        if self.since is None:
+            self.since = now
+        return now - self.since >= self.duration
+
+
+def parse_duration(text):
+    if text.endswith("m"):
+        return float(text[:-1]) * 60
+    return float(text.rstrip("s"))
+
+
+def parse_rule(text, hysteresis):
+    conditions_text, sep, profile = text.partition("->")
+    profile = profile.strip()
+    if not sep or not profile:
+        raise ValueError("expected CONDITIONS -> PROFILE")
+
+    conditions_text, sep, duration = conditions_text.partition(" for ")
+    duration = parse_duration(duration.strip()) if sep else 0
+
+    conditions = []
+    for condition in conditions_text.split(" and "):
+        condition = condition.strip()
+        if condition in STATES:
+            conditions.append(State(condition))
+            continue
+        operator = next((op for op in OPERATORS if op in condition), None)
+        if operator is None:
+            raise ValueError(f"unknown condition {condition!r}")
+        metric, threshold = (part.strip() for part in condition.split(operator, 1))
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}")
+        threshold = float(threshold.rstrip("%"))
+        conditions.append(Comparison(metric, operator, threshold, hysteresis[metric]))
+    return Rule(text, conditions, duration, profile)
+
+
+def load_rules(path=DEFAULT_PATH):
+    """Return (rules, dwell) from path, or None if it doesn't exist.
+    Lines that can't be parsed are logged and skipped."""
+    try:
+        with open(path, "r") as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logging.error(f"Error reading automation rules from {path}: {str(e)}")
+        return None
+
+    hysteresis = dict(HYSTERESIS)
+    dwell = DEFAULT_DWELL
+    rules = []
+    for number, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        words = line.split()
+        try:
+            if words[0] == "dwell" and len(words) == 2:
+                dwell = parse_duration(words[1])
+            elif words[0] == "hysteresis" and len(words) == 3:
+                if words[1] not in hysteresis:
+                    raise ValueError(f"unknown metric {words[1]!r}")
+                hysteresis[words[1]] = float(words[2])
+            else:
+                rules.append(parse_rule(line, hysteresis))
+        except ValueError as e:
+            logging.error(f"Error in {path} line {number}: {str(e)}")
+    return rules, dwell
+
+
+class Automation:
+    """Switches the platform profile by the first rule that fires.
+
+    Fed the sampling snapshots of whoever owns the hardware (samsung-controld
+    or the GUI when it runs without it), writes through write(profile),
+    which returns True once the switch is made or queued. A profile change
+    from anywhere else counts as a switch too, so a choice made in the
+    dropdown is kept for at least the dwell time.
+    """
+
+    def __init__(self, rules, write, dwell=DEFAULT_DWELL, choices=None):
+        if choices:
+            for rule in rules:
+                if rule.profile not in choices:
+                    logging.error(f"Ignoring rule {rule.text!r}: unknown profile")
+            rules = [rule for rule in rules if rule.profile in choices]
+        self.rules = rules
+        self.write = write
+        self.dwell = dwell
+        self.current = None
+        self.last_switch = -math.inf
+
+    def on_snapshot(self, snapshot):
+        self.update(snapshot.values, snapshot.time)
+
+    def update(self, values, now):
+        profile = values.get("platform_profile")
+        if profile != self.current:
+            if self.current is not None:
+                self.last_switch = now
+            self.current = profile
+
+        # Every rule is updated so its window keeps running
+        fired = [rule for rule in self.rules if rule.update(values, now)]
+        if not fired or self.current is None:
+            return
+        rule = fired[0]
+        if rule.profile == self.current or now - self.last_switch < self.dwell:
+            return
+
+        logging.info(f"Automation: {rule.text}")
+        if self.write(rule.profile) is True:
+            self.last_switch = now
+
+
+def create(hw, path=DEFAULT_PATH, write=None):
+    """Return an Automation for hw from the rules at path, None if there
+    are none. It writes with hw.write_platform_profile unless given write."""
+    loaded = load_rules(path)
+    if not loaded or not loaded[0]:
+        return None
+    rules, dwell = loaded
+    logging.info(f"Loaded {len(rules)} automation rules from {path}")
+    if write is None:
+        write = hw.write_platform_profile
+    return Automation(rules, write, dwell, hw.get_platform_profile_choices())
@@ -0,0 +1,207 @@
+import math
+import threading
+import time
+from collections import namedtuple
+
+# Seconds for a smoothed rate to cover about two thirds of a step change
+RATE_TIME_CONSTANT = 60
+# After a gap this long the old rate says nothing about the new one
+RATE_MAX_GAP = 600
+
+# capacity in %, energy and energy_full in Wh, power in W (whichever way
+# it flows) and voltage in V, each None if the battery doesn't report it.
+# With several batteries they are added up, capacity is then the share of
+# the total energy.
+# rate is the smoothed power for the current direction, and while
+# discharging for the current platform profile. time_to_empty and
+# time_to_full are seconds, None unless discharging or charging and known;
+# time_to_full counts up to the charge threshold when one is set.
+BatteryInfo = namedtuple(
+    "BatteryInfo",
+    "capacity charging status energy energy_full power voltage cycle_count "
+    "rate time_to_empty time_to_full",
+)
+# What a machine without a system battery reports
+NO_BATTERY = BatteryInfo(
+    None, False, "Not present", None, None, None, None, None, None, None, None
+)
+
+
+def parse_properties(data):
+    """Parse a power_supply uevent file ("KEY=VALUE" lines) into a dict
+    with the same keys as a uevent message."""
+    properties = {}
+    for line in data.decode(errors="replace").splitlines():
+        key, sep, value = line.partition("=")
+        if sep:
+            properties[key] = value
+    return properties
+
+
+def _micro(properties, name):
+    # power_supply reports µWh, µW, µV, µAh and µA
+    value = properties.get(f"POWER_SUPPLY_{name}")
+    if value is None or not value.lstrip("-").isdigit():
+        return None
+    return int(value) / 1000000
+
+
+def _values(properties):
+    """(capacity, status, energy, energy_full, power, voltage, cycle_count)
+    of one battery's properties. Raises ValueError on a malformed capacity."""
+    capacity = properties.get("POWER_SUPPLY_CAPACITY")
+    capacity = int(capacity) if capacity is not None else None
+    status = properties.get("POWER_SUPPLY_STATUS", "Unknown")
+
+    voltage = _micro(properties, "VOLTAGE_NOW")
+    energy = _micro(properties, "ENERGY_NOW")
+    energy_full = _micro(properties, "ENERGY_FULL")
+    power = _micro(properties, "POWER_NOW")
+    if voltage:
+        # Batteries that count charge instead of energy
+        if energy is None and _micro(properties, "CHARGE_NOW") is not None:
+            energy = _micro(properties, "CHARGE_NOW") * voltage
+        if energy_full is None and _micro(properties, "CHARGE_FULL") is not None:
+            energy_full = _micro(properties, "CHARGE_FULL") * voltage
+        if power is None and _micro(properties, "CURRENT_NOW") is not None:
+            power = _micro(properties, "CURRENT_NOW") * voltage
+    if power is not None:
+        power = abs(power)
+    cycle_count = properties.get("POWER_SUPPLY_CYCLE_COUNT")
+    cycle_count = int(cycle_count) if cycle_count else None
+    return capacity, status, energy, energy_full, power, voltage, cycle_count
+
+
+def _total(values):
+    return None if None in values else sum(values)
+
+
+class Battery:
+    """State and time estimates of the system batteries.
+
+    Every sample is a single read of each battery's uevent file, which
+    holds all its attributes at once. A uevent message from the kernel
+    carries the same properties and goes through update() without reading
+    anything. Which batteries there are comes from a PowerSupplyRegistry.
+
+    Charge and discharge rates are exponentially weighted moving averages
+    of the reported power, or of the energy change where the battery
+    doesn't report power. Discharge rates are kept per platform profile,
+    so a profile switch shows that profile's rate right away.
+    """
+
+    def __init__(self, reader, supplies):
+        self.reader = reader
+        self.supplies = supplies
+        self.properties = {}  # battery name -> its latest properties
+        # Kept up to date by GalaxyBook from the samples of those attributes
+        self.threshold = None
+        self.profile = None
+        self.rates = {}  # (direction, profile) -> (watts, time)
+        self.last = None  # (direction, energy, time)
+        # Samples and uevent messages come from different threads
+        self.lock = threading.Lock()
+
+    def sample(self, now=None):
+        properties = {}
+        for battery in self.supplies.batteries():
+            data = self.reader.read_bytes(f"{battery.path}/uevent")
+            properties[battery.name] = parse_properties(data)
+        with self.lock:
+            self.properties = properties
+            return self._combine(now)
+
+    def update(self, name, properties, now=None):
+        """Take the properties of battery name from a uevent message."""
+        with self.lock:
+            self.properties = {**self.properties, name: properties}
+            return self._combine(now)
+
+    def _combine(self, now):
+        now = time.monotonic() if now is None else now
+        batteries = [
+            _values(properties)
+            for properties in self.properties.values()
+            if properties.get("POWER_SUPPLY_PRESENT") != "0"
+        ]
+        if not batteries:
+            self.last = None
+            return NO_BATTERY
+
+        capacities, statuses, energies, fulls, powers, voltages, cycles = zip(
+            *batteries
+        )
+        energy = _total(energies)
+        energy_full = _total(fulls)
+        known = [c for c in capacities if c is not None]
+        if len(batteries) == 1:
+            capacity = capacities[0]
+        elif energy is not None and energy_full:
+            capacity = round(energy / energy_full * 100)
+        else:
+            capacity = round(sum(known) / len(known)) if known else None
+        known = [p for p in powers if p is not None]
+        power = sum(known) if known else None
+        status = statuses[0]
+        for candidate in ("Charging", "Discharging"):
+            if candidate in statuses:
+                status = candidate
+                break
+        cycle_count = max((c for c in cycles if c is not None), default=None)
+
+        direction = {"Discharging": "discharge", "Charging": "charge"}.get(status)
+        rate = self._update_rate(direction, energy, power, now)
+
+        time_to_empty = time_to_full = None
+        threshold = self.threshold
+        if rate and energy is not None:
+            if direction == "discharge":
+                time_to_empty = energy / rate * 3600
+            elif direction == "charge" and energy_full:
+                target = energy_full
+                if threshold and 0 < threshold < 100:
+                    target = energy_full * threshold / 100
+                time_to_full = max(target - energy, 0) / rate * 3600
+
+        return BatteryInfo(
+            capacity,
+            status == "Charging",
+            status,
+            energy,
+            energy_full,
+            power,
+            voltages[0],
+            cycle_count,
+            rate,
+            time_to_empty,
+            time_to_full,
+        )
+
+    def _update_rate(self, direction, energy, power, now):
+        last, self.last = self.last, (direction, energy, now)
+        if direction is None:
+            return None
+
+        instant = power or None
+        if instant is None and last is not None and last[0] == direction:
+            # No power reading, derive it from the energy counter
+            last_energy, last_time = last[1], last[2]
+            if None not in (energy, last_energy) and energy != last_energy:
+                instant = abs(energy - last_energy) / (now - last_time) * 3600
+            else:
+                # The counter moves in coarse steps, measure from the
+                # sample before until it does
+                self.last = last
+        key = (direction, self.profile if direction == "discharge" else None)
+        if instant is None:
+            previous = self.rates.get(key)
+            return previous[0] if previous else None
+
+        previous = self.rates.get(key)
+        if previous is None or now - previous[1] > RATE_MAX_GAP:
+            rate = instant
+        else:
+            alpha = 1 - math.exp(-(now - previous[1]) / RATE_TIME_CONSTANT)
+            rate = previous[0] + alpha * (instant - previous[0])
+        self.rates[key] = (rate, now)
+        return rate
@@ -0,0 +1,385 @@
+import logging
+import math
+import time
+from array import array
+from types import MappingProxyType
+
+from gi.repository import Gio, GLib
+
+from .battery import BatteryInfo
+from .cpu import CpuUsage
+from .hwmon import SENSOR_TYPES
+from .sampler import Snapshot
+from .thermal import Thermal
+
+BUS_NAME = "org.samsung.control.Daemon"
+OBJECT_PATH = "/org/samsung/control/Daemon"
+INTERFACE = "org.samsung.control.Daemon"
+# polkit actions checked before every Set() call. The keyboard backlight
+# and the platform profile are what the Fn keys change anyway, an active
+# local session may set them without a password. Everything else (camera,
+# charge threshold, ...) needs an administrator.
+POLKIT_ACTION = "org.samsung.control.set"
+POLKIT_SESSION_ACTION = "org.samsung.control.set-session"
+SESSION_ATTRS = ("kbd_backlight", "platform_profile")
+
+ERROR_PERMISSION_DENIED = "org.samsung.control.Error.PermissionDenied"
+# polkit refused the caller, as opposed to the write itself failing with
+# EACCES
+ERROR_NOT_AUTHORIZED = "org.samsung.control.Error.NotAuthorized"
+ERROR_INVALID_ARGS = "org.samsung.control.Error.InvalidArgs"
+ERROR_FAILED = "org.samsung.control.Error.Failed"
+
+# Snapshot carries the values and stamps that changed since the previous
+# signal, names whose value is None only appear in stamps
+INTROSPECTION_XML = f"""
+<node>
+  <interface name="{INTERFACE}">
+    <method name="GetInfo">
+      <arg type="i" name="kbd_backlight_max" direction="out"/>
+      <arg type="as" name="platform_profile_choices" direction="out"/>
+      <arg type="as" name="attrs" direction="out"/>
+    </method>
+    <method name="GetSnapshot">
+      <arg type="t" name="seq" direction="out"/>
+      <arg type="a{{sv}}" name="values" direction="out"/>
+      <arg type="a{{sd}}" name="stamps" direction="out"/>
+      <arg type="as" name="stale" direction="out"/>
+    </method>
+    <method name="Subscribe"/>
+    <method name="Unsubscribe"/>
+    <method name="Request">
+      <arg type="as" name="names" direction="in"/>
+    </method>
+    <method name="Set">
+      <arg type="s" name="attr" direction="in"/>
+      <arg type="s" name="value" direction="in"/>
+    </method>
+    <signal name="Snapshot">
+      <arg type="t" name="seq"/>
+      <arg type="a{{sv}}" name="values"/>
+      <arg type="a{{sd}}" name="stamps"/>
+      <arg type="as" name="stale"/>
+    </signal>
+  </interface>
+</node>
+"""
+
+
+def encode_value(name, value):
+    if name == "sensors":
+        return GLib.Variant(
+            "a(ssusd)",
+            [
+                (s.kind, s.chip, s.index, s.label, math.nan if v is None else v)
+                for s, v in value
+            ],
+        )
+    if name == "battery":
+        # capacity and cycle_count -1 and NaN stand for None
+        return GLib.Variant(
+            "(ibsddddxddd)",
+            (
+                -1 if value.capacity is None else value.capacity,
+                *value[1:3],
+                *[math.nan if v is None else v for v in value[3:7]],
+                -1 if value.cycle_count is None else value.cycle_count,
+                *[math.nan if v is None else v for v in value[8:]],
+            ),
+        )
+    if name == "cpu":
+        return GLib.Variant(
+            "(dauadadadadadad)", (value[0], value[1], *[list(a) for a in value[2:]])
+        )
+    if name == "thermal":
+        return GLib.Variant(
+            "(dddddda(sd))",
+            (
+                *[math.nan if v is None else v for v in value[:6]],
+                [(t, math.nan if v is None else v) for t, v in value.zones],
+            ),
+        )
+    if isinstance(value, bool):
+        return GLib.Variant("b", value)
+    if isinstance(value, int):
+        return GLib.Variant("x", value)
+    if isinstance(value, float):
+        return GLib.Variant("d", value)
+    return GLib.Variant("s", str(value))
+
+
+def decode_value(name, value):
+    # Values arrive unpacked from the a{sv} dictionary
+    if name == "sensors":
+        readings = []
+        for kind, chip, index, label, v in value:
+            sensor = SENSOR_TYPES[kind](None, chip, index, None, label)
+            if math.isnan(v):
+                v = None
+            elif kind == "fan":
+                v = int(v)
+            readings.append((sensor, v))
+        return tuple(readings)
+    if name == "battery":
+        capacity, charging, status, *fields = value
+        capacity = None if capacity == -1 else capacity
+        fields = [None if isinstance(v, float) and math.isnan(v) else v for v in fields]
+        if fields[4] == -1:
+            fields[4] = None
+        return BatteryInfo(capacity, charging, status, *fields)
+    if name == "cpu":
+        total, cores, *fields = value
+        return CpuUsage(total, tuple(cores), *[array("d", a) for a in fields])
+    if name == "thermal":
+        *fields, zones = value
+        return Thermal(
+            *[None if math.isnan(v) else v for v in fields],
+            tuple((t, None if math.isnan(v) else v) for t, v in zones),
+        )
+    return value
+
+
+def encode_snapshot(snapshot, names):
+    values = {}
+    for name in names:
+        value = snapshot.values[name]
+        if value is not None:
+            values[name] = encode_value(name, value)
+    stamps = {name: snapshot.stamps[name] for name in names}
+    return GLib.Variant(
+        "(ta{sv}a{sd}as)", (snapshot.seq, values, stamps, sorted(snapshot.stale))
+    )
+
+
+def connect_daemon(address, callback):
+    """Connect to samsung-controld without blocking the main loop.
+
+    callback(client, error) gets a DaemonClient with the controls and the
+    current values loaded, or None and the GLib.Error if the daemon can't
+    be reached. address is a bus address, None for the system bus.
+    """
+
+    def on_connection(source, result):
+        try:
+            if address is None:
+                connection = Gio.bus_get_finish(result)
+            else:
+                connection = Gio.DBusConnection.new_for_address_finish(result)
+        except GLib.Error as e:
+            callback(None, e)
+            return
+        DaemonClient(connection).load(callback)
+
+    if address is None:
+        Gio.bus_get(Gio.BusType.SYSTEM, None, on_connection)
+    else:
+        Gio.DBusConnection.new_for_address(
+            address,
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+            | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+            None,
+            None,
+            on_connection,
+        )
+
+
+class DaemonClient:
+    """Frontend side of samsung-controld.
+
+    Offers the GalaxyBook methods the GUI reads and writes through and the
+    Monitor interface it samples through, so either can back the GUI. Reads
+    are answered from the latest snapshot, writes go to the daemon's Set()
+    method. Everything but Set() is asynchronous; writes block, they run
+    on the WriteQueue thread.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.callbacks = []
+        self.kbd_backlight_max = 0
+        self.platform_profile_choices = []
+        self.attrs = set()
+        self.values = {}
+        self.stamps = {}
+        self.stale = frozenset()
+        self.seq = 0
+        self.subscribed = False
+
+        self.subscription = self.connection.signal_subscribe(
+            BUS_NAME,
+            INTERFACE,
+            "Snapshot",
+            OBJECT_PATH,
+            None,
+            Gio.DBusSignalFlags.NONE,
+            self.on_snapshot_signal,
+        )
+
+    def load(self, callback):
+        """Fetch the controls and the latest snapshot, then call
+        callback(self, None), or callback(None, error) on failure."""
+
+        def finish(connection, result):
+            try:
+                return connection.call_finish(result).unpack()
+            except GLib.Error as e:
+                self.close()
+                callback(None, e)
+
+        def on_snapshot(connection, result):
+            snapshot = finish(connection, result)
+            if snapshot is not None:
+                self.apply(*snapshot)
+                logging.info(f"Connected to {BUS_NAME}, controls: {sorted(self.attrs)}")
+                callback(self, None)
+
+        def on_info(connection, result):
+            info = finish(connection, result)
+            if info is not None:
+                self.kbd_backlight_max, self.platform_profile_choices, attrs = info
+                self.attrs = set(attrs)
+                self.call_async("GetSnapshot", callback=on_snapshot)
+
+        # Activates the daemon if it isn't running yet
+        self.call_async("GetInfo", callback=on_info)
+
+    def call_async(self, method, parameters=None, callback=None, timeout=5000):
+        """Call method, then callback(connection, result). Without callback
+        only errors are logged."""
+        if callback is None:
+
+            def callback(connection, result):
+                try:
+                    connection.call_finish(result)
+                except GLib.Error as e:
+                    logging.error(f"Error calling {method}: {e.message}")
+
+        self.connection.call(
+            BUS_NAME,
+            OBJECT_PATH,
+            INTERFACE,
+            method,
+            parameters,
+            None,
+            Gio.DBusCallFlags.NONE,
+            timeout,
+            None,
+            callback,
+        )
+
+    def call(self, method, parameters=None, timeout=5000):
+        return self.connection.call_sync(
+            BUS_NAME,
+            OBJECT_PATH,
+            INTERFACE,
+            method,
+            parameters,
+            None,
+            Gio.DBusCallFlags.NONE,
+            timeout,
+            None,
+        ).unpack()
+
+    # GalaxyBook interface
+
+    def close(self):
+        if self.subscription is not None:
+            self.connection.signal_unsubscribe(self.subscription)
+            self.subscription = None
+
+    def has_attr(self, attr):
+        return attr in self.attrs
+
+    def read_value(self, attr):
+        return self.values.get(attr)
+
+    def read_kbd_backlight(self):
+        return self.values.get("kbd_backlight")
+
+    def read_kbd_backlight_max(self):
+        return self.kbd_backlight_max
+
+    def read_platform_profile(self):
+        return self.values.get("platform_profile")
+
+    def get_platform_profile_choices(self):
+        return self.platform_profile_choices
+
+    def write_value(self, attr, value):
+        try:
+            # polkit may ask for a password before the call returns
+            self.call("Set", GLib.Variant("(ss)", (attr, str(value))), 120000)
+            return True
+        except GLib.Error as e:
+            logging.error(f"Error writing to {attr}: {e.message}")
+            error = Gio.DBusError.get_remote_error(e)
+            if error == ERROR_NOT_AUTHORIZED:
+                return "not_authorized"
+            if error == ERROR_PERMISSION_DENIED:
+                return "permission_denied"
+            return False
+
+    def verify_value(self, attr, value):
+        return True  # Set() only succeeds once the daemon has read it back
+
+    def write_kbd_backlight(self, value):
+        return self.write_value("kbd_backlight", value)
+
+    def write_platform_profile(self, value):
+        return self.write_value("platform_profile", value)
+
+    # Monitor interface
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+
+    def start(self):
+        self.resume()
+        # Hand the state fetched on connect to the new callbacks
+        self.deliver()
+
+    def set_interval(self, metric, interval):
+        logging.info(f"Ignoring {metric} interval, samsung-controld sets the pace")
+
+    def set_adaptive(self, enabled):
+        logging.info("Ignoring fixed intervals, samsung-controld sets the pace")
+
+    def request(self, *names):
+        self.call_async("Request", GLib.Variant("(as)", (list(names),)))
+
+    def pause(self):
+        # The daemon stops sampling once no client is subscribed
+        if self.subscribed:
+            self.subscribed = False
+            self.call_async("Unsubscribe")
+
+    def resume(self):
+        if not self.subscribed:
+            self.subscribed = True
+            self.call_async("Subscribe")
+
+    def set_slowdown(self, factor):
+        pass  # Shared sampling, one client can't slow it down for others
+
+    def on_snapshot_signal(self, connection, sender, path, interface, signal, params):
+        self.apply(*params.unpack())
+        self.deliver()
+
+    def apply(self, seq, values, stamps, stale):
+        for name, stamp in stamps.items():
+            value = values.get(name)
+            self.values[name] = None if value is None else decode_value(name, value)
+            self.stamps[name] = stamp
+        self.stale = frozenset(stale)
+        self.seq = seq
+
+    def deliver(self):
+        snapshot = Snapshot(
+            self.seq,
+            time.monotonic(),
+            MappingProxyType(dict(self.values)),
+            MappingProxyType(dict(self.stamps)),
+            self.stale,
+        )
+        for callback in self.callbacks:
+            callback(snapshot)
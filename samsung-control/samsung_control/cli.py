@@ -0,0 +1,358 @@
+"""samsung-control get|set|watch|export, the command-line interface.
+
+Only the attribute layer is imported here, never Gtk, Adw or cairo.
+Most of what a call adds to the interpreter's startup is importing
+argparse, json, logging and the attribute modules, see
+benchmarks/bench_cli.py. export loads GLib for the sampling engine when
+it runs.
+"""
+
+import argparse
+import json
+import logging
+import os
+import select
+import signal
+import sys
+import time
+
+from .hardware import CONTROL_ATTRS, GalaxyBook
+
+COMMANDS = ("get", "set", "watch", "export")
+
+ALIASES = {"kbd_backlight": "kbd_backlight/brightness"}
+SWITCHES = ("usb_charge", "start_on_lid_open", "allow_recording")
+TRUE_WORDS = ("1", "on", "true", "yes")
+FALSE_WORDS = ("0", "off", "false", "no")
+
+
+class UsageError(Exception):
+    pass
+
+
+def _number(value):
+    if value is not None and value.lstrip("-").isdigit():
+        return int(value)
+    return value
+
+
+def _read_battery(hw):
+    info = hw.read_battery_info()
+    return None if info is None else info._asdict()
+
+
+def _read_sensors(hw):
+    return {sensor.name: value for sensor, value in hw.read_sensors()}
+
+
+def _parse_kbd_backlight(hw, value):
+    maximum = hw.read_kbd_backlight_max()
+    if not value.isdigit() or int(value) > maximum:
+        raise UsageError(f"kbd_backlight/brightness must be 0-{maximum}")
+    return int(value)
+
+
+def _parse_platform_profile(hw, value):
+    choices = hw.get_platform_profile_choices()
+    if value not in choices:
+        raise UsageError(f"platform_profile must be one of {', '.join(choices)}")
+    return value
+
+
+def _parse_threshold(hw, value):
+    if not value.isdigit() or int(value) > 100:
+        raise UsageError("charge_control_end_threshold must be 0-100")
+    return value
+
+
+def _parse_switch(attr):
+    def parse(hw, value):
+        if value.lower() in TRUE_WORDS:
+            return "1"
+        if value.lower() in FALSE_WORDS:
+            return "0"
+        raise UsageError(f"{attr} must be on or off")
+
+    return parse
+
+
+def _attributes():
+    # name -> (read(hw), parse(hw, text) or None if read-only, write(hw, value))
+    attrs = {
+        "platform_profile": (
+            lambda hw: hw.read_platform_profile(),
+            _parse_platform_profile,
+            lambda hw, value: hw.write_platform_profile(value),
+        ),
+        "kbd_backlight/brightness": (
+            lambda hw: hw.read_kbd_backlight(),
+            _parse_kbd_backlight,
+            lambda hw, value: hw.write_kbd_backlight(value),
+        ),
+        "battery": (_read_battery, None, None),
+        "sensors": (_read_sensors, None, None),
+    }
+    for attr in CONTROL_ATTRS:
+        parse = _parse_switch(attr) if attr in SWITCHES else _parse_threshold
+        attrs[attr] = (
+            lambda hw, attr=attr: _number(hw.read_value(attr)),
+            parse,
+            lambda hw, value, attr=attr: hw.write_value(attr, value),
+        )
+    return attrs
+
+
+ATTRIBUTES = _attributes()
+
+
+def resolve(name):
+    name = ALIASES.get(name, name)
+    if name not in ATTRIBUTES:
+        raise UsageError(f"Unknown attribute: {name}")
+    return name
+
+
+def available(hw):
+    names = []
+    for name in ATTRIBUTES:
+        if name in ("battery", "sensors"):
+            names.append(name)
+        elif hw.has_attr(name.split("/")[0]):
+            names.append(name)
+    return names
+
+
+def print_json(value, pretty):
+    if pretty:
+        print(json.dumps(value, indent=2))
+    else:
+        print(json.dumps(value, separators=(",", ":")))
+
+
+def cmd_get(hw, args):
+    names = [resolve(name) for name in args.attrs] or available(hw)
+    print_json({name: ATTRIBUTES[name][0](hw) for name in names}, args.pretty)
+    return 0
+
+
+def cmd_set(hw, args):
+    # Validate every pair before writing anything
+    changes = []
+    for pair in args.pairs:
+        name, sep, text = pair.partition("=")
+        if not sep:
+            raise UsageError(f"Expected ATTR=VALUE, got {pair}")
+        name = resolve(name)
+        read, parse, write = ATTRIBUTES[name]
+        if parse is None:
+            raise UsageError(f"{name} is read-only")
+        changes.append((name, parse(hw, text)))
+
+    results = {}
+    status = 0
+    for name, value in changes:
+        read, parse, write = ATTRIBUTES[name]
+        result = write(hw, value)
+        if result is True:
+            results[name] = {"ok": True, "value": read(hw)}
+        else:
+            error = "permission denied" if result == "permission_denied" else "failed"
+            results[name] = {"ok": False, "error": error}
+            status = 1
+    print_json(results, args.pretty)
+    return status
+
+
+def cmd_watch(hw, args):
+    names = [resolve(name) for name in args.attrs] or available(hw)
+    interval = args.interval / 1000
+
+    # Attributes the kernel signals with sysfs_notify() are read on POLLPRI,
+    # battery changes arrive as uevents, everything else is polled
+    poller = select.poll()
+    notify = {}
+    notify_paths = {
+        "kbd_backlight/brightness": hw.kbd_backlight_notify_path(),
+        "platform_profile": hw.platform_profile_path,
+    }
+    for name in names:
+        path = notify_paths.get(name)
+        if path is None or not hw.has_attr(name.split("/")[0]):
+            continue
+        attr = hw.sysfs.attribute(path)
+        try:
+            attr.read_into()  # Arms the notification
+        except OSError:
+            continue
+        notify[attr.fd] = (name, attr)
+        poller.register(attr.fd, select.POLLPRI | select.POLLERR)
+
+    uevents = None
+    if "battery" in names:
+        try:
+            from .uevent import NetlinkUeventSource, parse_uevent
+
+            uevents = NetlinkUeventSource()
+            poller.register(uevents.fileno(), select.POLLIN)
+        except OSError:
+            uevents = None
+    pushed = {name for name, attr in notify.values()}
+    if uevents is not None:
+        pushed.add("battery")
+    polled = [name for name in names if name not in pushed]
+
+    last = {}
+
+    def emit(due):
+        for name in due:
+            value = ATTRIBUTES[name][0](hw)
+            if name in last and last[name] == value:
+                continue
+            last[name] = value
+            print_json({"time": time.time(), "attr": name, "value": value}, False)
+        sys.stdout.flush()
+
+    emit(names)
+    deadline = time.monotonic() + interval
+    while True:
+        timeout = max(deadline - time.monotonic(), 0) if polled else None
+        due = []
+        for fd, event in poller.poll(None if timeout is None else timeout * 1000):
+            if uevents is not None and fd == uevents.fileno():
+                events = [parse_uevent(data) for data in uevents.receive()]
+                if any(e and e.subsystem == "power_supply" for e in events):
+                    due.append("battery")
+            else:
+                # read_into() re-arms the notification and may reopen a
+                # stale descriptor under a new number
+                name, attr = notify.pop(fd)
+                poller.unregister(fd)
+                try:
+                    attr.read_into()
+                except OSError as e:
+                    logging.warning(f"Cannot watch {name}, polling it: {str(e)}")
+                    polled.append(name)
+                else:
+                    notify[attr.fd] = (name, attr)
+                    poller.register(attr.fd, select.POLLPRI | select.POLLERR)
+                due.append(name)
+        if polled and time.monotonic() >= deadline:
+            due.extend(polled)
+            deadline = time.monotonic() + interval
+        emit(due)
+
+
+def cmd_export(hw, args):
+    # Same samplers and schedule as the GUI and the daemon
+    from gi.repository import GLib
+
+    from .exporter import MetricsExporter
+    from .monitor import Monitor, parse_interval
+
+    if args.port is None and args.textfile is None:
+        raise UsageError("export needs --port and/or --textfile")
+
+    monitor = Monitor(hw)
+    for value in args.interval:
+        try:
+            monitor.set_interval(*parse_interval(value))
+        except (argparse.ArgumentTypeError, ValueError) as e:
+            raise UsageError(str(e))
+    try:
+        exporter = MetricsExporter(
+            args.port, args.textfile, args.address, hw.get_platform_profile_choices()
+        )
+    except OSError as e:
+        raise UsageError(f"Cannot listen on {args.address}:{args.port}: {e}")
+    monitor.connect(exporter.on_snapshot)
+
+    loop = GLib.MainLoop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signum, loop.quit)
+    monitor.start()
+    try:
+        loop.run()
+    finally:
+        monitor.close()
+        exporter.close()
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="samsung-control",
+        description="Read and change Samsung Galaxy Book settings",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--pretty", action="store_true", help="indent the JSON")
+
+    get = commands.add_parser("get", parents=[common], help="print attributes as JSON")
+    get.add_argument("attrs", nargs="*", metavar="ATTR")
+    get.set_defaults(func=cmd_get)
+
+    set_ = commands.add_parser("set", parents=[common], help="apply ATTR=VALUE pairs")
+    set_.add_argument("pairs", nargs="+", metavar="ATTR=VALUE")
+    set_.set_defaults(func=cmd_set)
+
+    watch = commands.add_parser(
+        "watch",
+        parents=[common],
+        help="print a JSON line whenever an attribute changes",
+    )
+    watch.add_argument("attrs", nargs="*", metavar="ATTR")
+    watch.add_argument(
+        "--interval",
+        type=int,
+        default=1000,
+        metavar="MS",
+        help="poll interval for attributes without change notification",
+    )
+    watch.set_defaults(func=cmd_watch)
+
+    export = commands.add_parser(
+        "export",
+        help="serve fan, battery, CPU and control values as Prometheus metrics",
+    )
+    export.add_argument(
+        "--port",
+        type=int,
+        help="serve /metrics over HTTP on PORT (e.g. 9633)",
+    )
+    export.add_argument(
+        "--address",
+        default="127.0.0.1",
+        help="address to serve on (default 127.0.0.1)",
+    )
+    export.add_argument(
+        "--textfile",
+        metavar="PATH",
+        help="write the metrics to PATH for node_exporter's textfile collector",
+    )
+    export.add_argument(
+        "--interval",
+        action="append",
+        default=[],
+        metavar="METRIC=MS",
+        help="sampling interval for fan, cpu, battery or controls",
+    )
+    export.set_defaults(func=cmd_export)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    hw = GalaxyBook()
+    try:
+        return args.func(hw, args)
+    except UsageError as e:
+        parser.error(str(e))
+    except KeyboardInterrupt:
+        return 0
+    except BrokenPipeError:
+        # Reader went away (e.g. piped into head), don't fail flushing
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        hw.close()
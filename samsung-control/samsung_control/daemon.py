@@ -0,0 +1,453 @@
+import argparse
+import functools
+import logging
+import signal
+import sys
+
+from gi.repository import Gio, GLib
+
+from . import automation
+from .bus import (
+    BUS_NAME,
+    ERROR_FAILED,
+    ERROR_INVALID_ARGS,
+    ERROR_NOT_AUTHORIZED,
+    ERROR_PERMISSION_DENIED,
+    INTERFACE,
+    INTROSPECTION_XML,
+    OBJECT_PATH,
+    POLKIT_ACTION,
+    POLKIT_SESSION_ACTION,
+    SESSION_ATTRS,
+    encode_snapshot,
+)
+from .exporter import DEFAULT_PORT, MetricsExporter
+from .hardware import CONTROL_ATTRS, GalaxyBook
+from .logs import LEVELS, setup_logging
+from .monitor import Monitor, parse_interval
+from .telemetry import SYSTEM_PATH, TelemetryRecorder, TelemetryStore
+from .writequeue import WriteQueue
+
+POLKIT_NAME = "org.freedesktop.PolicyKit1"
+POLKIT_PATH = "/org/freedesktop/PolicyKit1/Authority"
+POLKIT_INTERFACE = "org.freedesktop.PolicyKit1.Authority"
+POLKIT_ALLOW_USER_INTERACTION = 1
+
+
+class ControlDaemon:
+    """Owns all hardware access and shares it over D-Bus.
+
+    One Monitor samples for every client: snapshots go out as Snapshot
+    signals with the values that changed. Sampling is paused while no
+    client is subscribed, unless automation, the metrics exporter or the
+    telemetry recorder need it. main() records telemetry by default, so
+    the installed daemon samples all the time. Set() calls are authorized
+    with polkit and carried out with the GalaxyBook write methods on a
+    WriteQueue thread, so a slow ACPI call doesn't hold up the other
+    clients.
+    """
+
+    def __init__(
+        self,
+        connection,
+        hw=None,
+        polkit=True,
+        on_name_lost=None,
+        rules_path=automation.DEFAULT_PATH,
+        exporter=None,
+        telemetry=None,
+    ):
+        self.connection = connection
+        self.hw = hw or GalaxyBook()
+        self.polkit = polkit
+        self.monitor = Monitor(self.hw)
+        self.monitor.connect(self.on_snapshot)
+        # Automation needs samples even while no client is subscribed
+        self.automation = automation.create(self.hw, rules_path)
+        if self.automation is not None:
+            self.monitor.connect(self.automation.on_snapshot)
+        # So does the metrics exporter
+        self.exporter = exporter
+        if exporter is not None:
+            self.monitor.connect(exporter.on_snapshot)
+        # And the history, which the GUI reads from the same file
+        self.telemetry = telemetry
+        if telemetry is not None:
+            self.monitor.connect(TelemetryRecorder(telemetry).on_snapshot)
+        self.writes = WriteQueue(GLib.idle_add, debounce=0)
+        self.sets = {}  # attr -> Set() calls waiting for the write in flight
+        self.snapshot = None
+        self.sent_stamps = {}
+        self.subscribers = {}  # unique name -> name watch id
+        self.registration_id = None
+        self.owner_id = None
+        self.on_name_lost = on_name_lost
+
+    def start(self):
+        node = Gio.DBusNodeInfo.new_for_xml(INTROSPECTION_XML)
+        self.registration_id = self.connection.register_object(
+            OBJECT_PATH, node.interfaces[0], self.on_method_call
+        )
+        self.monitor.start()
+        if not self.always_sampling():
+            self.monitor.pause()  # Until the first client subscribes
+
+    def always_sampling(self):
+        return (
+            self.automation is not None
+            or self.exporter is not None
+            or self.telemetry is not None
+        )
+
+    def close(self):
+        if self.owner_id is not None:
+            Gio.bus_unown_name(self.owner_id)
+        for watch_id in self.subscribers.values():
+            Gio.bus_unwatch_name(watch_id)
+        self.subscribers.clear()
+        if self.registration_id is not None:
+            self.connection.unregister_object(self.registration_id)
+        self.writes.close()
+        self.monitor.close()
+        if self.exporter is not None:
+            self.exporter.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        self.hw.close()
+
+    def on_snapshot(self, snapshot):
+        first = self.snapshot is None
+        self.snapshot = snapshot
+        if first:
+            # Take the name once there is something to answer with, D-Bus
+            # activation holds the first client's call until then
+            self.owner_id = Gio.bus_own_name_on_connection(
+                self.connection,
+                BUS_NAME,
+                Gio.BusNameOwnerFlags.NONE,
+                None,
+                self.name_lost,
+            )
+
+        changed = [
+            name
+            for name, stamp in snapshot.stamps.items()
+            if self.sent_stamps.get(name) != stamp
+        ]
+        if not changed:
+            return
+        self.sent_stamps.update((name, snapshot.stamps[name]) for name in changed)
+        self.connection.emit_signal(
+            None,
+            OBJECT_PATH,
+            INTERFACE,
+            "Snapshot",
+            encode_snapshot(snapshot, changed),
+        )
+
+    def name_lost(self, connection, name):
+        logging.error(f"Lost or could not acquire {name}")
+        if self.on_name_lost is not None:
+            self.on_name_lost()
+
+    def on_method_call(
+        self, connection, sender, path, interface, method, params, invocation
+    ):
+        try:
+            if method == "GetInfo":
+                attrs = [
+                    attr
+                    for attr in ("kbd_backlight", "platform_profile") + CONTROL_ATTRS
+                    if self.hw.has_attr(attr)
+                ]
+                invocation.return_value(
+                    GLib.Variant(
+                        "(iasas)",
+                        (
+                            self.hw.read_kbd_backlight_max(),
+                            self.hw.get_platform_profile_choices(),
+                            attrs,
+                        ),
+                    )
+                )
+            elif method == "GetSnapshot":
+                snapshot = self.snapshot or self.monitor.engine.snapshot()
+                invocation.return_value(
+                    encode_snapshot(snapshot, list(snapshot.stamps))
+                )
+            elif method == "Subscribe":
+                self.subscribe(sender)
+                invocation.return_value(None)
+            elif method == "Unsubscribe":
+                self.unsubscribe(sender)
+                invocation.return_value(None)
+            elif method == "Request":
+                (names,) = params.unpack()
+                self.monitor.request(
+                    *[name for name in names if name in self.monitor.engine.samplers]
+                )
+                invocation.return_value(None)
+            elif method == "Set":
+                attr, value = params.unpack()
+                action = (
+                    POLKIT_SESSION_ACTION if attr in SESSION_ATTRS else POLKIT_ACTION
+                )
+                self.authorize(
+                    sender,
+                    invocation,
+                    action,
+                    lambda: self.set(attr, value, invocation),
+                )
+                # Returned from set() or the polkit callback
+                return
+        except Exception as e:
+            logging.error(f"Error handling {method} from {sender}: {str(e)}")
+            invocation.return_dbus_error(ERROR_FAILED, str(e))
+
+    def subscribe(self, sender):
+        if sender in self.subscribers:
+            return
+        self.subscribers[sender] = Gio.bus_watch_name_on_connection(
+            self.connection,
+            sender,
+            Gio.BusNameWatcherFlags.NONE,
+            None,
+            lambda connection, name: self.unsubscribe(name),
+        )
+        logging.info(f"Client {sender} subscribed ({len(self.subscribers)} total)")
+        self.monitor.resume()
+
+    def unsubscribe(self, sender):
+        watch_id = self.subscribers.pop(sender, None)
+        if watch_id is None:
+            return
+        Gio.bus_unwatch_name(watch_id)
+        logging.info(f"Client {sender} unsubscribed ({len(self.subscribers)} left)")
+        if not self.subscribers and not self.always_sampling():
+            self.monitor.pause()
+
+    def authorize(self, sender, invocation, action, callback):
+        if not self.polkit:
+            callback()
+            return
+
+        def on_checked(connection, result):
+            try:
+                reply = connection.call_finish(result)
+                authorized, challenge, details = reply.unpack()[0]
+            except GLib.Error as e:
+                logging.error(f"polkit check for {sender} failed: {e.message}")
+                authorized = False
+            if authorized:
+                callback()
+            else:
+                logging.warning(f"{sender} is not authorized for {action}")
+                invocation.return_dbus_error(ERROR_NOT_AUTHORIZED, "Not authorized")
+
+        subject = ("system-bus-name", {"name": GLib.Variant("s", sender)})
+        self.connection.call(
+            POLKIT_NAME,
+            POLKIT_PATH,
+            POLKIT_INTERFACE,
+            "CheckAuthorization",
+            GLib.Variant(
+                "((sa{sv})sa{ss}us)",
+                (subject, action, {}, POLKIT_ALLOW_USER_INTERACTION, ""),
+            ),
+            GLib.VariantType("((bba{ss}))"),
+            Gio.DBusCallFlags.NONE,
+            # Leave time to type a password
+            120000,
+            None,
+            on_checked,
+        )
+
+    def set(self, attr, value, invocation):
+        if attr == "kbd_backlight":
+            try:
+                value = int(value)
+            except ValueError:
+                invocation.return_dbus_error(
+                    ERROR_INVALID_ARGS, f"Invalid brightness: {value}"
+                )
+                return
+            write = self.hw.write_kbd_backlight
+        elif attr == "platform_profile":
+            if value not in self.hw.get_platform_profile_choices():
+                invocation.return_dbus_error(
+                    ERROR_INVALID_ARGS, f"Unknown platform profile: {value}"
+                )
+                return
+            write = self.hw.write_platform_profile
+        elif attr in CONTROL_ATTRS and self.hw.has_attr(attr):
+            write = functools.partial(self.hw.write_value, attr)
+        else:
+            invocation.return_dbus_error(ERROR_INVALID_ARGS, f"Unknown control: {attr}")
+            return
+
+        waiting = self.sets.get(attr)
+        if waiting is None:
+            self.sets[attr] = []
+            self.submit_set(attr, value, write, invocation)
+        else:
+            # One write per attribute at a time, so every call is answered
+            # with the result of its own write
+            waiting.append((value, write, invocation))
+
+    def submit_set(self, attr, value, write, invocation):
+        self.writes.submit(
+            attr,
+            value,
+            write,
+            functools.partial(self.hw.verify_value, attr),
+            functools.partial(self.on_set_done, invocation),
+            0,
+        )
+
+    def on_set_done(self, invocation, attr, value, result):
+        if result is True:
+            invocation.return_value(None)
+        elif result == "permission_denied":
+            invocation.return_dbus_error(
+                ERROR_PERMISSION_DENIED, f"Permission denied writing {attr}"
+            )
+        else:
+            invocation.return_dbus_error(ERROR_FAILED, f"Could not write {attr}")
+
+        waiting = self.sets[attr]
+        if waiting:
+            self.submit_set(attr, *waiting.pop(0))
+        else:
+            del self.sets[attr]
+        # Publish the new value (or the old one again if the write failed)
+        self.monitor.request(attr)
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Samsung Galaxy Book hardware daemon")
+    parser.add_argument(
+        "--address",
+        help="connect to the bus at ADDRESS instead of the system bus",
+    )
+    parser.add_argument(
+        "--no-polkit",
+        action="store_true",
+        help="allow every Set() call, only together with --address",
+    )
+    parser.add_argument(
+        "--interval",
+        type=parse_interval,
+        action="append",
+        default=[],
+        metavar="METRIC=MS",
+        help="sampling interval for fan, cpu, battery or controls",
+    )
+    parser.add_argument(
+        "--fixed-intervals",
+        action="store_true",
+        help="always sample at the --interval rates, instead of faster while "
+        "values move and slower while they don't or on battery",
+    )
+    parser.add_argument(
+        "--rules",
+        default=automation.DEFAULT_PATH,
+        metavar="PATH",
+        help=f"platform profile automation rules (default {automation.DEFAULT_PATH})",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        type=int,
+        metavar="PORT",
+        help="serve Prometheus metrics on 127.0.0.1:PORT/metrics "
+        f"(e.g. {DEFAULT_PORT})",
+    )
+    parser.add_argument(
+        "--metrics-textfile",
+        metavar="PATH",
+        help="write Prometheus metrics to PATH for node_exporter",
+    )
+    parser.add_argument(
+        "--telemetry",
+        default=SYSTEM_PATH,
+        metavar="PATH",
+        help="record the history the application shows to PATH "
+        f"(default {SYSTEM_PATH})",
+    )
+    parser.add_argument(
+        "--no-telemetry",
+        action="store_true",
+        help="record no history, and stop sampling while no window is open",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        choices=LEVELS,
+        default="INFO",
+        help="least severe messages to log (default INFO)",
+    )
+    args = parser.parse_args(argv)
+    if args.no_polkit and args.address is None:
+        parser.error("--no-polkit needs --address")
+
+    # The journal keeps stderr, no log file of our own
+    setup_logging(args.log_level, log_file=False)
+
+    if args.address is None:
+        connection = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+    else:
+        connection = Gio.DBusConnection.new_for_address_sync(
+            args.address,
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+            | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+            None,
+            None,
+        )
+
+    loop = GLib.MainLoop()
+    status = 0
+
+    def on_name_lost():
+        nonlocal status
+        status = 1
+        loop.quit()
+
+    hw = GalaxyBook()
+    exporter = None
+    if args.metrics_port is not None or args.metrics_textfile:
+        try:
+            exporter = MetricsExporter(
+                args.metrics_port,
+                args.metrics_textfile,
+                choices=hw.get_platform_profile_choices(),
+            )
+        except OSError as e:
+            parser.error(f"Cannot serve metrics on port {args.metrics_port}: {e}")
+    telemetry = None if args.no_telemetry else TelemetryStore(args.telemetry)
+    daemon = ControlDaemon(
+        connection,
+        hw,
+        polkit=not args.no_polkit,
+        on_name_lost=on_name_lost,
+        rules_path=args.rules,
+        exporter=exporter,
+        telemetry=telemetry,
+    )
+    for metric, interval in args.interval:
+        daemon.monitor.set_interval(metric, interval)
+    if args.fixed_intervals:
+        daemon.monitor.set_adaptive(False)
+
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        GLib.unix_signal_add(GLib.PRIORITY_DEFAULT, signum, loop.quit)
+
+    daemon.start()
+    try:
+        loop.run()
+    finally:
+        daemon.close()
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
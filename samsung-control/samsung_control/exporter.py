@@ -0,0 +1,242 @@
+"""Prometheus/OpenMetrics exposition of the sampled values.
+
+The body is rendered once per snapshot and kept, so a scrape only copies
+bytes and never touches the hardware. It is served on /metrics over HTTP
+and/or written to a node_exporter textfile, replaced atomically.
+"""
+
+import http.server
+import logging
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_PORT = 9633
+CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+SENSOR_METRICS = {
+    "fan": ("samsung_fan_speed_rpm", "Fan speed in RPM"),
+    "temp": ("samsung_temperature_celsius", "hwmon temperature in degrees Celsius"),
+    "power": ("samsung_power_watts", "hwmon power in watts"),
+}
+# Controls exported as plain numbers
+CONTROL_METRICS = {
+    "charge_control_end_threshold": (
+        "samsung_charge_control_end_threshold_percent",
+        "Battery charge limit in percent, 0 if disabled",
+    ),
+    "usb_charge": ("samsung_usb_charge", "USB charging while off enabled"),
+    "start_on_lid_open": ("samsung_start_on_lid_open", "Power on by lid enabled"),
+    "allow_recording": ("samsung_allow_recording", "Camera and microphone enabled"),
+    "kbd_backlight": (
+        "samsung_kbd_backlight_brightness",
+        "Keyboard backlight brightness level",
+    ),
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+    return "{" + inner + "}"
+
+
+def _number(value):
+    if isinstance(value, bool):
+        return 1 if value else 0
+    if isinstance(value, str):
+        return int(value) if value.lstrip("-").isdigit() else None
+    return value
+
+
+def render(values, choices=(), now=None):
+    """The exposition text for a snapshot's values, as bytes. choices are
+    the platform profiles, each gets a 0/1 sample."""
+    families = []
+
+    def family(name, help_text, samples):
+        samples = [(labels, _number(v)) for labels, v in samples]
+        samples = [(labels, v) for labels, v in samples if v is not None]
+        if samples:
+            families.append((name, help_text, samples))
+
+    sensors = values.get("sensors") or ()
+    for kind, (name, help_text) in SENSOR_METRICS.items():
+        family(
+            name,
+            help_text,
+            [
+                ({"chip": sensor.chip, "sensor": sensor.label}, value)
+                for sensor, value in sensors
+                if sensor.kind == kind
+            ],
+        )
+
+    cpu = values.get("cpu")
+    if cpu is not None:
+        family("samsung_cpu_usage_percent", "Total CPU usage", [({}, cpu.total)])
+        family(
+            "samsung_cpu_core_busy_ratio",
+            "Busy fraction of each core",
+            [({"core": core}, busy) for core, busy in zip(cpu.cores, cpu.busy)],
+        )
+
+    thermal = values.get("thermal")
+    if thermal is not None:
+        family(
+            "samsung_cpu_frequency_mhz",
+            "Current CPU frequency across cores",
+            [
+                ({"stat": "min"}, thermal.freq_min),
+                ({"stat": "avg"}, thermal.freq_avg),
+                ({"stat": "max"}, thermal.freq_max),
+                ({"stat": "limit"}, thermal.limit),
+            ],
+        )
+        family(
+            "samsung_package_temperature_celsius",
+            "CPU package temperature",
+            [({}, thermal.package)],
+        )
+
+    battery = values.get("battery")
+    if battery is not None and battery.capacity is not None:
+        family(
+            "samsung_battery_capacity_percent",
+            "Battery charge level",
+            [({}, battery[0])],
+        )
+        family("samsung_battery_charging", "Battery charging", [({}, battery[1])])
+        family(
+            "samsung_battery_energy_wh",
+            "Battery energy",
+            [
+                ({"stat": "now"}, battery.energy),
+                ({"stat": "full"}, battery.energy_full),
+            ],
+        )
+        family("samsung_battery_power_watts", "Battery power", [({}, battery.power)])
+        family(
+            "samsung_battery_rate_watts",
+            "Smoothed charge or discharge rate",
+            [({}, battery.rate)],
+        )
+        family(
+            "samsung_battery_voltage_volts", "Battery voltage", [({}, battery.voltage)]
+        )
+        family(
+            "samsung_battery_cycle_count",
+            "Battery charge cycles",
+            [({}, battery.cycle_count)],
+        )
+        family(
+            "samsung_battery_time_to_empty_seconds",
+            "Estimated time until empty",
+            [({}, battery.time_to_empty)],
+        )
+        family(
+            "samsung_battery_time_to_full_seconds",
+            "Estimated time until full or the charge threshold",
+            [({}, battery.time_to_full)],
+        )
+
+    if values.get("ac") is not None:
+        family("samsung_ac_online", "AC adapter connected", [({}, values["ac"])])
+
+    for attr, (name, help_text) in CONTROL_METRICS.items():
+        family(name, help_text, [({}, values.get(attr))])
+
+    profile = values.get("platform_profile")
+    if profile is not None:
+        family(
+            "samsung_platform_profile",
+            "Current platform profile",
+            [({"profile": p}, p == profile) for p in (choices or (profile,))],
+        )
+
+    family(
+        "samsung_exporter_last_sample_timestamp_seconds",
+        "When these values were rendered",
+        [({}, time.time() if now is None else now)],
+    )
+
+    lines = []
+    for name, help_text, samples in families:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for labels, value in samples:
+            lines.append(f"{name}{_labels(labels)} {value}")
+    lines.append("# EOF")
+    return ("\n".join(lines) + "\n").encode()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = self.server.exporter.body
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(f"Metrics: {format % args}")
+
+
+class MetricsExporter:
+    """Renders every snapshot once and serves the result.
+
+    port starts an HTTP server on address (loopback by default) in a
+    background thread, textfile is rewritten after every snapshot.
+    """
+
+    def __init__(self, port=None, textfile=None, address="127.0.0.1", choices=()):
+        self.textfile = textfile
+        self.choices = tuple(choices or ())
+        self.body = render({})
+        self.server = None
+        if port is not None:
+            self.server = http.server.ThreadingHTTPServer((address, port), _Handler)
+            self.server.daemon_threads = True
+            self.server.exporter = self
+            threading.Thread(
+                target=self.server.serve_forever, name="metrics", daemon=True
+            ).start()
+            logging.info(f"Serving metrics on http://{address}:{port}/metrics")
+
+    def on_snapshot(self, snapshot):
+        body = render(snapshot.values, self.choices)
+        self.body = body  # Swapped in one step, the server never sees half
+        if self.textfile:
+            self.write_textfile(body)
+
+    def write_textfile(self, body):
+        # node_exporter must never read a partial file: write next to it,
+        # then rename over it
+        directory = os.path.dirname(os.path.abspath(self.textfile))
+        try:
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(body)
+                os.chmod(tmp, 0o644)
+                os.replace(tmp, self.textfile)
+            except Exception:
+                os.unlink(tmp)
+                raise
+        except Exception as e:
+            logging.error(f"Error writing metrics to {self.textfile}: {str(e)}")
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
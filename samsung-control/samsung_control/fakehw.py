@@ -0,0 +1,221 @@
+"""A fake Galaxy Book sysfs tree, for running and benchmarking without the
+hardware.
+
+    python3 -m samsung_control.fakehw /tmp/galaxybook --animate &
+    SAMSUNG_CONTROL_ROOT=/tmp/galaxybook samsung-control.py --no-daemon
+
+The tree has the samsung-galaxybook controls, keyboard backlight,
+platform profile, battery, AC adapter, hwmon fan and temperatures,
+cpufreq, thermal zones and /proc/stat. Values are set with set() or
+scripted as functions of time with script(), advance() moves the clock.
+"""
+
+import argparse
+import math
+import os
+import sys
+import time
+
+from .hardware import GalaxyBook
+
+PROFILE_CHOICES = ("low-power", "quiet", "balanced", "performance")
+
+# Attributes that are ACPI method calls on the real machine, the ones
+# worth slowing down to see what a sluggish firmware does
+ACPI_PATHS = (
+    "dev/samsung-galaxybook/usb_charge",
+    "dev/samsung-galaxybook/start_on_lid_open",
+    "dev/samsung-galaxybook/allow_recording",
+    "sys/class/leds/samsung-galaxybook::kbd_backlight/brightness",
+    "sys/firmware/acpi/platform_profile",
+    "sys/class/power_supply/BAT1/charge_control_end_threshold",
+)
+
+# Jiffies per second in /proc/stat
+USER_HZ = 100
+
+BATTERY_WH = 63.0
+
+
+class FakeGalaxyBook:
+    def __init__(self, root, cpus=16, delays=None):
+        self.root = root
+        self.cpus = cpus
+        # Path below root -> seconds added to every read and write of it
+        self.delays = dict(delays or {})
+        self.scripts = {}
+        self.time = 0.0
+        # user nice system idle iowait irq softirq steal guest guest_nice
+        self.stat = [[0] * 10 for _ in range(cpus)]
+
+    def path(self, relative):
+        return os.path.join(self.root, relative)
+
+    def set(self, relative, value):
+        # Rewritten in place: the app keeps its descriptors open and must
+        # see the new contents, and never an empty file in between
+        data = f"{value}\n".encode()
+        path = self.path(relative)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_CLOEXEC, 0o644)
+        try:
+            os.pwrite(fd, data, 0)
+            os.ftruncate(fd, len(data))
+        finally:
+            os.close(fd)
+
+    def get(self, relative):
+        with open(self.path(relative), "r") as f:
+            return f.read().strip()
+
+    def script(self, relative, func):
+        """Set relative to func(t) on every advance()."""
+        self.scripts[relative] = func
+
+    def create(self):
+        files = {
+            "dev/samsung-galaxybook/usb_charge": 1,
+            "dev/samsung-galaxybook/start_on_lid_open": 0,
+            "dev/samsung-galaxybook/allow_recording": 1,
+            "sys/class/leds/samsung-galaxybook::kbd_backlight/brightness": 1,
+            "sys/class/leds/samsung-galaxybook::kbd_backlight/max_brightness": 3,
+            "sys/class/leds/samsung-galaxybook::kbd_backlight/brightness_hw_changed": 1,
+            "sys/firmware/acpi/platform_profile": "balanced",
+            "sys/firmware/acpi/platform_profile_choices": " ".join(PROFILE_CHOICES),
+            "sys/class/power_supply/BAT1/type": "Battery",
+            "sys/class/power_supply/BAT1/capacity": 80,
+            "sys/class/power_supply/BAT1/status": "Discharging",
+            "sys/class/power_supply/BAT1/uevent": self.battery_uevent(0),
+            "sys/class/power_supply/BAT1/charge_control_end_threshold": 80,
+            "sys/class/power_supply/ADP1/type": "Mains",
+            "sys/class/power_supply/ADP1/online": 0,
+            "sys/class/hwmon/hwmon0/name": "samsung_galaxybook",
+            "sys/class/hwmon/hwmon0/fan1_input": 0,
+            "sys/class/hwmon/hwmon1/name": "coretemp",
+            "sys/class/hwmon/hwmon1/temp1_label": "Package id 0",
+            "sys/class/hwmon/hwmon1/temp1_input": 45000,
+            "sys/class/thermal/thermal_zone0/type": "acpitz",
+            "sys/class/thermal/thermal_zone0/temp": 40000,
+            "sys/class/thermal/thermal_zone1/type": "x86_pkg_temp",
+            "sys/class/thermal/thermal_zone1/temp": 45000,
+        }
+        for cpu in range(self.cpus):
+            cpufreq = f"sys/devices/system/cpu/cpu{cpu}/cpufreq"
+            files[f"{cpufreq}/scaling_cur_freq"] = 800000
+            files[f"{cpufreq}/scaling_max_freq"] = 4700000
+            files[f"{cpufreq}/cpuinfo_max_freq"] = 4700000
+            files[f"sys/class/hwmon/hwmon1/temp{cpu + 2}_label"] = f"Core {cpu}"
+            files[f"sys/class/hwmon/hwmon1/temp{cpu + 2}_input"] = 45000
+
+        for relative, value in files.items():
+            os.makedirs(os.path.dirname(self.path(relative)), exist_ok=True)
+            self.set(relative, value)
+        os.makedirs(self.path("proc"), exist_ok=True)
+        self.write_stat()
+
+        self.script("sys/class/hwmon/hwmon0/fan1_input", self.fan)
+        self.script("sys/class/hwmon/hwmon1/temp1_input", self.package_temp)
+        self.script("sys/class/thermal/thermal_zone1/temp", self.package_temp)
+        self.script("sys/class/power_supply/BAT1/capacity", self.capacity)
+        self.script("sys/class/power_supply/BAT1/uevent", self.battery_uevent)
+        for cpu in range(self.cpus):
+            self.script(
+                f"sys/devices/system/cpu/cpu{cpu}/cpufreq/scaling_cur_freq",
+                lambda t, cpu=cpu: int(800000 + 3900000 * self.load(cpu, t)),
+            )
+            self.script(
+                f"sys/class/hwmon/hwmon1/temp{cpu + 2}_input",
+                lambda t, cpu=cpu: int(40000 + 50000 * self.load(cpu, t)),
+            )
+
+    def load(self, cpu, t):
+        # One core at a time runs hot, the rest idle along
+        busy = 0.1 + 0.05 * math.sin(t / 7 + cpu)
+        if cpu == int(t / 10) % self.cpus:
+            busy = 0.95
+        return busy
+
+    def fan(self, t):
+        return int(2500 + 1500 * math.sin(t / 30)) if t % 120 < 90 else 0
+
+    def package_temp(self, t):
+        return int(45000 + 40000 * max(self.load(cpu, t) for cpu in range(self.cpus)))
+
+    def capacity(self, t):
+        return max(80 - int(t / 60), 5)
+
+    def battery_uevent(self, t):
+        # Draws more while a core is busy
+        watts = 4 + 20 * max(self.load(cpu, t) for cpu in range(self.cpus))
+        capacity = self.capacity(t)
+        return "\n".join(
+            (
+                "POWER_SUPPLY_NAME=BAT1",
+                "POWER_SUPPLY_TYPE=Battery",
+                "POWER_SUPPLY_STATUS=Discharging",
+                "POWER_SUPPLY_PRESENT=1",
+                "POWER_SUPPLY_CYCLE_COUNT=112",
+                "POWER_SUPPLY_VOLTAGE_NOW=16400000",
+                f"POWER_SUPPLY_POWER_NOW={int(watts * 1000000)}",
+                f"POWER_SUPPLY_ENERGY_FULL={int(BATTERY_WH * 1000000)}",
+                f"POWER_SUPPLY_ENERGY_NOW={int(BATTERY_WH * capacity * 10000)}",
+                f"POWER_SUPPLY_CAPACITY={capacity}",
+            )
+        )
+
+    def write_stat(self):
+        total = [sum(column) for column in zip(*self.stat)]
+        lines = ["cpu  " + " ".join(map(str, total))]
+        for cpu, counters in enumerate(self.stat):
+            lines.append(f"cpu{cpu} " + " ".join(map(str, counters)))
+        lines.append("intr 0")
+        lines.append("ctxt 0")
+        self.set("proc/stat", "\n".join(lines))
+
+    def advance(self, seconds=1.0):
+        self.time += seconds
+        jiffies = int(seconds * USER_HZ)
+        for cpu, counters in enumerate(self.stat):
+            busy = int(jiffies * self.load(cpu, self.time))
+            counters[0] += busy * 3 // 4  # user
+            counters[2] += busy - busy * 3 // 4  # system
+            counters[3] += jiffies - busy  # idle
+        self.write_stat()
+        for relative, func in self.scripts.items():
+            self.set(relative, func(self.time))
+
+    def galaxybook(self):
+        """Return a GalaxyBook on this tree, with the delays applied."""
+        hw = GalaxyBook(self.root)
+        hw.sysfs.delays = {
+            self.path(relative): delay for relative, delay in self.delays.items()
+        }
+        return hw
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create a fake Galaxy Book tree")
+    parser.add_argument("root")
+    parser.add_argument("--cpus", type=int, default=16)
+    parser.add_argument(
+        "--animate",
+        action="store_true",
+        help="keep moving the values once a second until interrupted",
+    )
+    args = parser.parse_args(argv)
+
+    fake = FakeGalaxyBook(args.root, args.cpus)
+    fake.create()
+    fake.advance()
+    print(f"SAMSUNG_CONTROL_ROOT={os.path.abspath(args.root)}")
+    if args.animate:
+        try:
+            while True:
+                time.sleep(1)
+                fake.advance()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1979 @@
+import gi
+
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+gi.require_version("Gsk", "4.0")
+gi.require_version("Graphene", "1.0")
+gi.require_version("Pango", "1.0")
+gi.require_version("PangoCairo", "1.0")
+import argparse
+import collections
+import concurrent.futures
+import functools
+import logging
+import math
+import subprocess
+import sys
+import time
+
+from gi.repository import Adw, Gdk, Gio, GLib, Graphene, Gsk, Gtk, Pango
+
+from . import automation, instrument
+from .bus import connect_daemon
+from .hardware import CONTROL_ATTRS, GalaxyBook
+from .history import MinMaxDecimator, RingBuffer, to_points
+from .logs import LEVELS, setup_logging
+from .monitor import Monitor, parse_interval
+from .telemetry import SYSTEM_PATH, TelemetryRecorder, TelemetryStore
+from .writequeue import WriteQueue
+
+
+class FanSpeedGraph(Gtk.DrawingArea):
+    # Selectable time windows in seconds, with the number of grid divisions
+    WINDOWS = {60: 6, 600: 5, 3600: 6}
+
+    def __init__(self):
+        super().__init__()
+        self.set_size_request(400, 200)  # Increased size for better visibility
+        self.set_draw_func(self.draw)
+        # Hours of samples; times are time.monotonic()
+        self.history = RingBuffer(65536)
+        self.decimator = MinMaxDecimator()
+        self.window = 60
+        self.max_speed = 3000  # Initial max speed, will adjust dynamically
+
+        # Grid, labels and the fill gradient only change with the size,
+        # theme or max_speed, so they are rendered once into a surface
+        self.background = None
+        self.background_key = None
+        self.gradient = None
+        self.label_font = Pango.FontDescription.from_string("Sans")
+        self.label_font.set_absolute_size(10 * Pango.SCALE)
+        style_manager = Adw.StyleManager.get_default()
+        style_manager.connect("notify::dark", self.invalidate_background)
+        style_manager.connect("notify::high-contrast", self.invalidate_background)
+        self.connect("notify::scale-factor", self.invalidate_background)
+
+    def add_data_point(self, speed, t=None):
+        self.history.append(time.monotonic() if t is None else t, speed)
+        if speed > self.max_speed:
+            self.max_speed = speed * 1.1  # Add 10% margin
+        self.queue_draw()
+
+    def set_window(self, seconds):
+        self.window = seconds
+        self.queue_draw()
+
+    def format_offset(self, offset):
+        if offset >= 60 and offset % 60 == 0:
+            return f"-{offset // 60}m"
+        return f"-{offset}s"
+
+    def invalidate_background(self, *args):
+        self.background = None
+        self.queue_draw()
+
+    def draw_label(self, cr, text, x, baseline):
+        from gi.repository import PangoCairo
+
+        layout = self.create_pango_layout(text)
+        layout.set_font_description(self.label_font)
+        cr.move_to(x, baseline - layout.get_baseline() / Pango.SCALE)
+        PangoCairo.show_layout(cr, layout)
+
+    def render_background(self, target, width, height):
+        # Imported on first draw, it isn't needed to bring up the window
+        import cairo
+
+        scale = self.get_scale_factor()
+        surface = target.create_similar_image(
+            cairo.FORMAT_ARGB32, width * scale, height * scale
+        )
+        surface.set_device_scale(scale, scale)
+        cr = cairo.Context(surface)
+
+        # Draw background
+        cr.set_source_rgba(0.1, 0.1, 0.1, 0.2)
+        cr.paint()
+
+        # Vertical grid lines (time)
+        divisions = self.WINDOWS[self.window]
+        for i in range(divisions + 1):
+            x = width * i / divisions
+            cr.move_to(x, 0)
+            cr.line_to(x, height - 30)  # Leave space for labels
+
+        # Horizontal grid lines (RPM)
+        steps = 5
+        for i in range(steps + 1):
+            y = (height - 30) * i / steps
+            cr.move_to(0, y)
+            cr.line_to(width, y)
+
+        cr.set_source_rgba(0.3, 0.3, 0.3, 0.5)
+        cr.set_line_width(0.5)
+        cr.stroke()
+
+        # Labels
+        cr.set_source_rgba(0.7, 0.7, 0.7, 0.8)
+        step = self.window // divisions
+        for i in range(divisions):  # Don't label the last line
+            label = self.format_offset(self.window - i * step)
+            self.draw_label(cr, label, width * i / divisions + 5, height - 10)
+        for i in range(steps + 1):
+            y = (height - 30) * i / steps
+            rpm = int(self.max_speed * (steps - i) / steps)
+            self.draw_label(cr, f"{rpm:,} RPM", 5, y + 15)
+
+        surface.flush()
+        self.background = surface
+
+        # Gradient for the area under the curve
+        self.gradient = cairo.LinearGradient(0, 0, 0, height)
+        self.gradient.add_color_stop_rgba(0, 0.2, 0.4, 1.0, 1)  # Samsung blue
+        self.gradient.add_color_stop_rgba(1, 0.2, 0.4, 1.0, 0.1)
+
+    @instrument.timed("draw: fan graph")
+    def draw(self, area, cr, width, height, *args):
+        key = (width, height, self.get_scale_factor(), self.max_speed, self.window)
+        if self.background is None or self.background_key != key:
+            self.render_background(cr.get_target(), width, height)
+            self.background_key = key
+
+        cr.set_source_surface(self.background, 0, 0)
+        cr.paint()
+
+        if not self.history:
+            return
+
+        now = time.monotonic()
+        since = now - self.window
+        if self.history.count_since(since) <= 2 * width:
+            times, values = self.history.window(since)
+        else:
+            # More samples than pixels: draw the min/max of every column,
+            # which keeps the cost proportional to the width
+            self.decimator.update(self.history, since, self.window / width)
+            times, values = self.decimator.series()
+        if len(times) < 2:
+            return
+
+        # Calculate points
+        plot_height = height - 30
+        xs, ys = to_points(
+            times,
+            values,
+            since,
+            width / self.window,
+            plot_height,
+            plot_height / self.max_speed,
+        )
+
+        # Draw graph line
+        cr.set_source_rgb(0.2, 0.4, 1.0)  # Samsung blue
+        cr.set_line_width(2)
+        cr.move_to(xs[0], ys[0])
+        if len(xs) * 8 <= width:
+            # Few points: smooth them with curves
+            for i in range(1, len(xs) - 1):
+                cp1x = xs[i - 1] + (xs[i] - xs[i - 1]) * 0.5
+                cp2x = xs[i] - (xs[i + 1] - xs[i]) * 0.5
+                cr.curve_to(cp1x, ys[i], cp2x, ys[i], xs[i], ys[i])
+            cr.line_to(xs[-1], ys[-1])
+        else:
+            for x, y in zip(xs, ys):
+                cr.line_to(x, y)
+
+        cr.stroke_preserve()
+
+        # Fill area under the curve
+        cr.line_to(xs[-1], height)
+        cr.line_to(xs[0], height)
+        cr.close_path()
+        cr.set_source(self.gradient)
+        cr.fill()
+
+    def create_fan_dashboard(self):
+        card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=16)
+        card.set_vexpand(True)
+
+        # Main content box (horizontal layout)
+        content = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=24)
+
+        # Left side: System info
+        left_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=16)
+
+        # Create a grid for icons and info
+        grid = Gtk.Grid()
+        grid.set_column_spacing(16)
+        grid.set_row_spacing(16)
+
+        # Fan Speed Row
+        self.fan_icon = FanIcon()
+        grid.attach(self.fan_icon, 0, 0, 1, 1)
+
+        fan_info = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        fan_label = Gtk.Label(label="Fan Speed", xalign=0)
+        fan_label.add_css_class("heading")
+        self.fan_speed_label = Gtk.Label(label="Updating...", xalign=0)
+        self.fan_speed_label.add_css_class("value-label")
+        fan_info.append(fan_label)
+        fan_info.append(self.fan_speed_label)
+        grid.attach(fan_info, 1, 0, 1, 1)
+
+        # CPU Usage Row
+        cpu_icon = Gtk.Image.new_from_icon_name("cpu")
+        cpu_icon.set_pixel_size(50)  # Match fan icon size
+        grid.attach(cpu_icon, 0, 1, 1, 1)
+
+        cpu_info = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        cpu_label = Gtk.Label(label="CPU Usage", xalign=0)
+        cpu_label.add_css_class("heading")
+        self.cpu_usage_label = Gtk.Label(label="...", xalign=0)
+        self.cpu_usage_label.add_css_class("value-label")
+        cpu_info.append(cpu_label)
+        cpu_info.append(self.cpu_usage_label)
+        grid.attach(cpu_info, 1, 1, 1, 1)
+
+        # Battery Row
+        self.battery_icon = BatteryIcon()
+        grid.attach(self.battery_icon, 0, 2, 1, 1)
+
+        battery_info = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        battery_label = Gtk.Label(label="Battery", xalign=0)
+        battery_label.add_css_class("heading")
+        self.battery_label = Gtk.Label(label="...", xalign=0)
+        self.battery_label.add_css_class("value-label")
+        battery_info.append(battery_label)
+        battery_info.append(self.battery_label)
+        grid.attach(battery_info, 1, 2, 1, 1)
+
+        left_box.append(grid)
+        content.append(left_box)
+
+        # Right side: Graph
+        right_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        right_box.set_hexpand(True)
+
+        graph_label = Gtk.Label(label="RPM History", xalign=0)
+        graph_label.add_css_class("heading")
+        right_box.append(graph_label)
+
+        self.fan_graph = FanSpeedGraph()
+        right_box.append(self.fan_graph)
+
+        content.append(right_box)
+        card.append(content)
+
+        return self.create_card(card)
+
+    def load_css(self):
+        css_provider = Gtk.CssProvider()
+        css = """
+            .card {
+                background: alpha(@card_bg_color, 0.8);
+                border-radius: 12px;
+                padding: 16px;
+                margin: 8px;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.2);
+            }
+            .heading {
+                font-weight: bold;
+                font-size: 16px;
+                margin-bottom: 4px;
+            }
+            .subtitle {
+                font-size: 13px;
+                color: alpha(@card_fg_color, 0.7);
+            }
+            .value-label {
+                font-size: 28px;
+                font-weight: bold;
+                color: @accent_bg_color;
+            }
+            .samsung-switch switch {
+                background: alpha(@accent_bg_color, 0.1);
+                border: none;
+                min-width: 50px;
+                min-height: 26px;
+            }
+            .samsung-switch switch:checked {
+                background: @accent_bg_color;
+            }
+            .control-box {
+                background: transparent;
+                padding: 12px;
+            }
+            .boxed-list {
+                background: transparent;
+            }
+            .dashboard-title {
+                font-size: 20px;
+                font-weight: bold;
+                color: @accent_bg_color;
+            }
+        """
+        css_provider.load_from_data(css.encode())
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(),
+            css_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
+        )
+
+    def create_card(self, child):
+        card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        card.set_vexpand(True)  # Allow vertical expansion
+        card.add_css_class("card")
+        card.append(child)
+        return card
+
+
+SAMSUNG_BLUE = (0.2, 0.4, 1.0)
+
+# Path commands of record_shapes() and the PathBuilder/cairo calls for them
+_PATH_COMMANDS = {
+    "move": ("move_to", "move_to"),
+    "line": ("line_to", "line_to"),
+    "curve": ("cubic_to", "curve_to"),
+    "close": ("close", "close_path"),
+}
+
+
+def _rgba(color):
+    rgba = Gdk.RGBA()
+    rgba.red, rgba.green, rgba.blue = color[:3]
+    rgba.alpha = color[3] if len(color) > 3 else 1.0
+    return rgba
+
+
+def _rect(x, y, width, height):
+    return Graphene.Rect().init(x, y, width, height)
+
+
+def _rotate(points, angle):
+    cos, sin = math.cos(angle), math.sin(angle)
+    return [(x * cos - y * sin, x * sin + y * cos) for x, y in points]
+
+
+def record_shapes(shapes, bounds):
+    """Draw shapes once into a render node for Gtk.Snapshot.append_node().
+
+    shapes are (kind, color, line_width, commands) with kind "fill" or
+    "stroke" and commands like ("move", x, y), ("curve", x1, y1, x2, y2,
+    x, y), ("rect", x, y, w, h), ("rounded_rect", x, y, w, h, r) or
+    ("circle", x, y, r). With GTK 4.14 they become GskPath nodes the GL
+    renderer draws itself, older versions record them through cairo.
+    bounds (x, y, w, h) only matters for the cairo fallback.
+    """
+    snapshot = Gtk.Snapshot()
+    if hasattr(Gsk, "PathBuilder"):
+        for kind, color, line_width, commands in shapes:
+            builder = Gsk.PathBuilder.new()
+            for command, *args in commands:
+                if command == "rect":
+                    builder.add_rect(_rect(*args))
+                elif command == "rounded_rect":
+                    rounded = Gsk.RoundedRect()
+                    rounded.init_from_rect(_rect(*args[:4]), args[4])
+                    builder.add_rounded_rect(rounded)
+                elif command == "circle":
+                    builder.add_circle(Graphene.Point().init(*args[:2]), args[2])
+                else:
+                    getattr(builder, _PATH_COMMANDS[command][0])(*args)
+            path = builder.to_path()
+            if kind == "fill":
+                snapshot.append_fill(path, Gsk.FillRule.WINDING, _rgba(color))
+            else:
+                snapshot.append_stroke(path, Gsk.Stroke.new(line_width), _rgba(color))
+        return snapshot.to_node()
+
+    cr = snapshot.append_cairo(_rect(*bounds))
+    for kind, color, line_width, commands in shapes:
+        cr.new_path()
+        for command, *args in commands:
+            if command == "rect":
+                cr.rectangle(*args)
+            elif command == "rounded_rect":
+                x, y, width, height, radius = args
+                cr.new_sub_path()
+                cr.arc(x + radius, y + radius, radius, math.pi, 3 * math.pi / 2)
+                cr.arc(x + width - radius, y + radius, radius, 3 * math.pi / 2, 0)
+                cr.arc(x + width - radius, y + height - radius, radius, 0, math.pi / 2)
+                cr.arc(x + radius, y + height - radius, radius, math.pi / 2, math.pi)
+                cr.close_path()
+            elif command == "circle":
+                cr.new_sub_path()
+                cr.arc(*args, 0, 2 * math.pi)
+            else:
+                getattr(cr, _PATH_COMMANDS[command][1])(*args)
+        cr.set_source_rgba(*color[:3], color[3] if len(color) > 3 else 1.0)
+        if kind == "fill":
+            cr.fill()
+        else:
+            cr.set_line_width(line_width)
+            cr.stroke()
+    del cr  # Finishes the recording
+    return snapshot.to_node()
+
+
+class FanIcon(Gtk.Widget):
+    # Center hub and four blades around (0, 0), rotated as a whole
+    node = None
+
+    def __init__(self):
+        super().__init__()
+        self.set_size_request(50, 50)
+        self.rotation = 0
+        self.target_speed = 0
+        self.current_speed = 0
+        # Animate on the frame clock only while the fan is (or is coming to
+        # a stop from) spinning and the icon is visible
+        self.tick_id = None
+        self.last_frame_time = None
+        self.connect("map", lambda widget: self.start_animation())
+        self.connect("unmap", lambda widget: self.stop_animation())
+
+    def set_speed(self, speed):
+        # Convert RPM to rotations per frame (16ms)
+        # RPM / 60 = rotations per second
+        # rotations per second / (1000/16) = rotations per frame
+        self.target_speed = (speed / 60) * (16 / 1000) * 2 * math.pi
+        self.start_animation()
+
+    def settled(self):
+        return self.target_speed == 0 and self.current_speed == 0
+
+    def start_animation(self):
+        if self.tick_id is None and self.get_mapped() and not self.settled():
+            self.last_frame_time = None
+            self.tick_id = self.add_tick_callback(self.update_rotation)
+
+    def stop_animation(self):
+        if self.tick_id is not None:
+            self.remove_tick_callback(self.tick_id)
+            self.tick_id = None
+
+    @instrument.timed("tick: fan icon")
+    def update_rotation(self, widget, frame_clock):
+        # Advance by the number of 16ms frames since the last frame
+        now = frame_clock.get_frame_time()
+        frames = (
+            1 if self.last_frame_time is None else (now - self.last_frame_time) / 16000
+        )
+        frames = min(frames, 10)
+        self.last_frame_time = now
+
+        # Smoothly interpolate current_speed towards target_speed
+        self.current_speed += (self.target_speed - self.current_speed) * (
+            1 - 0.9**frames
+        )
+        if self.target_speed == 0 and abs(self.current_speed) < 1e-4:
+            self.current_speed = 0
+        self.rotation = (self.rotation + self.current_speed * frames) % (2 * math.pi)
+        self.queue_draw()
+
+        if self.settled():
+            self.tick_id = None
+            return False
+        return True
+
+    @classmethod
+    def build_node(cls):
+        shapes = [("fill", SAMSUNG_BLUE, 0, [("circle", 0, 0, 3)])]
+        for i in range(4):
+            # Blade pointing up, turned into place once here
+            p = _rotate(
+                [(0, -3), (8, -8), (12, -15), (0, -20), (-12, -15), (-8, -8), (0, -3)],
+                i * math.pi / 2,
+            )
+            blade = [
+                ("move", *p[0]),
+                ("curve", *p[1], *p[2], *p[3]),
+                ("curve", *p[4], *p[5], *p[6]),
+                ("close",),
+            ]
+            shapes.append(("fill", SAMSUNG_BLUE, 0, blade))
+        cls.node = record_shapes(shapes, (-25, -25, 50, 50))
+
+    @instrument.timed("draw: fan icon")
+    def do_snapshot(self, snapshot):
+        if FanIcon.node is None:
+            FanIcon.build_node()
+        # Only the transform changes between frames
+        snapshot.save()
+        snapshot.translate(
+            Graphene.Point().init(self.get_width() / 2, self.get_height() / 2)
+        )
+        snapshot.rotate(math.degrees(self.rotation))
+        snapshot.append_node(FanIcon.node)
+        snapshot.restore()
+
+
+class BatteryIcon(Gtk.Widget):
+    # Outline and tip, and the charging bolt, in 24x24 coordinates drawn at
+    # twice the size. Only the level bar changes.
+    node = None
+    bolt_node = None
+
+    def __init__(self):
+        super().__init__()
+        self.set_size_request(50, 50)  # Match fan icon size
+        self.percentage = 0
+        self.charging = False
+
+    def update(self, percentage, charging):
+        self.percentage = percentage
+        self.charging = charging
+        self.queue_draw()
+
+    @classmethod
+    def build_nodes(cls):
+        cls.node = record_shapes(
+            [
+                ("stroke", SAMSUNG_BLUE, 2, [("rect", 2, 6, 16, 12)]),
+                ("fill", SAMSUNG_BLUE, 0, [("rect", 18, 9, 4, 6)]),
+            ],
+            (0, 0, 24, 24),
+        )
+        bolt = [(8, 14), (12, 10), (10, 10), (12, 6), (8, 10), (10, 10)]
+        cls.bolt_node = record_shapes(
+            [
+                (
+                    "fill",
+                    (1, 1, 1),
+                    0,
+                    [("move", *bolt[0])]
+                    + [("line", *point) for point in bolt[1:]]
+                    + [("close",)],
+                )
+            ],
+            (0, 0, 24, 24),
+        )
+
+    @instrument.timed("draw: battery icon")
+    def do_snapshot(self, snapshot):
+        if BatteryIcon.node is None:
+            BatteryIcon.build_nodes()
+        snapshot.save()
+        snapshot.scale(2.0, 2.0)  # The shapes were made for 24x24
+        snapshot.append_node(BatteryIcon.node)
+
+        # Fill battery according to percentage
+        if self.percentage > 0:
+            if self.percentage <= 20:
+                color = (0.8, 0.2, 0.2)  # Red
+            elif self.percentage <= 50:
+                color = (0.8, 0.8, 0.2)  # Yellow
+            else:
+                color = (0.2, 0.8, 0.2)  # Green
+            fill_width = max(1, (self.percentage / 100) * 14)
+            snapshot.append_color(_rgba(color), _rect(3, 7, fill_width, 10))
+
+        if self.charging:
+            snapshot.append_node(BatteryIcon.bolt_node)
+        snapshot.restore()
+
+
+class CPUIcon(Gtk.Widget):
+    # Around (0, 0), 40x40 before scaling: the chip outline with its grid,
+    # the pulsing frame and one node per number of lit sections
+    SIZE = 20
+    SECTIONS = 4
+    node = None
+    frame_node = None
+    section_nodes = {}
+
+    def __init__(self):
+        super().__init__()
+        self.set_size_request(50, 50)
+        self.usage = 0
+        self.pulse = 0
+        # Every usage change plays one pulse cycle on the frame clock, then
+        # the outline rests until the next change
+        self.pulse_enabled = True
+        self.pulse_remaining = 0
+        self.tick_id = None
+        self.last_frame_time = None
+        self.connect("map", lambda widget: self.start_animation())
+        self.connect("unmap", lambda widget: self.stop_animation())
+
+    def set_usage(self, usage):
+        """usage is the busy fraction of all cores, 0 to 1."""
+        previous = self.usage
+        self.usage = usage
+        if self.usage != previous:
+            self.pulse_remaining = 2 * math.pi
+            self.start_animation()
+        self.queue_draw()
+
+    def set_pulse_enabled(self, enabled):
+        self.pulse_enabled = enabled
+        if enabled:
+            self.start_animation()
+        else:
+            self.stop_animation()
+            self.pulse = 0
+            self.queue_draw()
+
+    def settled(self):
+        return not self.pulse_enabled or self.usage == 0 or self.pulse_remaining <= 0
+
+    def start_animation(self):
+        if self.tick_id is None and self.get_mapped() and not self.settled():
+            self.last_frame_time = None
+            self.tick_id = self.add_tick_callback(self.update_pulse)
+
+    def stop_animation(self):
+        if self.tick_id is not None:
+            self.remove_tick_callback(self.tick_id)
+            self.tick_id = None
+
+    @instrument.timed("tick: cpu icon")
+    def update_pulse(self, widget, frame_clock):
+        # 0.05 radians per 16ms frame
+        now = frame_clock.get_frame_time()
+        frames = (
+            1 if self.last_frame_time is None else (now - self.last_frame_time) / 16000
+        )
+        self.last_frame_time = now
+
+        step = 0.05 * min(frames, 10)
+        self.pulse_remaining -= step
+        self.pulse = (self.pulse + step) % (2 * math.pi)
+        if self.settled():
+            self.pulse = 0
+        self.queue_draw()
+
+        if self.settled():
+            self.tick_id = None
+            return False
+        return True
+
+    @classmethod
+    def build_nodes(cls):
+        size = cls.SIZE
+        grid = []
+        for offset in (-size / 2, size / 2):
+            grid += [("move", offset, -size), ("line", offset, size)]
+            grid += [("move", -size, offset), ("line", size, offset)]
+        bounds = (-size - 6, -size - 6, 2 * size + 12, 2 * size + 12)
+        cls.node = record_shapes(
+            [
+                (
+                    "stroke",
+                    SAMSUNG_BLUE,
+                    2,
+                    [("rounded_rect", -size, -size, 2 * size, 2 * size, 4)],
+                ),
+                ("stroke", SAMSUNG_BLUE, 1, grid),
+            ],
+            bounds,
+        )
+        # Drawn opaque, the pulse fades it with an opacity node
+        cls.frame_node = record_shapes(
+            [
+                (
+                    "stroke",
+                    SAMSUNG_BLUE,
+                    2,
+                    [("rect", -size - 4, -size - 4, size * 2 + 8, size * 2 + 8)],
+                )
+            ],
+            bounds,
+        )
+
+    @classmethod
+    def sections_node(cls, filled):
+        node = cls.section_nodes.get(filled)
+        if node is None:
+            size, sections = cls.SIZE, cls.SECTIONS
+            section_size = size / 2
+            rects = [
+                (
+                    "rect",
+                    -size + i * section_size + 2,
+                    -size + j * section_size + 2,
+                    section_size - 4,
+                    section_size - 4,
+                )
+                for i in range(sections)
+                for j in range(sections)
+                if i * sections + j < filled
+            ]
+            node = record_shapes(
+                [("fill", SAMSUNG_BLUE, 0, rects)], (-size, -size, 2 * size, 2 * size)
+            )
+            cls.section_nodes[filled] = node
+        return node
+
+    @instrument.timed("draw: cpu icon")
+    def do_snapshot(self, snapshot):
+        if CPUIcon.node is None:
+            CPUIcon.build_nodes()
+        snapshot.save()
+        snapshot.translate(
+            Graphene.Point().init(self.get_width() / 2, self.get_height() / 2)
+        )
+        snapshot.scale(0.8, 0.8)  # Scale down a bit to fit
+        snapshot.append_node(CPUIcon.node)
+
+        if self.usage > 0:
+            # Fill sections based on CPU usage
+            filled = math.ceil(self.usage * self.SECTIONS * self.SECTIONS)
+            snapshot.append_node(CPUIcon.sections_node(filled))
+
+            # Pulsing outline when CPU is active
+            snapshot.push_opacity(0.3 + 0.2 * math.sin(self.pulse))
+            snapshot.append_node(CPUIcon.frame_node)
+            snapshot.pop()
+        snapshot.restore()
+
+
+class CpuHeatmap(Gtk.DrawingArea):
+    """Busy fraction of every core over the last COLUMNS samples, one row
+    per core with the newest sample on the right."""
+
+    COLUMNS = 60
+    ROW_HEIGHT = 6
+    # Cells are drawn in this many shades, one fill per shade
+    LEVELS = 10
+
+    def __init__(self):
+        super().__init__()
+        self.set_hexpand(True)
+        self.set_content_height(self.ROW_HEIGHT)
+        self.set_draw_func(self.draw)
+        self.set_has_tooltip(True)
+        self.connect("query-tooltip", self.on_query_tooltip)
+        self.cores = ()
+        self.columns = collections.deque(maxlen=self.COLUMNS)
+        self.latest = None
+
+    def add_usage(self, usage):
+        if usage.cores != self.cores:
+            self.cores = usage.cores
+            self.columns.clear()
+            self.set_content_height(len(self.cores) * self.ROW_HEIGHT)
+        self.columns.append(usage.busy)
+        self.latest = usage
+        self.queue_draw()
+
+    def on_query_tooltip(self, widget, x, y, keyboard, tooltip):
+        if self.latest is None:
+            return False
+        row = min(int(y / self.get_height() * len(self.cores)), len(self.cores) - 1)
+        usage = self.latest
+        tooltip.set_text(
+            f"CPU {usage.cores[row]}: {usage.busy[row]:.0%} busy\n"
+            f"user {usage.user[row]:.0%}, system {usage.system[row]:.0%}, "
+            f"irq {usage.irq[row]:.0%}, steal {usage.steal[row]:.0%}, "
+            f"iowait {usage.iowait[row]:.0%}"
+        )
+        return True
+
+    @instrument.timed("draw: cpu heatmap")
+    def draw(self, area, cr, width, height, *args):
+        if not self.columns:
+            return
+        cell_width = width / self.COLUMNS
+        cell_height = height / len(self.cores)
+        x0 = width - len(self.columns) * cell_width
+
+        # Collect the cells of each shade first so every shade is one fill
+        shades = [[] for _ in range(self.LEVELS + 1)]
+        for column, busy in enumerate(self.columns):
+            for row, value in enumerate(busy):
+                shades[round(value * self.LEVELS)].append((column, row))
+
+        for level, cells in enumerate(shades):
+            if not cells:
+                continue
+            for column, row in cells:
+                cr.rectangle(
+                    x0 + column * cell_width,
+                    row * cell_height,
+                    max(cell_width - 1, 1),
+                    max(cell_height - 1, 1),
+                )
+            # Samsung blue while idle, red once a core is saturated
+            t = level / self.LEVELS
+            cr.set_source_rgba(0.2 + 0.8 * t, 0.4 * (1 - t), 1.0 - t, 0.15 + 0.85 * t)
+            cr.fill()
+
+
+class SamsungControl(Adw.Application):
+    def __init__(
+        self,
+        bus_address=None,
+        use_daemon=True,
+        startup_trace=False,
+        write_debounce=250,
+        profile=None,
+    ):
+        super().__init__(application_id="org.samsung.control")
+
+        self.style_manager = None
+        self.connect("startup", self.on_startup)
+        self.connect("activate", self.on_activate)
+        self.connect("shutdown", self.on_shutdown)
+
+        # The backend is connected once the window is on screen
+        self.bus_address = bus_address
+        self.use_daemon = use_daemon
+        self.hw = None
+        self.monitor = None
+        self.automation = None
+        self.intervals = []
+        self.adaptive_intervals = True
+        # Control writes run on a worker, slider and spinbutton changes are
+        # coalesced until they have been still for write_debounce ms
+        self.write_debounce = write_debounce
+        self.writes = None
+        self.error_labels = {}
+        # Sampling slows down by this factor while the window is unfocused
+        # and stops while it is hidden or minimized
+        self.unfocused_slowdown = 5
+        self.window = None
+        self.snapshot_handlers = {}
+        self.applied_stamps = {}
+        self.latest_values = {}
+
+        # Rows start as placeholders and are filled in as their hardware
+        # reads come back
+        self.placeholders = {}
+        self.populating = set()
+        self.startup_trace = startup_trace
+        self.first_frame_handler = None
+
+        # Callback, draw and hardware timings, written to profile as JSON
+        # on exit and shown in the debug overlay (Ctrl+Shift+D)
+        self.profile = profile
+        self.debug_label = None
+        self.debug_timer = None
+        self.frame_handlers = []
+        self.paint_started = None
+        if profile:
+            instrument.enable()
+
+        # State tracking
+        self.kbd_backlight_scale = None
+        self.kbd_backlight_handler = None
+        self.profile_dropdown = None
+        self.profile_handler = None
+        self.profiles = []
+        self.control_widgets = {}
+        self.current_kbd_brightness = None
+        self.battery_icon = None
+        self.battery_label = None
+        self.battery_detail = None
+
+        # Fan, temperature, CPU, battery and profile history across
+        # restarts. samsung-controld records it, this process only does
+        # without the daemon.
+        self.telemetry = None
+        self.fan_graph = None
+        self.fan_icon = None
+        self.cpu_usage_label = None
+        self.cpu_icon = None
+        self.cpu_heatmap = None
+        self.frequency_label = None
+        self.frequency_detail = None
+        self.package_temp_label = None
+        self.package_temp_detail = None
+        self.sensor_grid = None
+        self.sensor_labels = []
+        self.sensor_names = None
+
+    def on_daemon_connected(self, client, error):
+        if client is not None:
+            self.telemetry = TelemetryStore(SYSTEM_PATH, readonly=True)
+            self.use_backend(client, client)
+            return
+        logging.warning(
+            "samsung-controld is not available, using the hardware directly: "
+            f"{error.message}"
+        )
+        self.use_backend(*self.direct_backend())
+
+    def direct_backend(self):
+        hw = GalaxyBook()
+        monitor = Monitor(hw)
+        self.telemetry = TelemetryStore()
+        monitor.connect(TelemetryRecorder(self.telemetry).on_snapshot)
+        # samsung-controld runs the automation rules, without it this
+        # process does
+        self.automation = automation.create(hw, write=self.write_automation_profile)
+        if self.automation is not None:
+            monitor.connect(self.automation.on_snapshot)
+        return hw, monitor
+
+    def on_kbd_backlight_changed(self, value):
+        scale = self.kbd_backlight_scale
+        if scale is None:
+            return
+
+        if self.current_kbd_brightness not in (None, value):
+            logging.info(f"Keyboard backlight changed externally: {value}")
+        self.current_kbd_brightness = value
+        scale.handler_block(self.kbd_backlight_handler)
+        scale.set_value(value)
+        scale.handler_unblock(self.kbd_backlight_handler)
+        scale.set_sensitive(True)
+        self.populated("kbd_backlight")
+
+    def on_platform_profile_changed(self, value):
+        if self.profile_dropdown is None or value not in self.profiles:
+            return
+
+        if self.profile_dropdown.get_sensitive():
+            logging.info(f"Platform profile changed externally: {value}")
+        self.profile_dropdown.handler_block(self.profile_handler)
+        self.profile_dropdown.set_selected(self.profiles.index(value))
+        self.profile_dropdown.handler_unblock(self.profile_handler)
+        self.profile_dropdown.set_sensitive(True)
+        self.populated("platform_profile")
+
+    def on_control_changed(self, value, attr):
+        if attr not in self.control_widgets:
+            return  # Row not loaded yet
+        widget, handler_id = self.control_widgets[attr]
+        widget.handler_block(handler_id)
+        if isinstance(widget, Gtk.Switch):
+            widget.set_active(value == "1")
+        else:
+            try:
+                widget.set_value(int(value))
+            except ValueError:
+                logging.warning(f"Invalid value for {attr}: {value}")
+        widget.handler_unblock(handler_id)
+        widget.set_sensitive(True)
+        self.populated(attr)
+
+    def start_backend(self):
+        # Hardware access goes through samsung-controld when it's running or
+        # can be activated, otherwise this process samples sysfs itself.
+        # Activation can take seconds, the main loop keeps running meanwhile.
+        if self.use_daemon:
+            connect_daemon(self.bus_address, self.on_daemon_connected)
+        else:
+            self.use_backend(*self.direct_backend())
+        return False
+
+    def use_backend(self, hw, monitor):
+        self.hw, self.monitor = hw, monitor
+        self.writes = WriteQueue(GLib.idle_add, self.write_debounce / 1000)
+        for metric, interval in self.intervals:
+            self.monitor.set_interval(metric, interval)
+        if not self.adaptive_intervals:
+            self.monitor.set_adaptive(False)
+        self.monitor.connect(self.on_snapshot)
+
+        self.snapshot_handlers["sensors"] = self.show_sensors
+        self.snapshot_handlers["cpu"] = self.show_cpu_usage
+        self.snapshot_handlers["thermal"] = self.show_thermal
+        self.snapshot_handlers["battery"] = self.show_battery
+        self.snapshot_handlers["kbd_backlight"] = self.on_kbd_backlight_changed
+        self.snapshot_handlers["platform_profile"] = self.on_platform_profile_changed
+        for attr in CONTROL_ATTRS:
+            self.snapshot_handlers[attr] = functools.partial(
+                self.on_control_changed, attr=attr
+            )
+        for name, handler in self.snapshot_handlers.items():
+            self.snapshot_handlers[name] = instrument.timed(f"update: {name}", handler)
+
+        self.load_history()
+        # Values come from the first round of samples, which the engine takes
+        # on one thread per sampler. Also follows changes made outside the
+        # app (Fn keys, other tools).
+        self.monitor.start()
+        self.on_window_state_changed()
+        self.populate_rows()
+
+    def populate_rows(self):
+        # What each row needs besides its value (ranges, choices, whether
+        # the attribute exists) is read concurrently on a small pool
+        loaders = {
+            "kbd_backlight": (
+                lambda: (
+                    self.hw.has_attr("kbd_backlight"),
+                    self.hw.read_kbd_backlight_max(),
+                ),
+                self.load_scale_row,
+            ),
+            "platform_profile": (
+                self.hw.get_platform_profile_choices,
+                self.load_dropdown_row,
+            ),
+        }
+        for attr in self.placeholders:
+            if attr not in loaders:
+                loaders[attr] = (
+                    functools.partial(self.hw.has_attr, attr),
+                    self.load_control_row,
+                )
+
+        executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="populate"
+        )
+        for name, (load, apply) in loaders.items():
+            if name not in self.placeholders:
+                continue
+            future = executor.submit(load)
+            future.add_done_callback(
+                lambda future, name=name, apply=apply: GLib.idle_add(
+                    self.on_row_loaded, name, apply, future
+                )
+            )
+        executor.shutdown(wait=False)
+
+    def on_row_loaded(self, name, apply, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            logging.error(f"Error loading {name}: {str(e)}")
+            result = None
+        row, widget, handler_id = self.placeholders[name]
+        if not apply(name, row, widget, handler_id, result):
+            row.set_visible(False)
+            self.populated(name)
+            return False
+
+        # The first sample may have arrived before the row was ready
+        value = self.latest_values.get(name)
+        if value is not None:
+            self.snapshot_handlers[name](value)
+        return False
+
+    def load_scale_row(self, name, row, scale, handler_id, result):
+        if not result or not result[0]:
+            return False
+        scale.set_range(0, result[1])
+        self.kbd_backlight_scale = scale
+        self.kbd_backlight_handler = handler_id
+        return True
+
+    def load_dropdown_row(self, name, row, dropdown, handler_id, profiles):
+        if not profiles:
+            # If no profiles available, show a label instead of dropdown
+            status_label = Gtk.Label(label="Not available")
+            status_label.set_sensitive(False)
+            dropdown.get_parent().append(status_label)
+            dropdown.set_visible(False)
+            self.populated(name)
+            return True
+        dropdown.handler_block(handler_id)
+        dropdown.set_model(Gtk.StringList.new(profiles))
+        dropdown.handler_unblock(handler_id)
+        self.profiles = profiles
+        self.profile_dropdown = dropdown
+        self.profile_handler = handler_id
+        return True
+
+    def load_control_row(self, name, row, widget, handler_id, exists):
+        if not exists:
+            logging.warning(f"Skipping {name} because it does not exist")
+            return False
+        self.control_widgets[name] = (widget, handler_id)
+        return True
+
+    def populated(self, name):
+        if name not in self.populating:
+            return
+        self.populating.discard(name)
+        if not self.populating:
+            self.trace_startup("populated")
+            if self.startup_trace:
+                self.quit()
+
+    def trace_startup(self, event):
+        if self.startup_trace:
+            # CLOCK_MONOTONIC, comparable with the launching process
+            print(f"startup {event} {time.monotonic():.6f}", file=sys.stderr)
+
+    def set_update_interval(self, metric, interval):
+        """Change how often "fan", "cpu", "battery" or "controls" are
+        sampled, in milliseconds."""
+        if self.monitor is None:
+            self.intervals.append((metric, interval))
+        else:
+            self.monitor.set_interval(metric, interval)
+
+    def on_window_state_changed(self, *args):
+        if self.monitor is None:
+            return
+        surface = self.window.get_surface()
+        minimized = surface is not None and bool(
+            surface.get_state() & Gdk.ToplevelState.MINIMIZED
+        )
+        if not self.window.get_mapped() or minimized:
+            self.monitor.pause()
+            return
+
+        if self.window.is_active():
+            self.monitor.set_slowdown(1)
+        else:
+            self.monitor.set_slowdown(self.unfocused_slowdown)
+        self.monitor.resume()
+
+    def on_window_realize(self, window):
+        window.get_surface().connect("notify::state", self.on_window_state_changed)
+        self.first_frame_handler = window.get_frame_clock().connect(
+            "after-paint", self.on_first_frame
+        )
+        if instrument.enabled:
+            self.start_frame_timing()
+
+    def start_frame_timing(self):
+        clock = self.window.get_frame_clock()
+        if self.frame_handlers or clock is None:
+            return
+        self.frame_handlers = [
+            clock.connect("before-paint", self.on_before_paint),
+            clock.connect("after-paint", self.on_after_paint),
+        ]
+
+    def stop_frame_timing(self):
+        clock = self.window.get_frame_clock()
+        for handler_id in self.frame_handlers:
+            clock.disconnect(handler_id)
+        self.frame_handlers = []
+
+    def on_before_paint(self, clock):
+        self.paint_started = time.perf_counter()
+
+    def on_after_paint(self, clock):
+        if self.paint_started is not None:
+            instrument.record("frame", time.perf_counter() - self.paint_started)
+        frame_time = clock.get_frame_time()
+        refresh_interval = clock.get_refresh_info(frame_time)[0]
+        instrument.frames.add(frame_time / 1e6, refresh_interval / 1e6)
+
+    def on_debug_overlay(self, action, parameter):
+        if self.debug_label is None:
+            return
+        visible = not self.debug_label.get_visible()
+        self.debug_label.set_visible(visible)
+        if visible:
+            instrument.enable()
+            self.start_frame_timing()
+            self.update_debug_overlay()
+            self.debug_timer = GLib.timeout_add(1000, self.update_debug_overlay)
+        else:
+            GLib.source_remove(self.debug_timer)
+            self.debug_timer = None
+            if not self.profile:
+                # Nobody is looking, stop paying for the timing
+                instrument.disable()
+                self.stop_frame_timing()
+
+    def update_debug_overlay(self):
+        self.debug_label.set_text(instrument.format_report())
+        return True
+
+    def on_first_frame(self, clock):
+        clock.disconnect(self.first_frame_handler)
+        self.trace_startup("first-frame")
+        # Connect the backend only now, so nothing delays the first frame
+        GLib.idle_add(self.start_backend)
+
+    @instrument.timed("callback: snapshot")
+    def on_snapshot(self, snapshot):
+        for name, stamp in snapshot.stamps.items():
+            if self.applied_stamps.get(name) == stamp:
+                continue
+            self.applied_stamps[name] = stamp
+            # The first CPU sample is None, it only sets the baseline for
+            # the next one, a row counts as populated once sampled at all
+            self.populated(name)
+
+            value = snapshot.values[name]
+            if value is None:
+                continue  # Could not be read, keep showing the last value
+
+            self.latest_values[name] = value
+            if self.writes is not None and self.writes.busy(name):
+                continue  # Don't move a control the user is changing
+            handler = self.snapshot_handlers.get(name)
+            if handler is not None:
+                handler(value)
+
+    def load_history(self):
+        # Start the fan graph with what was recorded while the window was
+        # closed, before the first live sample arrives
+        if self.fan_graph is None:
+            return
+        now = time.time()
+        offset = time.monotonic() - now
+        start = now - max(FanSpeedGraph.WINDOWS)
+        for slot in self.telemetry.query("fan", start, now):
+            self.fan_graph.add_data_point(slot.avg, slot.time + offset)
+
+    def create_scale_row(self, title, subtitle, name):
+        row = Gtk.ListBoxRow()
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+
+        header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        title_label = Gtk.Label(label=title, xalign=0)
+        title_label.add_css_class("heading")
+        header_box.append(title_label)
+
+        subtitle_label = Gtk.Label(label=subtitle, xalign=0)
+        subtitle_label.add_css_class("subtitle")
+
+        # The range is set once the maximum brightness has been read
+        scale = Gtk.Scale.new_with_range(Gtk.Orientation.HORIZONTAL, 0, 1, 1)
+        scale.set_draw_value(True)
+        scale.set_value_pos(Gtk.PositionType.RIGHT)
+        scale.set_size_request(200, -1)  # Set minimum width for better usability
+        scale.set_sensitive(False)
+        handler_id = scale.connect(
+            "value-changed", self.on_scale_changed, "kbd_backlight/brightness"
+        )
+        self.add_placeholder(name, row, scale, handler_id)
+
+        box.append(header_box)
+        box.append(subtitle_label)
+        box.append(scale)
+        row.set_child(box)
+        return row
+
+    def add_placeholder(self, name, row, widget, handler_id):
+        self.placeholders[name] = (row, widget, handler_id)
+        self.populating.add(name)
+
+    def create_switch_row(self, title, subtitle, attr):
+        row = Gtk.ListBoxRow()
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        box.add_css_class("control-box")
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+
+        label_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        title_label = Gtk.Label(label=title, xalign=0)
+        title_label.add_css_class("heading")
+        subtitle_label = Gtk.Label(label=subtitle, xalign=0)
+        subtitle_label.add_css_class("subtitle")
+
+        label_box.append(title_label)
+        label_box.append(subtitle_label)
+
+        switch = Gtk.Switch()
+        switch.set_valign(Gtk.Align.CENTER)
+        switch.add_css_class("samsung-switch")
+
+        switch.set_sensitive(False)
+
+        handler_id = switch.connect("notify::active", self.on_switch_activated, attr)
+        self.add_placeholder(attr, row, switch, handler_id)
+
+        box.append(label_box)
+        box.append(switch)
+        row.set_child(box)
+        return row
+
+    def create_spinbutton_row(self, title, subtitle, attr, min_val, max_val):
+        row = Gtk.ListBoxRow()
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+
+        header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        title_label = Gtk.Label(label=title, xalign=0)
+        title_label.add_css_class("heading")
+        header_box.append(title_label)
+
+        subtitle_label = Gtk.Label(label=subtitle, xalign=0)
+        subtitle_label.add_css_class("subtitle")
+
+        error_label = Gtk.Label(label="", xalign=0)
+        error_label.add_css_class("error")
+        error_label.set_visible(False)
+
+        spinbutton = Gtk.SpinButton()
+        spinbutton.set_adjustment(
+            Gtk.Adjustment(value=80, lower=min_val, upper=max_val, step_increment=1)
+        )
+        spinbutton.set_sensitive(False)
+
+        handler_id = spinbutton.connect(
+            "value-changed", self.on_spinbutton_changed, attr
+        )
+        self.add_placeholder(attr, row, spinbutton, handler_id)
+        self.error_labels[attr] = error_label
+
+        box.append(header_box)
+        box.append(subtitle_label)
+        box.append(error_label)
+        box.append(spinbutton)
+        row.set_child(box)
+        return row
+
+    def create_dropdown_row(self, title, subtitle):
+        row = Gtk.ListBoxRow()
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+
+        header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
+        title_label = Gtk.Label(label=title, xalign=0)
+        title_label.add_css_class("heading")
+        header_box.append(title_label)
+
+        subtitle_label = Gtk.Label(label=subtitle, xalign=0)
+        subtitle_label.add_css_class("subtitle")
+
+        # The choices are filled in once they have been read
+        dropdown = Gtk.DropDown.new_from_strings([])
+        dropdown.set_sensitive(False)
+        handler_id = dropdown.connect("notify::selected", self.on_profile_changed)
+        self.add_placeholder("platform_profile", row, dropdown, handler_id)
+
+        box.append(header_box)
+        box.append(subtitle_label)
+        box.append(dropdown)
+        row.set_child(box)
+        return row
+
+    def create_fan_speed_row(self):
+        row = Gtk.ListBoxRow()
+        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        box.set_margin_top(6)
+        box.set_margin_bottom(6)
+        box.set_margin_start(12)
+        box.set_margin_end(12)
+
+        label_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        title_label = Gtk.Label(label="Fan Speed", xalign=0)
+        title_label.add_css_class("heading")
+        self.fan_speed_label = Gtk.Label(label="Updating...", xalign=0)
+        self.fan_speed_label.add_css_class("subtitle")
+
+        label_box.append(title_label)
+        label_box.append(self.fan_speed_label)
+
+        box.append(label_box)
+        row.set_child(box)
+        return row
+
+    def show_sensors(self, readings):
+        fans = [value for sensor, value in readings if sensor.kind == "fan"]
+        if not fans:
+            self.fan_speed_label.set_text("Not available")
+        elif fans[0] is None:
+            self.fan_speed_label.set_text("Error reading fan speed")
+        else:
+            speed = fans[0]
+            self.fan_speed_label.set_text(f"{speed} RPM")
+            if self.fan_graph:
+                self.fan_graph.add_data_point(speed)
+            if self.fan_icon:
+                self.fan_icon.set_speed(speed)
+
+        if self.sensor_grid is None:
+            return
+
+        names = [sensor.name for sensor, value in readings]
+        if names != self.sensor_names:
+            # Sensors were rescanned, rebuild the rows
+            while (child := self.sensor_grid.get_first_child()) is not None:
+                self.sensor_grid.remove(child)
+            self.sensor_labels = []
+            for i, name in enumerate(names):
+                name_label = Gtk.Label(label=name, xalign=0)
+                name_label.add_css_class("subtitle")
+                value_label = Gtk.Label(label="...", xalign=1)
+                value_label.set_hexpand(True)
+                self.sensor_grid.attach(name_label, 0, i, 1, 1)
+                self.sensor_grid.attach(value_label, 1, i, 1, 1)
+                self.sensor_labels.append(value_label)
+            self.sensor_names = names
+
+        for (sensor, value), label in zip(readings, self.sensor_labels):
+            label.set_text("N/A" if value is None else sensor.format(value))
+
+    def on_switch_activated(self, switch, gparam, attr):
+        if attr == "kbd_backlight/brightness":
+            # Use max brightness (3) when turning on
+            value = 3 if switch.get_active() else 0
+            self.queue_write("kbd_backlight", value, self.hw.write_kbd_backlight, 0)
+        else:
+            value = "1" if switch.get_active() else "0"
+            self.queue_write(
+                attr, value, functools.partial(self.hw.write_value, attr), 0
+            )
+
+    def on_spinbutton_changed(self, spinbutton, attr):
+        self.queue_write(
+            attr,
+            str(int(spinbutton.get_value())),
+            functools.partial(self.hw.write_value, attr),
+        )
+
+    def write_automation_profile(self, profile):
+        # Rules fire on the GTK thread, the write goes to the worker like
+        # one made from the dropdown
+        self.queue_write("platform_profile", profile, self.hw.write_platform_profile, 0)
+        return True
+
+    def on_profile_changed(self, dropdown, gparam):
+        selected = dropdown.get_selected()
+        if 0 <= selected < len(self.profiles):
+            self.queue_write(
+                "platform_profile",
+                self.profiles[selected],
+                self.hw.write_platform_profile,
+                0,
+            )
+
+    def on_scale_changed(self, scale, attr):
+        if attr == "kbd_backlight/brightness":
+            self.queue_write(
+                "kbd_backlight", int(scale.get_value()), self.hw.write_kbd_backlight
+            )
+
+    def queue_write(self, name, value, write, delay=None):
+        # Switches and the dropdown pass delay=0, only continuous controls
+        # are debounced
+        self.writes.submit(
+            name,
+            value,
+            write,
+            functools.partial(self.hw.verify_value, name),
+            self.on_write_done,
+            delay,
+        )
+
+    def on_write_done(self, name, value, result):
+        error_label = self.error_labels.get(name)
+        if result is True:
+            if name == "kbd_backlight":
+                self.current_kbd_brightness = value
+            if error_label is not None:
+                error_label.set_visible(False)
+        else:
+            if error_label is not None:
+                if result == "not_authorized":
+                    error_label.set_text("Authorization was refused.")
+                elif result == "permission_denied":
+                    error_label.set_text(
+                        "Permission denied. Run the program with sudo."
+                    )
+                else:
+                    error_label.set_text("Could not change the setting.")
+                error_label.set_visible(True)
+            # Roll back to the last value the hardware reported
+            value = self.latest_values.get(name)
+            handler = self.snapshot_handlers.get(name)
+            if value is not None and handler is not None:
+                handler(value)
+        # Not every attribute notifies about writes, sample it again
+        self.monitor.request(name)
+        return False
+
+    def on_activate(self, app):
+        # Create main window using Adwaita
+        window = Adw.ApplicationWindow(application=app)
+        window.set_title("Samsung Galaxy Book Control")
+        window.set_default_size(800, 800)  # Increased window size
+        self.window = window
+
+        # Slow down or stop sampling while nobody is looking
+        window.connect("realize", self.on_window_realize)
+        window.connect("map", self.on_window_state_changed)
+        window.connect("unmap", self.on_window_state_changed)
+        window.connect("notify::is-active", self.on_window_state_changed)
+
+        # Set dark theme preference
+        style_manager = Adw.StyleManager.get_default()
+        style_manager.set_color_scheme(Adw.ColorScheme.FORCE_DARK)
+
+        # Load custom CSS
+        self.load_css()
+
+        # Main layout using Adwaita's widgets
+        main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+
+        # Header bar with title
+        header = Adw.HeaderBar()
+        title = Adw.WindowTitle()
+        title.set_title("Samsung Galaxy Book Control")
+        title.set_subtitle("System Controls")
+        header.set_title_widget(title)
+        main_box.append(header)
+
+        # Scrolled content
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scrolled.set_vexpand(True)  # Allow vertical expansion
+
+        content_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        content_box.set_margin_top(16)
+        content_box.set_margin_bottom(16)
+        content_box.set_margin_start(16)
+        content_box.set_margin_end(16)
+        content_box.set_spacing(16)  # Add spacing between elements
+
+        # Create a clamp for better content width control
+        clamp = Adw.Clamp()
+        clamp.set_maximum_size(1000)  # Increased maximum size
+        clamp.set_tightening_threshold(800)  # Increased threshold
+
+        # Add fan dashboard
+        content_box.append(self.create_fan_dashboard())
+
+        # Add other controls in cards
+        controls_box = Gtk.ListBox()
+        controls_box.add_css_class("boxed-list")
+        controls_box.set_selection_mode(Gtk.SelectionMode.NONE)
+        controls_box.set_vexpand(True)  # Allow vertical expansion
+
+        # Rest of your controls...
+        controls_box.append(
+            self.create_scale_row(
+                "Keyboard Backlight",
+                "Adjust keyboard backlight brightness (can also use Fn+F9)",
+                "kbd_backlight",
+            )
+        )
+
+        controls_box.append(
+            self.create_spinbutton_row(
+                "Battery Threshold",
+                "Set battery charge threshold (0 = disabled)",
+                "charge_control_end_threshold",
+                0,
+                100,
+            )
+        )
+
+        controls_box.append(
+            self.create_switch_row(
+                "USB Charging",
+                "Allow USB ports to provide power when laptop is off",
+                "usb_charge",
+            )
+        )
+
+        controls_box.append(
+            self.create_switch_row(
+                "Start on Lid Open",
+                "Automatically start laptop when opening lid",
+                "start_on_lid_open",
+            )
+        )
+
+        controls_box.append(
+            self.create_switch_row(
+                "Allow Recording",
+                "Allow access to camera and microphone",
+                "allow_recording",
+            )
+        )
+
+        controls_box.append(
+            self.create_dropdown_row(
+                "Performance Mode",
+                "Select system performance profile",
+            )
+        )
+
+        card = self.create_card(controls_box)
+        content_box.append(card)
+
+        clamp.set_child(content_box)
+        scrolled.set_child(clamp)
+        main_box.append(scrolled)
+
+        # Timing overlay, toggled with Ctrl+Shift+D
+        overlay = Gtk.Overlay()
+        overlay.set_child(main_box)
+        self.debug_label = Gtk.Label(xalign=0)
+        self.debug_label.add_css_class("debug-overlay")
+        self.debug_label.set_halign(Gtk.Align.END)
+        self.debug_label.set_valign(Gtk.Align.END)
+        self.debug_label.set_can_target(False)
+        self.debug_label.set_visible(False)
+        overlay.add_overlay(self.debug_label)
+        action = Gio.SimpleAction.new("debug-overlay", None)
+        action.connect("activate", self.on_debug_overlay)
+        self.add_action(action)
+        self.set_accels_for_action("app.debug-overlay", ["<Control><Shift>d"])
+
+        window.set_content(overlay)
+        # Everything that touches the hardware starts after the first frame
+        self.populating.update(("sensors", "cpu", "thermal", "battery"))
+        window.present()
+
+    def on_startup(self, app):
+        # Adwaita is initialized by the application's own startup handler
+        self.style_manager = Adw.StyleManager.get_default()
+        # Set color scheme to prefer dark
+        self.style_manager.set_color_scheme(Adw.ColorScheme.FORCE_DARK)
+
+    def on_shutdown(self, app):
+        if self.writes is not None:
+            self.writes.close()  # Finishes pending writes
+        if self.monitor is not None:
+            self.monitor.close()
+            self.hw.close()
+        if self.telemetry is not None:
+            self.telemetry.close()
+        if self.profile:
+            try:
+                instrument.dump(self.profile)
+                logging.info(f"Wrote profile to {self.profile}")
+            except Exception as e:
+                logging.error(f"Error writing profile: {str(e)}")
+
+    def load_css(self):
+        css_provider = Gtk.CssProvider()
+        css = """
+            .card {
+                background: alpha(@card_bg_color, 0.8);
+                border-radius: 12px;
+                padding: 16px;
+                margin: 8px;
+                box-shadow: 0 2px 4px rgba(0,0,0,0.2);
+            }
+            .heading {
+                font-weight: bold;
+                font-size: 16px;
+                margin-bottom: 4px;
+            }
+            .subtitle {
+                font-size: 13px;
+                color: alpha(@card_fg_color, 0.7);
+            }
+            .value-label {
+                font-size: 28px;
+                font-weight: bold;
+                color: @accent_bg_color;
+            }
+            .samsung-switch switch {
+                background: alpha(@accent_bg_color, 0.1);
+                border: none;
+                min-width: 50px;
+                min-height: 26px;
+            }
+            .samsung-switch switch:checked {
+                background: @accent_bg_color;
+            }
+            .control-box {
+                background: transparent;
+                padding: 12px;
+            }
+            .boxed-list {
+                background: transparent;
+            }
+            .debug-overlay {
+                font-family: monospace;
+                font-size: 11px;
+                background: alpha(black, 0.75);
+                color: white;
+                padding: 8px;
+                margin: 8px;
+                border-radius: 6px;
+            }
+            .dashboard-title {
+                font-size: 20px;
+                font-weight: bold;
+                color: @accent_bg_color;
+            }
+        """
+        css_provider.load_from_data(css.encode())
+        Gtk.StyleContext.add_provider_for_display(
+            Gdk.Display.get_default(),
+            css_provider,
+            Gtk.STYLE_PROVIDER_PRIORITY_APPLICATION,
+        )
+
+    def create_card(self, child):
+        card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
+        card.set_vexpand(True)  # Allow vertical expansion
+        card.add_css_class("card")
+        card.append(child)
+        return card
+
+    def create_fan_dashboard(self):
+        card = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=16)
+        card.set_vexpand(True)
+
+        # Main content box (horizontal layout)
+        content = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=24)
+
+        # Left side: System info
+        left_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=16)
+
+        # Create a grid for icons and info
+        grid = Gtk.Grid()
+        grid.set_column_spacing(16)
+        grid.set_row_spacing(16)
+
+        # Fan Speed Row
+        self.fan_icon = FanIcon()
+        grid.attach(self.fan_icon, 0, 0, 1, 1)
+
+        fan_info = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        fan_label = Gtk.Label(label="Fan Speed", xalign=0)
+        fan_label.add_css_class("heading")
+        self.fan_speed_label = Gtk.Label(label="Updating...", xalign=0)
+        self.fan_speed_label.add_css_class("value-label")
+        fan_info.append(fan_label)
+        fan_info.append(self.fan_speed_label)
+        grid.attach(fan_info, 1, 0, 1, 1)
+
+        # CPU Usage Row
+        self.cpu_icon = CPUIcon()
+        grid.attach(self.cpu_icon, 0, 1, 1, 1)
+
+        cpu_info = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        cpu_label = Gtk.Label(label="CPU Usage", xalign=0)
+        cpu_label.add_css_class("heading")
+        self.cpu_usage_label = Gtk.Label(label="...", xalign=0)
+        self.cpu_usage_label.add_css_class("value-label")
+        cpu_info.append(cpu_label)
+        cpu_info.append(self.cpu_usage_label)
+        grid.attach(cpu_info, 1, 1, 1, 1)
+
+        # Battery Row
+        self.battery_icon = BatteryIcon()
+        grid.attach(self.battery_icon, 0, 2, 1, 1)
+
+        battery_info = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        battery_label = Gtk.Label(label="Battery", xalign=0)
+        battery_label.add_css_class("heading")
+        self.battery_label = Gtk.Label(label="...", xalign=0)
+        self.battery_label.add_css_class("value-label")
+        self.battery_detail = Gtk.Label(label="", xalign=0)
+        self.battery_detail.add_css_class("subtitle")
+        battery_info.append(battery_label)
+        battery_info.append(self.battery_label)
+        battery_info.append(self.battery_detail)
+        grid.attach(battery_info, 1, 2, 1, 1)
+
+        left_box.append(grid)
+        content.append(left_box)
+
+        # Right side: Graph
+        right_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=8)
+        right_box.set_hexpand(True)
+
+        # Clock speed and package temperature, to tell a profile capping
+        # the clocks from the chip throttling itself
+        stats = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=24)
+        stats.set_homogeneous(True)
+        box, self.frequency_label, self.frequency_detail = self.create_stat(
+            "CPU Frequency"
+        )
+        stats.append(box)
+        box, self.package_temp_label, self.package_temp_detail = self.create_stat(
+            "Package Temperature"
+        )
+        stats.append(box)
+        right_box.append(stats)
+
+        graph_header = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        graph_label = Gtk.Label(label="RPM History", xalign=0)
+        graph_label.add_css_class("heading")
+        graph_label.set_hexpand(True)
+        graph_header.append(graph_label)
+
+        self.fan_graph = FanSpeedGraph()
+
+        windows = list(FanSpeedGraph.WINDOWS)
+        window_dropdown = Gtk.DropDown.new_from_strings(["1 min", "10 min", "1 h"])
+        window_dropdown.set_valign(Gtk.Align.CENTER)
+        window_dropdown.connect(
+            "notify::selected",
+            lambda dropdown, _: self.fan_graph.set_window(
+                windows[dropdown.get_selected()]
+            ),
+        )
+        graph_header.append(window_dropdown)
+        right_box.append(graph_header)
+        right_box.append(self.fan_graph)
+
+        cores_label = Gtk.Label(label="CPU Cores", xalign=0)
+        cores_label.add_css_class("heading")
+        right_box.append(cores_label)
+
+        self.cpu_heatmap = CpuHeatmap()
+        right_box.append(self.cpu_heatmap)
+
+        sensors_label = Gtk.Label(label="Sensors", xalign=0)
+        sensors_label.add_css_class("heading")
+        right_box.append(sensors_label)
+
+        self.sensor_grid = Gtk.Grid()
+        self.sensor_grid.set_column_spacing(16)
+        self.sensor_grid.set_row_spacing(4)
+        right_box.append(self.sensor_grid)
+
+        content.append(right_box)
+        card.append(content)
+
+        return self.create_card(card)
+
+    def create_stat(self, title):
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        title_label = Gtk.Label(label=title, xalign=0)
+        title_label.add_css_class("heading")
+        value_label = Gtk.Label(label="...", xalign=0)
+        value_label.add_css_class("value-label")
+        detail_label = Gtk.Label(label="", xalign=0)
+        detail_label.add_css_class("subtitle")
+        box.append(title_label)
+        box.append(value_label)
+        box.append(detail_label)
+        return box, value_label, detail_label
+
+    def show_thermal(self, thermal):
+        if self.frequency_label is None:
+            return
+
+        if thermal.freq_avg is None:
+            self.frequency_label.set_text("Not available")
+            self.frequency_detail.set_text("")
+        else:
+            self.frequency_label.set_text(f"{thermal.freq_avg / 1000:.2f} GHz avg")
+            detail = (
+                f"{thermal.freq_min / 1000:.2f} – {thermal.freq_max / 1000:.2f} GHz"
+            )
+            if thermal.hw_max and thermal.limit < thermal.hw_max:
+                detail += (
+                    f", capped at {thermal.limit / 1000:.2f} of "
+                    f"{thermal.hw_max / 1000:.2f} GHz"
+                )
+            self.frequency_detail.set_text(detail)
+
+        if thermal.package is not None:
+            self.package_temp_label.set_text(f"{thermal.package:.1f} °C")
+        elif thermal.zones:
+            self.package_temp_label.set_text("No package sensor")
+        else:
+            self.package_temp_label.set_text("Not available")
+        readings = [v for t, v in thermal.zones if v is not None]
+        if readings:
+            self.package_temp_detail.set_text(
+                f"{len(thermal.zones)} zones, hottest {max(readings):.1f} °C"
+            )
+
+    def show_cpu_usage(self, usage):
+        if self.cpu_usage_label:
+            # The busiest core shows single-thread saturation the total hides
+            self.cpu_usage_label.set_text(
+                f"{usage.total:.1f}% (max core {max(usage.busy, default=0):.0%})"
+            )
+            if self.cpu_icon is not None:
+                self.cpu_icon.set_usage(usage.total / 100)
+            if self.cpu_heatmap is not None:
+                self.cpu_heatmap.add_usage(usage)
+
+    def show_battery(self, info):
+        if self.battery_icon and self.battery_label:
+            if info.capacity is None:
+                # A desktop replacement or a battery that was removed
+                self.battery_label.set_text("No battery")
+                self.battery_detail.set_text("")
+                self.battery_icon.update(0, False)
+                return
+            self.battery_icon.update(info.capacity, info.charging)
+            status = "Charging" if info.charging else "Battery"
+            self.battery_label.set_text(f"{status}: {info.capacity}%")
+
+            # The rate follows the current profile, so does the estimate
+            if info.time_to_empty is not None:
+                detail = f"{format_duration(info.time_to_empty)} left"
+            elif info.time_to_full is not None:
+                detail = f"Charged in {format_duration(info.time_to_full)}"
+            else:
+                detail = info.status if info.status != "Discharging" else ""
+            if info.rate:
+                detail += f" at {info.rate:.1f} W" if detail else f"{info.rate:.1f} W"
+            self.battery_detail.set_text(detail)
+
+
+def format_duration(seconds):
+    minutes = int(seconds // 60)
+    if minutes < 60:
+        return f"{minutes} min"
+    return f"{minutes // 60} h {minutes % 60:02d} min"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Samsung Galaxy Book Control")
+    parser.add_argument(
+        "--interval",
+        type=parse_interval,
+        action="append",
+        default=[],
+        metavar="METRIC=MS",
+        help="sampling interval for fan, cpu, battery or controls",
+    )
+    parser.add_argument(
+        "--fixed-intervals",
+        action="store_true",
+        help="always sample at the --interval rates, instead of faster while "
+        "values move and slower while they don't or on battery",
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="access the hardware directly instead of through samsung-controld",
+    )
+    parser.add_argument(
+        "--bus-address",
+        metavar="ADDRESS",
+        help="reach samsung-controld on the bus at ADDRESS instead of the system bus",
+    )
+    parser.add_argument(
+        "--log-level",
+        type=str.upper,
+        choices=LEVELS,
+        default="INFO",
+        help="least severe messages to log (default INFO)",
+    )
+    parser.add_argument(
+        "--write-debounce",
+        type=int,
+        default=250,
+        metavar="MS",
+        help="wait until a slider or spin button has been still this long "
+        "before writing it (default 250)",
+    )
+    parser.add_argument(
+        "--startup-trace",
+        action="store_true",
+        help="print when the first frame is drawn and when every row is "
+        "populated, then quit",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="time callbacks, drawing and hardware access and write the "
+        "latency histograms to FILE as JSON on exit (- for stdout)",
+    )
+    args, gtk_args = parser.parse_known_args()
+
+    setup_logging(args.log_level)
+    app = SamsungControl(
+        args.bus_address,
+        not args.no_daemon,
+        args.startup_trace,
+        args.write_debounce,
+        args.profile,
+    )
+    for metric, interval in args.interval:
+        app.set_update_interval(metric, interval)
+    app.adaptive_intervals = not args.fixed_intervals
+    return app.run([sys.argv[0]] + gtk_args)
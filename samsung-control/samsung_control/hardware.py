@@ -0,0 +1,272 @@
+import logging
+import os
+
+from .battery import Battery
+from .cpu import CpuStat
+from .hwmon import HWMON_ROOT, HwmonRegistry
+from .power_supply import POWER_SUPPLY_ROOT, PowerSupplyRegistry
+from .sysfs import REOPEN_ERRNOS, SysfsReader
+from .thermal import CPU_ROOT, THERMAL_ROOT, ThermalSampler
+
+# Attributes of the samsung-galaxybook driver that are simple on/off or
+# numeric controls, read and written through read_value()/write_value()
+CONTROL_ATTRS = (
+    "charge_control_end_threshold",
+    "usb_charge",
+    "start_on_lid_open",
+    "allow_recording",
+)
+
+
+class GalaxyBook:
+    """Read and write access to the Galaxy Book hardware attributes.
+
+    This has no GUI dependencies so it can be driven from the sampling
+    engine's worker threads.
+
+    Every path is looked up below root, $SAMSUNG_CONTROL_ROOT by default,
+    so it can be pointed at a fake tree (see fakehw.py).
+    """
+
+    def __init__(self, root=None):
+        if root is None:
+            root = os.environ.get("SAMSUNG_CONTROL_ROOT", "")
+        self.root = root.rstrip("/")
+
+        # Base paths
+        self.base_path = f"{self.root}/dev/samsung-galaxybook"
+        self.platform_profile_path = f"{self.root}/sys/firmware/acpi/platform_profile"
+        self.kbd_backlight_paths = [
+            f"{self.root}/sys/class/leds/samsung-galaxybook::kbd_backlight/brightness",
+            f"{self.root}/dev/samsung-galaxybook/kbd_backlight/brightness",
+        ]
+
+        # Attribute descriptors stay open between samples
+        self.sysfs = SysfsReader()
+        self.hwmon = HwmonRegistry(self.sysfs, self.root + HWMON_ROOT)
+        self.cpu = CpuStat(self.sysfs, f"{self.root}/proc/stat")
+        self.thermal = ThermalSampler(
+            self.sysfs, self.root + CPU_ROOT, self.root + THERMAL_ROOT
+        )
+        # Batteries and adapters are found once, not assumed to be BAT1
+        self.power_supplies = PowerSupplyRegistry(
+            self.sysfs, self.root + POWER_SUPPLY_ROOT
+        )
+        self.battery = Battery(self.sysfs, self.power_supplies)
+
+        self.platform_profile_choices = None
+
+    def close(self):
+        self.sysfs.close()
+
+    def attr_path(self, attr):
+        if attr == "charge_control_end_threshold":
+            # On the battery, None if no battery has it
+            return self.power_supplies.battery_attr_path(attr)
+        return f"{self.base_path}/{attr}"
+
+    def has_attr(self, attr):
+        if attr == "kbd_backlight":
+            return any(os.path.exists(path) for path in self.kbd_backlight_paths)
+        if attr == "platform_profile":
+            return os.path.exists(self.platform_profile_path)
+        path = self.attr_path(attr)
+        return path is not None and os.path.exists(path)
+
+    def read_value(self, attr):
+        try:
+            path = self.attr_path(attr)
+            logging.debug(f"Attempting to read from {path}")
+            value = self.sysfs.read(path)
+            logging.debug(f"Read value: {value}")
+            if attr == "charge_control_end_threshold" and value.isdigit():
+                # Time to full counts up to the threshold
+                self.battery.threshold = int(value)
+            return value
+        except Exception as e:
+            logging.error(f"Error reading {attr}: {str(e)}")
+            return None
+
+    def write_value(self, attr, value):
+        try:
+            path = self.attr_path(attr)
+            logging.info(f"Attempting to write {value} to {path}")
+            self.sysfs.write(path, value)
+            logging.info("Write successful")
+            if attr == "charge_control_end_threshold":
+                self.battery.threshold = int(value)
+            return True
+        except PermissionError:
+            logging.error(
+                f"Permission denied when writing to {attr}. "
+                "Try running the program with sudo."
+            )
+            return "permission_denied"
+        except Exception as e:
+            logging.error(f"Error writing to {attr}: {str(e)}")
+            return False
+
+    def verify_value(self, attr, value):
+        """Read attr ("kbd_backlight", "platform_profile" or a control)
+        back and return whether it holds value. Uses its own descriptor,
+        the cached ones belong to the sampling threads."""
+        if attr == "kbd_backlight":
+            paths = [p for p in self.kbd_backlight_paths if os.path.exists(p)]
+            path = paths[0] if paths else None
+        elif attr == "platform_profile":
+            path = self.platform_profile_path
+        else:
+            path = self.attr_path(attr)
+        try:
+            with open(path, "r") as f:
+                return f.read().strip() == str(value)
+        except Exception as e:
+            logging.error(f"Error verifying {attr}: {str(e)}")
+            return False
+
+    def read_kbd_backlight_max(self):
+        for base_path in self.kbd_backlight_paths:
+            max_path = base_path.replace("brightness", "max_brightness")
+            try:
+                with open(max_path, "r") as f:
+                    return int(f.read().strip())
+            except Exception as e:
+                logging.warning(
+                    f"Could not read max brightness from {max_path}: {str(e)}"
+                )
+        return 3  # Default max brightness if we can't read it
+
+    def read_kbd_backlight(self):
+        for path in self.kbd_backlight_paths:
+            try:
+                logging.debug(f"Trying to read keyboard backlight from {path}")
+                value = self.sysfs.read_int(path)
+                logging.debug(f"Read keyboard backlight value: {value}")
+                return value
+            except Exception as e:
+                # Normal when an earlier path doesn't exist on this model
+                logging.debug(f"Could not read from {path}: {str(e)}")
+        logging.error("Failed to read keyboard backlight from any path")
+        return None
+
+    def write_kbd_backlight(self, value):
+        success = False
+        for path in self.kbd_backlight_paths:
+            try:
+                logging.info(
+                    f"Trying to write keyboard backlight value {value} to {path}"
+                )
+                self.sysfs.write(path, value)
+                success = True
+                logging.info("Write successful")
+                break
+            except Exception as e:
+                logging.warning(f"Could not write to {path}: {str(e)}")
+
+        if not success:
+            logging.error("Failed to write keyboard backlight to any path")
+        return success
+
+    def read_platform_profile(self):
+        try:
+            logging.debug(f"Reading platform profile from {self.platform_profile_path}")
+            value = self.sysfs.read(self.platform_profile_path)
+            logging.debug(f"Read platform profile: {value}")
+            # Discharge rates are tracked per profile
+            self.battery.profile = value
+            return value
+        except Exception as e:
+            logging.error(f"Error reading platform profile: {str(e)}")
+            return None
+
+    def write_platform_profile(self, value):
+        try:
+            logging.info(
+                f"Writing platform profile {value} to {self.platform_profile_path}"
+            )
+            self.sysfs.write(self.platform_profile_path, value)
+            logging.info("Write successful")
+            return True
+        except Exception as e:
+            logging.error(f"Error writing platform profile: {str(e)}")
+            return False
+
+    def get_platform_profile_choices(self):
+        # The choices are fixed by the driver, read them only once
+        if self.platform_profile_choices is not None:
+            return self.platform_profile_choices
+        try:
+            path = f"{self.root}/sys/firmware/acpi/platform_profile_choices"
+            logging.info(f"Reading platform profile choices from {path}")
+            with open(path, "r") as f:
+                choices = f.read().strip().split()
+                logging.info(f"Available profiles: {choices}")
+                self.platform_profile_choices = choices
+                return choices
+        except Exception as e:
+            logging.error(f"Error reading platform profile choices: {str(e)}")
+            return []
+
+    def read_cpu_usage(self):
+        """Return a CpuUsage since the previous call, None on the first."""
+        try:
+            return self.cpu.sample()
+        except Exception as e:
+            logging.error(f"Error reading CPU usage: {str(e)}")
+            return None
+
+    def read_thermal(self):
+        """Return a Thermal with CPU frequencies and zone temperatures."""
+        try:
+            return self.thermal.sample()
+        except Exception as e:
+            logging.error(f"Error reading CPU frequency and temperature: {str(e)}")
+            return None
+
+    def read_battery_info(self):
+        """Return a BatteryInfo with the time estimates, None if the
+        battery could not be read."""
+        try:
+            return self.battery.sample()
+        except Exception as e:
+            logging.error(f"Error reading battery info: {str(e)}")
+            return None
+
+    def read_ac_online(self):
+        """Return whether any adapter (mains or USB-C) is supplying power,
+        None without one."""
+        try:
+            adapters = self.power_supplies.adapters()
+            if not adapters:
+                return None
+            return any(
+                self.sysfs.read_int(os.path.join(adapter.path, "online")) == 1
+                for adapter in adapters
+            )
+        except Exception as e:
+            logging.error(f"Error reading AC state: {str(e)}")
+            return None
+
+    def kbd_backlight_notify_path(self):
+        # LED class devices flagged LED_BRIGHT_HW_CHANGED notify on this
+        # attribute when the firmware changes the brightness (Fn+F9)
+        for path in self.kbd_backlight_paths:
+            notify_path = os.path.join(os.path.dirname(path), "brightness_hw_changed")
+            if os.path.exists(notify_path):
+                return notify_path
+        return None
+
+    def read_sensors(self):
+        """Return (sensor, value) for every hwmon sensor, value is None if
+        the sensor could not be read."""
+        readings = []
+        for sensor in self.hwmon.sensors():
+            try:
+                value = sensor.read()
+            except OSError as e:
+                value = None
+                if e.errno in REOPEN_ERRNOS:
+                    # The hwmon device went away (module reload, hotplug)
+                    self.hwmon.invalidate()
+            readings.append((sensor, value))
+        return tuple(readings)
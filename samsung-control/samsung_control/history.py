@@ -0,0 +1,151 @@
+import bisect
+import collections
+import math
+from array import array
+
+# numpy is imported on the first to_points() call, not at startup
+numpy = False
+
+
+class RingBuffer:
+    """Fixed-capacity (time, value) series stored in two array("d") rings.
+
+    Times must be appended in increasing order (time.monotonic()), which
+    keeps both halves of the ring sorted and lets window() find its start by
+    bisection instead of scanning.
+    """
+
+    def __init__(self, capacity=65536):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.start = 0
+        self.length = 0
+
+    def __len__(self):
+        return self.length
+
+    def append(self, t, value):
+        i = (self.start + self.length) % self.capacity
+        if self.length < self.capacity:
+            self.length += 1
+        else:
+            self.start = (self.start + 1) % self.capacity
+        self.times[i] = t
+        self.values[i] = value
+
+    def clear(self):
+        self.start = 0
+        self.length = 0
+
+    def _find(self, t, find=bisect.bisect_left):
+        # Logical index of the first sample at or after (bisect_left) or
+        # strictly after (bisect_right) t
+        end = self.start + self.length
+        if end <= self.capacity:
+            return find(self.times, t, self.start, end) - self.start
+        if self.times[self.capacity - 1] >= t:
+            return find(self.times, t, self.start, self.capacity) - self.start
+        wrapped = find(self.times, t, 0, end - self.capacity)
+        return self.capacity - self.start + wrapped
+
+    def _slice(self, first):
+        i = (self.start + first) % self.capacity
+        count = self.length - first
+        if i + count <= self.capacity:
+            return self.times[i : i + count], self.values[i : i + count]
+        rest = i + count - self.capacity
+        return (
+            self.times[i:] + self.times[:rest],
+            self.values[i:] + self.values[:rest],
+        )
+
+    def count_since(self, since):
+        return self.length - self._find(since)
+
+    def after(self, t):
+        """Return (times, values) of the samples strictly newer than t."""
+        if not self.length:
+            return array("d"), array("d")
+        return self._slice(self._find(t, bisect.bisect_right))
+
+    def window(self, since):
+        """Return (times, values) arrays of the samples at or after since,
+        plus the one before it so the line can be drawn into the window."""
+        if not self.length:
+            return array("d"), array("d")
+
+        return self._slice(max(self._find(since) - 1, 0))
+
+
+class MinMaxDecimator:
+    """Min/max of a RingBuffer per time bucket, kept up to date incrementally.
+
+    Buckets are aligned to absolute time (t // width) rather than to the
+    right edge of the graph, so they stay valid while the window scrolls:
+    each update only folds in the samples appended since the last one and
+    drops buckets that scrolled out. The full series is only walked again
+    when the bucket width changes (resize or a different time window).
+    """
+
+    def __init__(self):
+        self.width = None
+        self.buckets = collections.deque()
+        self.last = -math.inf
+
+    def update(self, ring, since, width):
+        if width != self.width:
+            self.width = width
+            self.buckets.clear()
+            self.last = -math.inf
+            times, values = ring.window(since)
+        else:
+            times, values = ring.after(self.last)
+
+        buckets = self.buckets
+        for t, v in zip(times, values):
+            index = t // width
+            if buckets and buckets[-1][0] == index:
+                bucket = buckets[-1]
+                if v < bucket[1]:
+                    bucket[1] = v
+                elif v > bucket[2]:
+                    bucket[2] = v
+            else:
+                buckets.append([index, v, v])
+        if times:
+            self.last = times[-1]
+
+        first = since // width
+        while buckets and buckets[0][0] < first:
+            buckets.popleft()
+
+    def series(self):
+        """Return (times, values) with the min and max of every bucket,
+        placed at the bucket's center."""
+        times = array("d")
+        values = array("d")
+        for index, low, high in self.buckets:
+            t = (index + 0.5) * self.width
+            times.extend((t, t))
+            values.extend((low, high))
+        return times, values
+
+
+def to_points(times, values, t0, x_scale, y0, y_scale):
+    """Map a series to widget coordinates: x = (t - t0) * x_scale,
+    y = y0 - v * y_scale. Returns (xs, ys) sequences."""
+    global numpy
+    if numpy is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+    if numpy is not None:
+        t = numpy.frombuffer(times, dtype=numpy.float64)
+        v = numpy.frombuffer(values, dtype=numpy.float64)
+        return ((t - t0) * x_scale).tolist(), (y0 - v * y_scale).tolist()
+    return (
+        [(t - t0) * x_scale for t in times],
+        [y0 - v * y_scale for v in values],
+    )
@@ -0,0 +1,163 @@
+import logging
+import os
+import re
+import threading
+
+HWMON_ROOT = "/sys/class/hwmon"
+
+_INPUT_RE = re.compile(r"^(fan|temp|power)(\d+)_input$")
+
+
+class Sensor:
+    kind = None
+    unit = ""
+    scale = 1
+
+    def __init__(self, reader, chip, index, path, label):
+        self.reader = reader
+        self.chip = chip
+        self.index = index
+        self.path = path
+        self.label = label
+
+    @property
+    def name(self):
+        return f"{self.chip} {self.label}"
+
+    def read(self):
+        return self.reader.read_int(self.path) / self.scale
+
+    def format(self, value):
+        return f"{value:.1f} {self.unit}"
+
+
+class FanSensor(Sensor):
+    kind = "fan"
+    unit = "RPM"
+
+    def read(self):
+        return self.reader.read_int(self.path)
+
+    def format(self, value):
+        return f"{value} {self.unit}"
+
+
+class TemperatureSensor(Sensor):
+    kind = "temp"
+    unit = "°C"
+    scale = 1000  # millidegree Celsius
+
+
+class PowerSensor(Sensor):
+    kind = "power"
+    unit = "W"
+    scale = 1000000  # microwatt
+
+
+SENSOR_TYPES = {cls.kind: cls for cls in (FanSensor, TemperatureSensor, PowerSensor)}
+
+
+class HwmonRegistry:
+    """Index of every fan, temperature and power input under /sys/class/hwmon.
+
+    The hwmon tree is only walked when the registry is first used and again
+    after invalidate(), which is called when a sensor disappears or the
+    hwmon devices are hotplugged. invalidate() only marks the registry, the
+    rescan happens on the next lookup from whichever thread samples it,
+    under a lock so two threads never rescan at once.
+    """
+
+    def __init__(self, reader, root=HWMON_ROOT):
+        self.reader = reader
+        self.root = root
+        self._sensors = None
+        self._index = {}
+        self.stale = False
+        self.generation = 0
+        self.lock = threading.RLock()
+
+    def invalidate(self):
+        self.stale = True
+
+    def scan(self):
+        with self.lock:
+            return self._scan()
+
+    def _scan(self):
+        if self._sensors is not None:
+            for sensor in self._sensors:
+                self.reader.forget(sensor.path)
+        self.stale = False
+
+        sensors = []
+        try:
+            devices = sorted(os.listdir(self.root), key=_natural_key)
+        except OSError as e:
+            logging.error(f"Error listing {self.root}: {str(e)}")
+            devices = []
+
+        for device in devices:
+            device_path = os.path.join(self.root, device)
+            chip = _read_text(os.path.join(device_path, "name")) or device
+            try:
+                entries = os.listdir(device_path)
+            except OSError:
+                continue
+
+            for entry in sorted(entries, key=_natural_key):
+                match = _INPUT_RE.match(entry)
+                if match is None:
+                    continue
+                kind, index = match.group(1), int(match.group(2))
+                label = _read_text(os.path.join(device_path, f"{kind}{index}_label"))
+                sensors.append(
+                    SENSOR_TYPES[kind](
+                        self.reader,
+                        chip,
+                        index,
+                        os.path.join(device_path, entry),
+                        label or f"{kind}{index}",
+                    )
+                )
+
+        self._sensors = sensors
+        self._index = {(s.chip, s.label): s for s in sensors}
+        self.generation += 1
+        logging.info(f"Found {len(sensors)} hwmon sensors: {[s.name for s in sensors]}")
+        return sensors
+
+    def sensors(self, kind=None):
+        with self.lock:
+            if self._sensors is None or self.stale:
+                self._scan()
+            sensors = self._sensors
+        if kind is None:
+            return sensors
+        return [s for s in sensors if s.kind == kind]
+
+    def fans(self):
+        return self.sensors("fan")
+
+    def temperatures(self):
+        return self.sensors("temp")
+
+    def powers(self):
+        return self.sensors("power")
+
+    def get(self, chip, label):
+        with self.lock:
+            if self._sensors is None or self.stale:
+                self._scan()
+            return self._index.get((chip, label))
+
+
+def _read_text(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
@@ -0,0 +1,161 @@
+"""Latency histograms for callbacks, drawing and hardware access.
+
+Recording is off until enable() is called. Until then a timed() function
+costs a single flag check per call, and nothing is stored.
+"""
+
+import functools
+import json
+import threading
+import time
+
+# Bucket i counts durations of at least 2**(i - 1) and below 2**i
+# microseconds, the last one everything longer
+BUCKETS = 24
+
+# Frames closer together than this are one continuous animation, a
+# longer gap is the frame clock going idle rather than missed frames
+CONTINUOUS = 0.1
+
+enabled = False
+histograms = {}
+_lock = threading.Lock()
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        index = min(int(seconds * 1e6).bit_length(), BUCKETS - 1)
+        self.counts[index] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding fraction of all durations."""
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(2**index / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.percentile(0.5) * 1000,
+            "p90_ms": self.percentile(0.9) * 1000,
+            "p99_ms": self.percentile(0.99) * 1000,
+            "max_ms": self.max * 1000,
+            "buckets_us": {
+                f"<{2**index}": count
+                for index, count in enumerate(self.counts)
+                if count
+            },
+        }
+
+
+class FrameStats:
+    """Frame intervals and missed frames from a frame clock's timestamps."""
+
+    def __init__(self):
+        self.frames = 0
+        self.missed = 0
+        self.last = None
+
+    def add(self, frame_time, refresh_interval):
+        """frame_time and refresh_interval in seconds."""
+        self.frames += 1
+        if self.last is not None:
+            interval = frame_time - self.last
+            if 0 < interval < CONTINUOUS:
+                record("frame interval", interval)
+                if refresh_interval:
+                    self.missed += max(round(interval / refresh_interval) - 1, 0)
+        self.last = frame_time
+
+    def reset(self):
+        self.last = None
+
+
+frames = FrameStats()
+
+
+def enable():
+    global enabled
+    enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+    frames.reset()
+
+
+def record(name, seconds):
+    with _lock:
+        histogram = histograms.get(name)
+        if histogram is None:
+            histogram = histograms[name] = Histogram()
+        histogram.add(seconds)
+
+
+def timed(name, func=None):
+    """Record how long every call of func takes under name. Without func,
+    returns a decorator."""
+    if func is None:
+        return functools.partial(timed, name)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not enabled:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(name, time.perf_counter() - start)
+
+    return wrapper
+
+
+def report():
+    with _lock:
+        summaries = {name: h.summary() for name, h in sorted(histograms.items())}
+    return {
+        "histograms": summaries,
+        "frames": {"count": frames.frames, "missed": frames.missed},
+    }
+
+
+def format_report():
+    """The report as a text table, for the debug overlay."""
+    lines = [f"frames {frames.frames}  missed {frames.missed}"]
+    lines.append(f"{'':24}{'n':>7}{'p50':>9}{'p99':>9}{'max':>9}")
+    with _lock:
+        items = sorted(histograms.items())
+        for name, h in items:
+            lines.append(
+                f"{name[:24]:24}{h.count:>7}{h.percentile(0.5) * 1000:>7.2f}ms"
+                f"{h.percentile(0.99) * 1000:>7.2f}ms{h.max * 1000:>7.2f}ms"
+            )
+    return "\n".join(lines)
+
+
+def dump(path):
+    """Write the report as JSON to path, "-" for stdout."""
+    text = json.dumps(report(), indent=2)
+    if path == "-":
+        print(text)
+        return
+    with open(path, "w") as f:
+        f.write(text + "\n")
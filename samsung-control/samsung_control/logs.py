@@ -0,0 +1,91 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR")
+LOG_PATHS = ("/var/log/samsung-control.log", "/tmp/samsung-control.log")
+MAX_BYTES = 1024 * 1024
+BACKUP_COUNT = 3
+
+
+class RepeatSuppressingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to a QueueListener, dropping a record that repeats the
+    previous one (same logger, level and message) for up to
+    repeat_interval seconds. How many were dropped is logged before the
+    next record that gets through."""
+
+    def __init__(self, queue, repeat_interval=60):
+        super().__init__(queue)
+        self.repeat_interval = repeat_interval
+        self.last_key = None
+        self.last_time = 0
+        self.repeats = 0
+
+    def emit(self, record):
+        # Called with the handler lock held
+        key = (record.name, record.levelno, record.getMessage())
+        if (
+            key == self.last_key
+            and record.created - self.last_time < self.repeat_interval
+        ):
+            self.repeats += 1
+            return
+
+        if self.repeats:
+            super().emit(
+                logging.makeLogRecord(
+                    {
+                        "name": self.last_key[0],
+                        "levelno": self.last_key[1],
+                        "levelname": logging.getLevelName(self.last_key[1]),
+                        "msg": f"Previous message repeated {self.repeats} times",
+                        "created": record.created,
+                    }
+                )
+            )
+        self.last_key = key
+        self.last_time = record.created
+        self.repeats = 0
+        super().emit(record)
+
+
+def setup_logging(level="INFO", log_file=True):
+    """Log to stderr and, with log_file, to a size-rotated file. Handlers
+    run on a QueueListener thread so callers never wait on I/O."""
+    formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s")
+
+    # Console handler
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    handlers = [console_handler]
+
+    # File handler - try to create in /var/log first, fall back to /tmp
+    for log_path in LOG_PATHS if log_file else ():
+        try:
+            file_handler = logging.handlers.RotatingFileHandler(
+                log_path, maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT
+            )
+            file_handler.setFormatter(formatter)
+            handlers.append(file_handler)
+            break
+        except PermissionError:
+            continue
+        except Exception as e:
+            print(f"Error setting up logging to {log_path}: {e}", file=sys.stderr)
+            continue
+    else:
+        if log_file:
+            print("Warning: Could not set up file logging", file=sys.stderr)
+
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(records, *handlers)
+    listener.start()
+    # Flushes what is still queued on exit
+    atexit.register(listener.stop)
+
+    logger = logging.getLogger()
+    logger.setLevel(level)
+    logger.addHandler(RepeatSuppressingQueueHandler(records))
+    return listener
@@ -0,0 +1,292 @@
+import argparse
+import functools
+import logging
+
+from gi.repository import GLib
+
+from .adaptive import VolatilityTracker
+from .hardware import CONTROL_ATTRS
+from .sampler import SamplingEngine
+from .scheduler import TickScheduler
+from .uevent import UeventListener
+
+INTERVAL_METRICS = ("fan", "cpu", "battery", "controls")
+# Samplers on adaptive intervals -> the attribute holding their interval
+ADAPTIVE_SAMPLERS = {
+    "sensors": "fan_update_interval",
+    "cpu": "cpu_update_interval",
+    "thermal": "cpu_update_interval",
+    "battery": "battery_update_interval",
+}
+
+
+def parse_interval(value):
+    metric, sep, interval = value.partition("=")
+    if not sep or metric not in INTERVAL_METRICS:
+        raise argparse.ArgumentTypeError(
+            "expected fan|cpu|battery|controls=MILLISECONDS"
+        )
+    return metric, int(interval)
+
+
+class Monitor:
+    """Samples a GalaxyBook on a schedule and publishes Snapshots.
+
+    The samplers are named "sensors", "cpu", "thermal", "battery", "ac",
+    "kbd_backlight", "platform_profile" and one per CONTROL_ATTRS entry
+    the machine has. samsung-controld runs one Monitor for all of its
+    clients; the GUI runs its own when the daemon isn't available.
+    """
+
+    def __init__(self, hw, dispatch=GLib.idle_add):
+        self.hw = hw
+
+        # Update intervals (in milliseconds)
+        self.fan_update_interval = 2000
+        # Battery updates come from uevents, the timer is only a fallback
+        self.battery_update_interval = 5000
+        self.cpu_update_interval = 2000
+        # Controls without change notification are polled starting at this
+        # interval, backing off while they don't change
+        self.control_update_interval = 1000
+        self.control_poll_max_interval = 30000
+        # Fans, CPU and polled battery readings speed up to
+        # min_update_interval while they move and back off up to
+        # max_update_factor times their interval while they hold still
+        self.adaptive = True
+        self.min_update_interval = 1000
+        self.max_update_factor = 8
+        # On battery every interval is stretched by this factor, and moving
+        # values only bring a metric back to its own interval
+        self.battery_budget = 2
+        self.volatility = VolatilityTracker()
+
+        # All hardware reads run on the sampling engine's threads, results
+        # come back to the main loop as snapshots
+        self.engine = SamplingEngine(hw.sysfs, dispatch)
+        self.engine.connect(self.on_snapshot)
+        # One shared timer decides what to sample when
+        self.scheduler = TickScheduler(self.on_tick)
+        self.polled_controls = []
+        self.stamps = {}
+        self.values = {}
+        self.uevents = None
+        self.on_ac = None
+
+    def connect(self, callback):
+        self.engine.connect(callback)
+
+    def add_control_sampler(self, name, func, notify_path=None, rearm=True):
+        # Controls the kernel can't notify about are polled with backoff
+        if not self.engine.add_sampler(
+            name, func, notify_path=notify_path, rearm=rearm
+        ):
+            self.polled_controls.append(name)
+            self.scheduler.set_interval(
+                name, self.control_update_interval, self.control_poll_max_interval
+            )
+
+    def start(self):
+        self.engine.add_sampler("sensors", self.hw.read_sensors)
+        self.engine.add_sampler("cpu", self.hw.read_cpu_usage)
+        self.engine.add_sampler("thermal", self.hw.read_thermal)
+        self.engine.add_sampler("battery", self.hw.read_battery_info)
+        self.engine.add_sampler("ac", self.hw.read_ac_online)
+
+        # Keyboard backlight: the LED class raises sysfs_notify on
+        # brightness_hw_changed when Fn+F9 is pressed
+        if self.hw.has_attr("kbd_backlight"):
+            self.add_control_sampler(
+                "kbd_backlight",
+                self.hw.read_kbd_backlight,
+                notify_path=self.hw.kbd_backlight_notify_path(),
+            )
+
+        # platform_profile notifies on every change, including Fn+F11
+        if self.hw.has_attr("platform_profile"):
+            self.add_control_sampler(
+                "platform_profile",
+                self.hw.read_platform_profile,
+                notify_path=self.hw.platform_profile_path,
+                rearm=False,
+            )
+
+        for attr in CONTROL_ATTRS:
+            if self.hw.has_attr(attr):
+                self.add_control_sampler(
+                    attr, functools.partial(self.hw.read_value, attr)
+                )
+
+        self.engine.start()
+        self.engine.request(*self.engine.samplers)
+
+        self.schedule("sensors", self.fan_update_interval)
+        self.schedule("cpu", self.cpu_update_interval)
+        # Frequencies and temperatures follow the CPU interval
+        self.schedule("thermal", self.cpu_update_interval)
+
+        # Battery, AC and hotplug changes arrive as kernel uevents
+        if not self.listen_uevents():
+            self.schedule("battery", self.battery_update_interval)
+            self.scheduler.set_interval("ac", self.battery_update_interval)
+
+    def schedule(self, name, interval):
+        if self.adaptive:
+            self.scheduler.set_interval(
+                name,
+                interval,
+                interval * self.max_update_factor,
+                min(self.min_update_interval, interval),
+            )
+        else:
+            self.scheduler.set_interval(name, interval)
+
+    def set_interval(self, metric, interval):
+        """Change how often "fan", "cpu", "battery" or "controls" are
+        sampled, in milliseconds."""
+        if metric == "fan":
+            self.fan_update_interval = interval
+            if "sensors" in self.scheduler.metrics:
+                self.schedule("sensors", interval)
+        elif metric == "cpu":
+            self.cpu_update_interval = interval
+            if "cpu" in self.scheduler.metrics:
+                self.schedule("cpu", interval)
+                self.schedule("thermal", interval)
+        elif metric == "battery":
+            self.battery_update_interval = interval
+            if "battery" in self.scheduler.metrics:
+                self.schedule("battery", interval)
+                self.scheduler.set_interval("ac", interval)
+        elif metric == "controls":
+            self.control_update_interval = interval
+            for name in self.polled_controls:
+                self.scheduler.set_interval(
+                    name, interval, self.control_poll_max_interval
+                )
+        else:
+            raise ValueError(f"Unknown metric: {metric}")
+
+    def set_adaptive(self, enabled):
+        """Sample fan, cpu and battery at their fixed intervals (False) or
+        faster while they move and slower while they don't (True)."""
+        self.adaptive = enabled
+        self.set_on_battery(enabled and self.values.get("ac") is False)
+        for name, attr in ADAPTIVE_SAMPLERS.items():
+            if name in self.scheduler.metrics:
+                self.schedule(name, getattr(self, attr))
+
+    def request(self, *names):
+        self.engine.request(*names)
+
+    def pause(self):
+        self.scheduler.pause()
+
+    def resume(self):
+        self.scheduler.resume()
+
+    def set_slowdown(self, factor):
+        self.scheduler.set_slowdown(factor)
+
+    def on_tick(self, names):
+        self.engine.request(*names)
+
+    def on_snapshot(self, snapshot):
+        # Polled controls back off while they stay the same, fans, CPU and
+        # battery while they move less than their threshold
+        for name, stamp in snapshot.stamps.items():
+            if self.stamps.get(name) == stamp:
+                continue
+            self.stamps[name] = stamp
+            value = snapshot.values[name]
+            if self.volatility.tracks(name):
+                if self.volatility.moving(name, value):
+                    self.scheduler.changed(name)
+            elif self.values.get(name, value) != value:
+                self.scheduler.changed(name)
+            self.values[name] = value
+            if name == "ac" and self.adaptive:
+                self.set_on_battery(value is False)
+
+    def set_on_battery(self, on_battery):
+        budget = self.battery_budget if on_battery else 1
+        if budget != self.scheduler.budget:
+            logging.info(
+                f"Sampling budget x{budget}, {'on battery' if on_battery else 'on AC'}"
+            )
+            self.scheduler.set_budget(budget)
+
+    def listen_uevents(self, source=None):
+        try:
+            self.uevents = UeventListener(source)
+        except OSError as e:
+            logging.warning(f"Cannot listen for uevents, polling instead: {str(e)}")
+            return False
+
+        self.uevents.connect("power_supply", self.on_power_supply_uevent)
+        self.uevents.connect("hwmon", self.on_hwmon_uevent)
+        self.uevents.connect("module", self.on_hwmon_uevent)
+        self.uevents.connect("cpu", self.on_cpu_uevent)
+        GLib.io_add_watch(
+            self.uevents.fileno(),
+            GLib.PRIORITY_DEFAULT,
+            GLib.IO_IN,
+            self.on_uevent_ready,
+        )
+        return True
+
+    def on_uevent_ready(self, fd, condition):
+        self.uevents.dispatch()
+        return True
+
+    def on_power_supply_uevent(self, event):
+        supplies = self.hw.power_supplies
+        if event.action in ("add", "remove"):
+            # An adapter or battery came or went (USB-C, a docked battery)
+            logging.info(f"Power supplies changed ({event.action} {event.devpath})")
+            supplies.invalidate()
+            self.engine.request("battery", "ac")
+            return
+
+        name = event.get("POWER_SUPPLY_NAME")
+        if supplies.is_adapter(name):
+            online = event.get("POWER_SUPPLY_ONLINE")
+            if online is not None and len(supplies.adapters()) == 1:
+                self.on_ac = online == "1"
+                self.engine.publish("ac", self.on_ac)
+            else:
+                # Another adapter may still be supplying power
+                self.engine.request("ac")
+            # Plugging in changes the charge state even if the battery
+            # itself doesn't send an event
+            self.engine.request("battery")
+        elif supplies.is_battery(name):
+            if event.get("POWER_SUPPLY_CAPACITY") is None:
+                # Event without payload, read the attributes instead
+                self.engine.request("battery")
+            else:
+                # The event carries everything the uevent file has
+                try:
+                    info = self.hw.battery.update(name, event.properties)
+                except ValueError as e:
+                    logging.error(f"Error parsing battery uevent: {str(e)}")
+                    self.engine.request("battery")
+                else:
+                    self.engine.publish("battery", info)
+
+    def on_hwmon_uevent(self, event):
+        if event.subsystem == "module" and "samsung" not in event.devpath:
+            return
+        if event.action in ("add", "remove", "bind", "unbind"):
+            logging.info(f"Hardware changed ({event.action} {event.devpath})")
+            self.hw.hwmon.invalidate()
+
+    def on_cpu_uevent(self, event):
+        if event.action in ("online", "offline", "add", "remove"):
+            self.hw.thermal.invalidate()
+
+    def close(self):
+        self.scheduler.close()
+        self.engine.stop()
+        if self.uevents is not None:
+            self.uevents.close()
@@ -0,0 +1,123 @@
+import logging
+import os
+import re
+import threading
+from collections import namedtuple
+
+POWER_SUPPLY_ROOT = "/sys/class/power_supply"
+
+# Types that power the machine from outside. USB-C adapters show up as
+# "USB" (or "USB_PD", "USB_C" on older kernels) next to or instead of
+# "Mains".
+ADAPTER_TYPES = ("Mains", "USB", "USB_PD", "USB_PD_DRP", "USB_C")
+
+PowerSupply = namedtuple("PowerSupply", "name type scope path")
+
+
+class PowerSupplyRegistry:
+    """Index of the batteries and adapters under /sys/class/power_supply.
+
+    Every entry is classified once by its type and scope. Entries with
+    scope Device (a wireless mouse, a keyboard, a phone charging over USB)
+    power something else and are left out. The tree is only walked again
+    after invalidate(), which the Monitor calls on power_supply add and
+    remove uevents. The rescan runs on whichever sampler thread gets there
+    first, under a lock so no other thread scans at the same time.
+    """
+
+    def __init__(self, reader, root=POWER_SUPPLY_ROOT):
+        self.reader = reader
+        self.root = root
+        self._supplies = None
+        self._attrs = {}
+        self.stale = False
+        self.lock = threading.RLock()
+
+    def invalidate(self):
+        self.stale = True
+
+    def scan(self):
+        with self.lock:
+            return self._scan()
+
+    def _scan(self):
+        for supply in self._supplies or ():
+            for name in ("uevent", "online"):
+                self.reader.forget(os.path.join(supply.path, name))
+        for path in self._attrs.values():
+            if path is not None:
+                self.reader.forget(path)
+        self.stale = False
+
+        supplies = []
+        try:
+            entries = sorted(os.listdir(self.root), key=_natural_key)
+        except OSError as e:
+            logging.error(f"Error listing {self.root}: {str(e)}")
+            entries = []
+        for name in entries:
+            path = os.path.join(self.root, name)
+            supply_type = _read_text(os.path.join(path, "type"))
+            # No scope attribute means the driver didn't say, which
+            # laptop batteries and adapters never do
+            scope = _read_text(os.path.join(path, "scope")) or "System"
+            if supply_type is None or scope == "Device":
+                continue
+            supplies.append(PowerSupply(name, supply_type, scope, path))
+
+        self._supplies = supplies
+        self._attrs = {}
+        logging.info(
+            f"Found batteries {[s.name for s in self.batteries()]}, "
+            f"adapters {[s.name for s in self.adapters()]}"
+        )
+        return supplies
+
+    def supplies(self):
+        with self.lock:
+            if self._supplies is None or self.stale:
+                self._scan()
+            return self._supplies
+
+    def batteries(self):
+        return [s for s in self.supplies() if s.type == "Battery"]
+
+    def adapters(self):
+        # Mains first, it's the one that is always there
+        adapters = [s for s in self.supplies() if s.type in ADAPTER_TYPES]
+        return sorted(adapters, key=lambda s: s.type != "Mains")
+
+    def is_battery(self, name):
+        return any(s.name == name for s in self.batteries())
+
+    def is_adapter(self, name):
+        return any(s.name == name for s in self.adapters())
+
+    def battery_attr_path(self, attr):
+        """Path of attr on the first battery that has it, None if none
+        does."""
+        with self.lock:
+            supplies = self.supplies()
+            if attr not in self._attrs:
+                self._attrs[attr] = next(
+                    (
+                        os.path.join(s.path, attr)
+                        for s in supplies
+                        if s.type == "Battery"
+                        and os.path.exists(os.path.join(s.path, attr))
+                    ),
+                    None,
+                )
+            return self._attrs[attr]
+
+
+def _read_text(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _natural_key(name):
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", name)]
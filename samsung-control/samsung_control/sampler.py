@@ -0,0 +1,263 @@
+import collections
+import concurrent.futures
+import errno
+import logging
+import os
+import select
+import threading
+import time
+from types import MappingProxyType
+
+from . import instrument
+
+# Immutable view of the latest sampled values. stamps maps each name to the
+# monotonic time of its last successful sample, stale holds the names whose
+# last sample failed or is still hanging.
+Snapshot = collections.namedtuple("Snapshot", "seq time values stamps stale")
+
+
+class Sampler:
+    def __init__(self, name, func, timeout, notify, rearm):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        self.notify = notify
+        self.rearm = rearm
+        self.future = None
+        # One thread per sampler, so a hung ACPI call only blocks itself
+        self.executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix=f"sample-{name}"
+        )
+
+    def run(self):
+        if self.notify is not None and self.rearm:
+            # Reading the notify attribute from offset 0 acknowledges it,
+            # even when the read fails: brightness_hw_changed returns
+            # ENODATA until the first Fn+F9 press, and the descriptor stays
+            # watched
+            try:
+                self.notify.read_into()
+            except OSError as e:
+                if e.errno != errno.ENODATA:
+                    logging.warning(f"Error acknowledging {self.notify.path}: {str(e)}")
+        return self.func()
+
+
+class SamplingEngine:
+    """Runs all hardware reads off the GTK main loop.
+
+    Samplers are registered by name and run on request, each on its own
+    worker thread and with its own timeout. Attributes that support
+    sysfs_notify() are polled for POLLPRI on the engine thread and sampled
+    when the kernel signals a change. After every round an immutable Snapshot
+    is queued and handed to the callbacks through dispatch (GLib.idle_add in
+    the GUI). The queue is bounded: when the receiver falls behind, the
+    oldest snapshots are dropped.
+    """
+
+    def __init__(self, reader, dispatch, timeout=0.5, queue_size=4):
+        self.reader = reader
+        self.dispatch = dispatch
+        self.timeout = timeout
+        self.samplers = {}
+        self.callbacks = []
+
+        self.lock = threading.Lock()
+        self.values = {}
+        self.stamps = {}
+        self.stale = set()
+        self.seq = 0
+        self.requested = set()
+        self.rewatch = set()
+        self.queue = collections.deque(maxlen=queue_size)
+        self.dispatch_pending = False
+
+        self.poller = select.poll()
+        self.watched = {}
+        self.wake_r, self.wake_w = os.pipe2(os.O_NONBLOCK | os.O_CLOEXEC)
+        self.poller.register(self.wake_r, select.POLLIN)
+        self.thread = None
+        self.running = False
+
+    def add_sampler(self, name, func, timeout=None, notify_path=None, rearm=True):
+        """Register func as the sampler for name.
+
+        With notify_path, name is also sampled whenever the kernel signals
+        that attribute; rearm=False means func reads notify_path itself.
+        Returns True if the attribute is watched for notifications.
+        """
+        notify = None
+        if notify_path is not None and os.path.exists(notify_path):
+            notify = self.reader.attribute(notify_path)
+            try:
+                notify.open()
+            except OSError as e:
+                # Not watchable, the caller polls it instead
+                logging.warning(f"Cannot watch {notify_path}: {str(e)}")
+                notify = None
+        func = instrument.timed(f"read: {name}", func)
+        self.samplers[name] = Sampler(
+            name, func, timeout or self.timeout, notify, rearm
+        )
+        if notify is not None:
+            # The first sample arms the attribute, it's watched afterwards
+            self.request(name)
+        return notify is not None
+
+    def connect(self, callback):
+        self.callbacks.append(callback)
+
+    def request(self, *names):
+        with self.lock:
+            self.requested.update(names)
+        self._wake()
+
+    def publish(self, name, value):
+        """Store a value that arrived without sampling (e.g. in a uevent)
+        and publish it like a sample."""
+        self._store(name, value)
+        self._publish()
+
+    def snapshot(self):
+        with self.lock:
+            return self._snapshot()
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(
+            target=self._run, name="sampling-engine", daemon=True
+        )
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self._wake()
+        if self.thread is not None:
+            self.thread.join(timeout=1)
+        for sampler in self.samplers.values():
+            sampler.executor.shutdown(wait=False, cancel_futures=True)
+        os.close(self.wake_r)
+        os.close(self.wake_w)
+
+    def _wake(self):
+        try:
+            os.write(self.wake_w, b"\0")
+        except BlockingIOError:
+            pass  # Already pending
+
+    def _run(self):
+        while self.running:
+            names = set()
+            for fd, event in self.poller.poll():
+                if fd == self.wake_r:
+                    try:
+                        while os.read(self.wake_r, 512):
+                            pass
+                    except BlockingIOError:
+                        pass
+                else:
+                    # Stop watching until the sampler has acknowledged it,
+                    # otherwise POLLPRI keeps firing
+                    name = self.watched.pop(fd)
+                    self.poller.unregister(fd)
+                    names.add(name)
+
+            with self.lock:
+                names |= self.requested
+                self.requested.clear()
+                rewatch, self.rewatch = self.rewatch, set()
+            for name in rewatch:
+                self._watch(self.samplers[name])
+
+            if names and self.running:
+                self._sample(names)
+
+    def _watch(self, sampler):
+        fd = sampler.notify.fd
+        if fd is not None and fd not in self.watched:
+            self.watched[fd] = sampler.name
+            self.poller.register(fd, select.POLLPRI | select.POLLERR)
+
+    def _sample(self, names):
+        started = time.monotonic()
+        pending = []
+        for name in names:
+            sampler = self.samplers.get(name)
+            if sampler is None:
+                continue
+            if sampler.future is not None and not sampler.future.done():
+                continue  # Previous call is still hanging
+            sampler.future = sampler.executor.submit(sampler.run)
+            pending.append(sampler)
+
+        for sampler in pending:
+            remaining = sampler.timeout - (time.monotonic() - started)
+            try:
+                value = sampler.future.result(timeout=max(remaining, 0))
+            except concurrent.futures.TimeoutError:
+                logging.warning(
+                    f"Sampling {sampler.name} timed out after {sampler.timeout}s"
+                )
+                sampler.future.add_done_callback(
+                    lambda future, sampler=sampler: self._late(sampler, future)
+                )
+                with self.lock:
+                    self.stale.add(sampler.name)
+                continue
+            except Exception as e:
+                logging.error(f"Error sampling {sampler.name}: {str(e)}")
+                with self.lock:
+                    self.stale.add(sampler.name)
+            else:
+                self._store(sampler.name, value)
+            if sampler.notify is not None:
+                self._watch(sampler)
+
+        if pending:
+            self._publish()
+
+    def _late(self, sampler, future):
+        # Runs on the sampler's thread once a timed out call returns
+        try:
+            self._store(sampler.name, future.result())
+        except Exception as e:
+            logging.error(f"Error sampling {sampler.name}: {str(e)}")
+        if sampler.notify is not None:
+            with self.lock:
+                self.rewatch.add(sampler.name)
+            self._wake()
+        self._publish()
+
+    def _store(self, name, value):
+        with self.lock:
+            self.values[name] = value
+            self.stamps[name] = time.monotonic()
+            self.stale.discard(name)
+
+    def _snapshot(self):
+        self.seq += 1
+        return Snapshot(
+            self.seq,
+            time.monotonic(),
+            MappingProxyType(dict(self.values)),
+            MappingProxyType(dict(self.stamps)),
+            frozenset(self.stale),
+        )
+
+    def _publish(self):
+        with self.lock:
+            self.queue.append(self._snapshot())
+            if self.dispatch_pending:
+                return
+            self.dispatch_pending = True
+        self.dispatch(self._deliver)
+
+    def _deliver(self):
+        with self.lock:
+            snapshots = list(self.queue)
+            self.queue.clear()
+            self.dispatch_pending = False
+        for snapshot in snapshots:
+            for callback in self.callbacks:
+                callback(snapshot)
+        return False
@@ -0,0 +1,104 @@
+from gi.repository import GLib
+
+
+class Metric:
+    def __init__(self, base, ceiling, floor):
+        self.base = base
+        self.ceiling = ceiling
+        self.floor = floor
+        self.divisor = base
+
+
+class TickScheduler:
+    """Drives all periodic sampling from one shared timer.
+
+    Every metric is sampled every divisor ticks; the metrics that fall due
+    on the same tick are handed to the callback together, so they share one
+    wakeup. The timer uses GLib.timeout_add_seconds, which GLib aligns with
+    other per-second timers in the process and across the session.
+
+    Metrics registered with a max_interval back off: each sample doubles
+    their divisor up to the ceiling, and changed() resets it to the
+    min_interval (the interval itself if not given). A budget above 1
+    stretches every interval by that factor and keeps changed() from going
+    below the interval, e.g. while on battery.
+    """
+
+    def __init__(self, callback, tick=1):
+        self.callback = callback
+        self.tick = tick  # seconds
+        self.metrics = {}
+        self.count = 0
+        self.slowdown = 1
+        self.budget = 1
+        self.paused = False
+        self.source_id = None
+
+    def set_interval(self, name, interval, max_interval=None, min_interval=None):
+        """Sample name every interval ms (rounded to whole ticks)."""
+        base = self._ticks(interval)
+        ceiling = max(base, self._ticks(max_interval)) if max_interval else base
+        floor = min(base, self._ticks(min_interval)) if min_interval else base
+        self.metrics[name] = Metric(base, ceiling, floor)
+        self._update_timer()
+
+    def interval(self, name):
+        return self.metrics[name].divisor * self.tick * 1000
+
+    def remove(self, name):
+        self.metrics.pop(name, None)
+        self._update_timer()
+
+    def changed(self, name):
+        metric = self.metrics.get(name)
+        if metric is not None:
+            metric.divisor = metric.base if self.budget > 1 else metric.floor
+
+    def set_slowdown(self, factor):
+        """Stretch every interval by factor, e.g. while the window is
+        unfocused."""
+        self.slowdown = max(1, int(factor))
+
+    def set_budget(self, factor):
+        self.budget = max(1, int(factor))
+        for metric in self.metrics.values():
+            metric.divisor = max(metric.divisor, metric.base)
+
+    def pause(self):
+        self.paused = True
+        self._update_timer()
+
+    def resume(self):
+        if not self.paused:
+            return
+        self.paused = False
+        self._update_timer()
+        # Catch up on everything that was missed while paused
+        if self.metrics:
+            self.callback(list(self.metrics))
+
+    def close(self):
+        self.metrics.clear()
+        self._update_timer()
+
+    def _ticks(self, interval):
+        return max(1, round(interval / (self.tick * 1000)))
+
+    def _update_timer(self):
+        running = self.metrics and not self.paused
+        if running and self.source_id is None:
+            self.source_id = GLib.timeout_add_seconds(self.tick, self._on_tick)
+        elif not running and self.source_id is not None:
+            GLib.source_remove(self.source_id)
+            self.source_id = None
+
+    def _on_tick(self):
+        self.count += 1
+        due = []
+        for name, metric in self.metrics.items():
+            if self.count % (metric.divisor * self.slowdown * self.budget) == 0:
+                due.append(name)
+                metric.divisor = min(metric.divisor * 2, metric.ceiling)
+        if due:
+            self.callback(due)
+        return True
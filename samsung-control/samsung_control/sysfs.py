@@ -0,0 +1,143 @@
+import errno
+import os
+import threading
+import time
+
+# Errors that mean the attribute went away underneath an open descriptor,
+# e.g. because the samsung-galaxybook module was reloaded. The descriptor is
+# dropped and the path opened again once before giving up.
+REOPEN_ERRNOS = frozenset(
+    (errno.ENODEV, errno.ENOENT, errno.ENXIO, errno.EBADF, errno.ESTALE)
+)
+
+
+class SysfsAttribute:
+    """A sysfs/procfs file that is opened once and re-read with pread().
+
+    sysfs and seq_file regenerate their contents whenever they are read from
+    offset 0, so keeping the descriptor around turns every sample into a
+    single syscall into a buffer that is allocated once.
+
+    Reads and close() hold a lock, so a registry rescan on one thread
+    never closes the descriptor under a read on another. Once retired
+    (forgotten by the SysfsReader) the attribute can still be read by
+    whoever holds on to it, but no longer keeps a descriptor open.
+    """
+
+    def __init__(self, path, size=4096, delay=0):
+        self.path = path
+        self.delay = delay
+        self.fd = None
+        self.retired = False
+        self.buffer = bytearray(size)
+        self.view = memoryview(self.buffer)
+        self.lock = threading.RLock()
+
+    def open(self):
+        with self.lock:
+            if self.fd is None:
+                self.fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+            return self.fd
+
+    def close(self):
+        with self.lock:
+            if self.fd is not None:
+                try:
+                    os.close(self.fd)
+                except OSError:
+                    pass
+                self.fd = None
+
+    def retire(self):
+        with self.lock:
+            self.retired = True
+            self.close()
+
+    def _pread(self):
+        fd = self.open()
+        n = os.preadv(fd, [self.view], 0)
+        # A full buffer may mean the file was truncated (e.g. /proc/stat on
+        # machines with many cores), so grow it and read again.
+        while n == len(self.buffer):
+            self.view.release()
+            self.buffer.extend(bytes(len(self.buffer)))
+            self.view = memoryview(self.buffer)
+            n = os.preadv(fd, [self.view], 0)
+        return n
+
+    def read_into(self):
+        """Re-read the attribute into self.buffer and return its length."""
+        if self.delay:
+            time.sleep(self.delay)
+        with self.lock:
+            try:
+                n = self._pread()
+            except OSError as e:
+                if e.errno not in REOPEN_ERRNOS:
+                    raise
+                self.close()
+                n = self._pread()
+            if self.retired:
+                self.close()
+            return n
+
+    def read_bytes(self):
+        with self.lock:
+            # read_into() may replace self.view when the buffer grows
+            n = self.read_into()
+            return bytes(self.view[:n])
+
+    def read(self):
+        return self.read_bytes().strip().decode()
+
+    def read_int(self):
+        with self.lock:
+            return int(self.buffer[: self.read_into()])
+
+
+class SysfsReader:
+    """Cache of SysfsAttribute objects keyed by path."""
+
+    def __init__(self):
+        self.attributes = {}
+        self.lock = threading.Lock()
+        # Seconds added to every read and write of a path, to emulate slow
+        # ACPI attributes on a fake hardware tree
+        self.delays = {}
+
+    def attribute(self, path):
+        with self.lock:
+            attribute = self.attributes.get(path)
+            if attribute is None:
+                attribute = self.attributes[path] = SysfsAttribute(
+                    path, delay=self.delays.get(path, 0)
+                )
+            return attribute
+
+    def write(self, path, value):
+        delay = self.delays.get(path)
+        if delay:
+            time.sleep(delay)
+        with open(path, "w") as f:
+            f.write(str(value))
+
+    def read(self, path):
+        return self.attribute(path).read()
+
+    def read_bytes(self, path):
+        return self.attribute(path).read_bytes()
+
+    def read_int(self, path):
+        return self.attribute(path).read_int()
+
+    def forget(self, path):
+        with self.lock:
+            attribute = self.attributes.pop(path, None)
+        if attribute is not None:
+            attribute.retire()
+
+    def close(self):
+        with self.lock:
+            attributes, self.attributes = self.attributes, {}
+        for attribute in attributes.values():
+            attribute.retire()
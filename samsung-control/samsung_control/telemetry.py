@@ -0,0 +1,230 @@
+import collections
+import fcntl
+import logging
+import math
+import mmap
+import os
+import struct
+import time
+
+MAGIC = b"SCTELEM\0"
+VERSION = 1
+
+# (seconds per slot, slots): 1 s for an hour, 1 min for a week, 1 h for a year
+TIERS = ((1, 3600), (60, 10080), (3600, 8760))
+METRICS = ("fan", "temp", "cpu", "battery", "profile")
+
+# platform_profile values, stored as their index in the "profile" metric
+PROFILES = (
+    "low-power",
+    "cool",
+    "quiet",
+    "balanced",
+    "balanced-performance",
+    "performance",
+    "custom",
+)
+
+# A slot is five doubles: bucket start (0 = empty), min, avg, max, count
+SLOT_FIELDS = 5
+SLOT_SIZE = SLOT_FIELDS * 8
+
+Consolidated = collections.namedtuple("Consolidated", "time min avg max count")
+
+
+# Where samsung-controld records, readable by every user
+SYSTEM_PATH = "/var/lib/samsung-control/telemetry.rrd"
+
+
+def default_path():
+    state_home = os.environ.get("XDG_STATE_HOME") or os.path.expanduser(
+        "~/.local/state"
+    )
+    return os.path.join(state_home, "samsung-control", "telemetry.rrd")
+
+
+def _header(tiers, metrics):
+    header = struct.pack("<8sIII", MAGIC, VERSION, len(tiers), len(metrics))
+    for step, rows in tiers:
+        header += struct.pack("<II", step, rows)
+    for name in metrics:
+        header += struct.pack("<16s", name.encode())
+    # Keep the slots page aligned
+    return header.ljust(mmap.PAGESIZE * math.ceil(len(header) / mmap.PAGESIZE), b"\0")
+
+
+class TelemetryStore:
+    """Round-robin history of a few metrics in a memory-mapped file.
+
+    Every metric has one ring of slots per tier. A slot covers one step of
+    wall-clock time and is consolidated in place as samples arrive (min,
+    running average, max), so the file never grows and a sample costs a
+    few stores per tier. A slot whose start time doesn't match the bucket
+    being written or read is stale, which is how old data ages out.
+
+    Only one process writes: the file is locked on open, later instances
+    open it read-only. A file with a different layout is reinitialized.
+    With readonly, e.g. for the daemon's store, the file is only ever
+    read and must already exist.
+    """
+
+    def __init__(self, path=None, tiers=TIERS, metrics=METRICS, readonly=False):
+        self.path = path or default_path()
+        self.tiers = tiers
+        self.metrics = metrics
+        self.readonly = readonly
+        self.fd = None
+        self.map = None
+        self.slots = None
+        self.writable = False
+
+        try:
+            self.open()
+        except Exception as e:
+            logging.error(f"Error opening telemetry store {self.path}: {str(e)}")
+            self.close()
+
+    def open(self):
+        header = _header(self.tiers, self.metrics)
+        rows = sum(rows for step, rows in self.tiers)
+        size = len(header) + len(self.metrics) * rows * SLOT_SIZE
+
+        if self.readonly:
+            self.fd = os.open(self.path, os.O_RDONLY | os.O_CLOEXEC)
+        else:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_CLOEXEC, 0o644)
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                self.writable = True
+            except BlockingIOError:
+                logging.info(
+                    f"Telemetry store {self.path} is in use, opening read-only"
+                )
+
+        current = os.pread(self.fd, len(header), 0)
+        if current != header or os.fstat(self.fd).st_size != size:
+            if not self.writable:
+                raise ValueError("incompatible layout")
+            logging.info(f"Initializing telemetry store {self.path}")
+            os.ftruncate(self.fd, 0)
+            os.ftruncate(self.fd, size)
+            os.pwrite(self.fd, header, 0)
+
+        if self.readonly:
+            self.map = mmap.mmap(self.fd, size, access=mmap.ACCESS_READ)
+        else:
+            self.map = mmap.mmap(self.fd, size)
+        self.slots = memoryview(self.map)[len(header) :].cast("d")
+
+        # Start of every (metric, tier) ring, in doubles
+        self.offsets = {}
+        offset = 0
+        for name in self.metrics:
+            for step, rows in self.tiers:
+                self.offsets[name, step] = offset
+                offset += rows * SLOT_FIELDS
+
+    def close(self):
+        if self.slots is not None:
+            self.slots.release()
+            self.slots = None
+        if self.map is not None:
+            if not self.readonly:
+                self.map.flush()
+            self.map.close()
+            self.map = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+    def add(self, metric, value, now=None):
+        if not self.writable or self.slots is None:
+            return
+        now = time.time() if now is None else now
+        slots = self.slots
+        for step, rows in self.tiers:
+            bucket = now // step
+            start = bucket * step
+            i = self.offsets[metric, step] + int(bucket % rows) * SLOT_FIELDS
+            if slots[i] != start:
+                slots[i : i + SLOT_FIELDS] = memoryview(
+                    struct.pack("<5d", start, value, value, value, 1)
+                ).cast("d")
+                continue
+            count = slots[i + 4] + 1
+            if value < slots[i + 1]:
+                slots[i + 1] = value
+            if value > slots[i + 3]:
+                slots[i + 3] = value
+            slots[i + 2] += (value - slots[i + 2]) / count
+            slots[i + 4] = count
+
+    def tier_for(self, start, now=None):
+        """Return the finest (step, rows) tier still covering start."""
+        now = time.time() if now is None else now
+        for step, rows in self.tiers:
+            if now - start <= step * rows:
+                return step, rows
+        return self.tiers[-1]
+
+    def query(self, metric, start, end=None, now=None):
+        """Return the Consolidated slots of metric between start and end
+        (wall-clock seconds), oldest first, from the finest tier covering
+        start. Empty slots are skipped."""
+        if self.slots is None:
+            return []
+        now = time.time() if now is None else now
+        end = now if end is None else end
+        step, rows = self.tier_for(start, now)
+
+        first = int(start // step)
+        last = int(end // step)
+        # Never wrap around the ring more than once
+        first = max(first, last - rows + 1, int(now // step) - rows + 1)
+
+        base = self.offsets[metric, step]
+        slots = self.slots
+        result = []
+        for bucket in range(first, last + 1):
+            i = base + (bucket % rows) * SLOT_FIELDS
+            if slots[i] == bucket * step:
+                result.append(Consolidated(*slots[i : i + SLOT_FIELDS].tolist()))
+        return result
+
+
+class TelemetryRecorder:
+    """Adds the values of every snapshot to a TelemetryStore: the first
+    fan, the hottest temperature sensor, total CPU usage, battery capacity
+    and the platform profile."""
+
+    def __init__(self, store):
+        self.store = store
+        self.stamps = {}
+
+    def on_snapshot(self, snapshot):
+        for name, stamp in snapshot.stamps.items():
+            if self.stamps.get(name) == stamp:
+                continue
+            self.stamps[name] = stamp
+            value = snapshot.values[name]
+            if value is not None:
+                self.record(name, value)
+
+    def record(self, name, value):
+        store = self.store
+        if name == "sensors":
+            fans = [v for s, v in value if s.kind == "fan" and v is not None]
+            temps = [v for s, v in value if s.kind == "temp" and v is not None]
+            if fans:
+                store.add("fan", fans[0])
+            if temps:
+                store.add("temp", max(temps))
+        elif name == "cpu":
+            store.add("cpu", value.total)
+        elif name == "battery":
+            if value.capacity is not None:
+                store.add("battery", value.capacity)
+        elif name == "platform_profile":
+            if value in PROFILES:
+                store.add("profile", PROFILES.index(value))
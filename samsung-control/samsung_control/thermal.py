@@ -0,0 +1,146 @@
+import logging
+import os
+import re
+import threading
+from collections import namedtuple
+
+from .sysfs import REOPEN_ERRNOS
+
+CPU_ROOT = "/sys/devices/system/cpu"
+THERMAL_ROOT = "/sys/class/thermal"
+
+# Thermal zone types that measure the CPU package, best first
+PACKAGE_ZONES = ("x86_pkg_temp", "TCPU", "cpu-thermal", "acpitz")
+
+_CPU_RE = re.compile(r"^cpu\d+$")
+_ZONE_RE = re.compile(r"^thermal_zone\d+$")
+
+# Frequencies in MHz, temperatures in °C. limit is the highest frequency
+# the cpufreq policies currently allow (lowered by the platform profile or
+# a thermal daemon), hw_max what the hardware can do. package is None if
+# no zone measures the package, zones holds (type, temperature) for every
+# zone.
+Thermal = namedtuple("Thermal", "freq_min freq_avg freq_max limit hw_max package zones")
+
+
+class ThermalSampler:
+    """Current CPU frequencies and thermal zone temperatures.
+
+    The paths are found once, every sample then re-reads all of them on the
+    descriptors the SysfsReader keeps open. A core going offline or a zone
+    disappearing triggers a rescan on the next sample, under a lock so two
+    threads never rescan at once.
+    """
+
+    def __init__(self, reader, cpu_root=CPU_ROOT, thermal_root=THERMAL_ROOT):
+        self.reader = reader
+        self.cpu_root = cpu_root
+        self.thermal_root = thermal_root
+        self.freq_paths = None
+        self.limit_paths = []
+        self.zones = []
+        self.package_index = None
+        self.hw_max = None
+        self.lock = threading.RLock()
+
+    def invalidate(self):
+        # Rescanned by the next sample, on whichever thread takes it
+        self.freq_paths = None
+
+    def scan(self):
+        with self.lock:
+            self._scan()
+
+    def _scan(self):
+        for path in (self.freq_paths or []) + self.limit_paths:
+            self.reader.forget(path)
+        for zone_type, path in self.zones:
+            self.reader.forget(path)
+
+        self.freq_paths = []
+        self.limit_paths = []
+        hw_max = 0
+        for cpu in _list(self.cpu_root, _CPU_RE):
+            cpufreq = os.path.join(self.cpu_root, cpu, "cpufreq")
+            if not os.path.exists(os.path.join(cpufreq, "scaling_cur_freq")):
+                continue  # Offline or no cpufreq driver
+            self.freq_paths.append(os.path.join(cpufreq, "scaling_cur_freq"))
+            self.limit_paths.append(os.path.join(cpufreq, "scaling_max_freq"))
+            hw_max = max(hw_max, _read_int(os.path.join(cpufreq, "cpuinfo_max_freq")))
+        self.hw_max = hw_max / 1000 or None
+
+        self.zones = []
+        for zone in _list(self.thermal_root, _ZONE_RE):
+            zone_path = os.path.join(self.thermal_root, zone)
+            zone_type = _read_text(os.path.join(zone_path, "type")) or zone
+            self.zones.append((zone_type, os.path.join(zone_path, "temp")))
+
+        types = [zone_type for zone_type, path in self.zones]
+        self.package_index = next(
+            (types.index(t) for t in PACKAGE_ZONES if t in types), None
+        )
+        logging.info(
+            f"Found cpufreq on {len(self.freq_paths)} CPUs, thermal zones: {types}"
+        )
+
+    def sample(self):
+        with self.lock:
+            if self.freq_paths is None:
+                self._scan()
+            # invalidate() may swap them out from the main thread
+            freq_paths, limit_paths = self.freq_paths, self.limit_paths
+            all_zones, package_index = self.zones, self.package_index
+            hw_max = self.hw_max
+        try:
+            freqs = [self.reader.read_int(path) for path in freq_paths]
+            limit = max((self.reader.read_int(path) for path in limit_paths), default=0)
+            zones = []
+            for zone_type, path in all_zones:
+                try:
+                    zones.append((zone_type, self.reader.read_int(path) / 1000))
+                except OSError as e:
+                    if e.errno in REOPEN_ERRNOS:
+                        raise
+                    # Some zones (e.g. a sleeping wifi card) refuse reads
+                    zones.append((zone_type, None))
+        except OSError as e:
+            if e.errno in REOPEN_ERRNOS:
+                self.freq_paths = None  # Hotplug, rescan next time
+            raise
+
+        package = None
+        if package_index is not None:
+            package = zones[package_index][1]
+        if not freqs:
+            return Thermal(None, None, None, None, None, package, tuple(zones))
+        return Thermal(
+            min(freqs) / 1000,
+            sum(freqs) / len(freqs) / 1000,
+            max(freqs) / 1000,
+            limit / 1000,
+            hw_max,
+            package,
+            tuple(zones),
+        )
+
+
+def _list(root, pattern):
+    try:
+        entries = [entry for entry in os.listdir(root) if pattern.match(entry)]
+    except OSError as e:
+        logging.error(f"Error listing {root}: {str(e)}")
+        return []
+    return sorted(entries, key=lambda name: int(re.sub(r"\D", "", name)))
+
+
+def _read_text(path):
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _read_int(path):
+    text = _read_text(path)
+    return int(text) if text and text.isdigit() else 0
@@ -0,0 +1,119 @@
+import logging
+import socket
+
+NETLINK_KOBJECT_UEVENT = 15
+# Multicast group the kernel sends uevents to (udev rebroadcasts on group 2)
+KERNEL_GROUP = 1
+
+
+class Uevent:
+    def __init__(self, action, devpath, properties):
+        self.action = action
+        self.devpath = devpath
+        self.properties = properties
+
+    @property
+    def subsystem(self):
+        return self.properties.get("SUBSYSTEM")
+
+    def get(self, key, default=None):
+        return self.properties.get(key, default)
+
+    def __repr__(self):
+        return f"Uevent({self.action}@{self.devpath}, {self.properties})"
+
+
+def parse_uevent(data):
+    """Parse a kernel uevent datagram: "action@devpath\\0KEY=VALUE\\0..."."""
+    fields = data.split(b"\0")
+    action, sep, devpath = fields[0].decode(errors="replace").partition("@")
+    if not sep:
+        # libudev messages or garbage
+        return None
+
+    properties = {}
+    for field in fields[1:]:
+        key, sep, value = field.partition(b"=")
+        if sep:
+            properties[key.decode(errors="replace")] = value.decode(errors="replace")
+    return Uevent(action, devpath, properties)
+
+
+def format_uevent(action, devpath, properties):
+    fields = [f"{action}@{devpath}", f"ACTION={action}", f"DEVPATH={devpath}"]
+    fields += [f"{key}={value}" for key, value in properties.items()]
+    return "\0".join(fields).encode() + b"\0"
+
+
+class NetlinkUeventSource:
+    """Kernel uevents from a NETLINK_KOBJECT_UEVENT socket."""
+
+    def __init__(self):
+        self.sock = socket.socket(
+            socket.AF_NETLINK,
+            socket.SOCK_DGRAM | socket.SOCK_NONBLOCK | socket.SOCK_CLOEXEC,
+            NETLINK_KOBJECT_UEVENT,
+        )
+        self.sock.bind((0, KERNEL_GROUP))
+
+    def fileno(self):
+        return self.sock.fileno()
+
+    def receive(self):
+        messages = []
+        while True:
+            try:
+                messages.append(self.sock.recv(65536))
+            except BlockingIOError:
+                return messages
+
+    def close(self):
+        self.sock.close()
+
+
+class FakeUeventSource(NetlinkUeventSource):
+    """Event source fed from the same process, for machines without the
+    hardware (or permissions) to produce real uevents."""
+
+    def __init__(self):
+        self.sock, self.peer = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def emit(self, action, devpath, **properties):
+        self.peer.send(format_uevent(action, devpath, properties))
+
+    def close(self):
+        self.sock.close()
+        self.peer.close()
+
+
+class UeventListener:
+    """Dispatches uevents to callbacks registered per subsystem.
+
+    The listener does not depend on a main loop: poll fileno() for input and
+    call dispatch() when it becomes readable.
+    """
+
+    def __init__(self, source=None):
+        self.source = source if source is not None else NetlinkUeventSource()
+        self.handlers = {}
+
+    def connect(self, subsystem, callback, *args):
+        self.handlers.setdefault(subsystem, []).append((callback, args))
+
+    def fileno(self):
+        return self.source.fileno()
+
+    def dispatch(self):
+        for data in self.source.receive():
+            event = parse_uevent(data)
+            if event is None:
+                continue
+            for callback, args in self.handlers.get(event.subsystem, ()):
+                try:
+                    callback(event, *args)
+                except Exception as e:
+                    logging.error(f"Error handling {event}: {str(e)}")
+
+    def close(self):
+        self.source.close()
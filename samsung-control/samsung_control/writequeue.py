@@ -0,0 +1,90 @@
+import logging
+import threading
+import time
+
+from . import instrument
+
+
+class WriteQueue:
+    """Applies control writes on a worker thread.
+
+    Values submitted for the same key replace each other until the write
+    falls due, so dragging a slider writes only the value it rests on. A
+    write falls due debounce seconds after the last submission, but no
+    later than max_wait seconds after the first one so a long drag still
+    shows progress.
+
+    Each write is checked with verify(value) after it succeeded, and the
+    outcome goes back through dispatch to callback(key, value, result),
+    where result is True, "permission_denied", "not_authorized" or False.
+    """
+
+    def __init__(self, dispatch, debounce=0.25, max_wait=1.0):
+        self.dispatch = dispatch
+        self.debounce = debounce
+        self.max_wait = max_wait
+        self.pending = {}  # key -> (due, first, value, write, verify, callback)
+        self.active = None
+        self.closing = False
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="writes", daemon=True)
+        self.thread.start()
+
+    def submit(self, key, value, write, verify=None, callback=None, delay=None):
+        """Write value with write(value) once key has been quiet for delay
+        seconds (the debounce by default)."""
+        now = time.monotonic()
+        delay = self.debounce if delay is None else delay
+        with self.condition:
+            first = self.pending[key][1] if key in self.pending else now
+            due = min(now + delay, first + max(self.max_wait, delay))
+            self.pending[key] = (due, first, value, write, verify, callback)
+            self.condition.notify()
+
+    def busy(self, key):
+        """Whether a write for key is waiting or running."""
+        with self.condition:
+            return key in self.pending or key == self.active
+
+    def close(self):
+        """Write whatever is still pending right away and stop."""
+        with self.condition:
+            self.closing = True
+            self.condition.notify()
+        self.thread.join()
+
+    def _next(self):
+        with self.condition:
+            while True:
+                if self.pending:
+                    key = min(self.pending, key=lambda k: self.pending[k][0])
+                    remaining = self.pending[key][0] - time.monotonic()
+                    if remaining <= 0 or self.closing:
+                        self.active = key
+                        return key, self.pending.pop(key)
+                    self.condition.wait(remaining)
+                elif self.closing:
+                    return None, None
+                else:
+                    self.condition.wait()
+
+    def _run(self):
+        while True:
+            key, item = self._next()
+            if key is None:
+                return
+            due, first, value, write, verify, callback = item
+            try:
+                result = instrument.timed(f"write: {key}", write)(value)
+                if result is True and verify is not None and not verify(value):
+                    logging.error(f"Writing {value} to {key} did not take effect")
+                    result = False
+            except Exception as e:
+                logging.error(f"Error writing to {key}: {str(e)}")
+                result = False
+
+            with self.condition:
+                self.active = None
+                closing = self.closing
+            if callback is not None and not closing:
+                self.dispatch(callback, key, value, result)
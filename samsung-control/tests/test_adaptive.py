@@ -0,0 +1,44 @@
+import math
+
+from samsung_control.adaptive import VolatilityTracker
+from samsung_control.battery import NO_BATTERY
+from samsung_control.hwmon import FanSensor
+
+FAN = FanSensor(None, "samsung_galaxybook", 1, "", "fan1")
+
+
+def test_first_sample_is_still():
+    tracker = VolatilityTracker()
+    assert tracker.tracks("sensors")
+    assert not tracker.tracks("ac")
+    assert not tracker.moving("sensors", [(FAN, 2000)])
+
+
+def test_threshold():
+    tracker = VolatilityTracker()
+    tracker.moving("sensors", [(FAN, 2000)])
+    assert not tracker.moving("sensors", [(FAN, 2100)])
+    assert tracker.moving("sensors", [(FAN, 2250)])
+    # Compared with the previous sample, not the first
+    assert not tracker.moving("sensors", [(FAN, 2300)])
+
+
+def test_values_appearing_or_vanishing_move():
+    tracker = VolatilityTracker()
+    tracker.moving("sensors", [(FAN, 2000)])
+    assert tracker.moving("sensors", [])
+    assert tracker.moving("sensors", [(FAN, 2000)])
+    assert tracker.moving("sensors", None)
+    tracker.moving("battery", NO_BATTERY)
+    assert tracker.moving("battery", NO_BATTERY._replace(power=8.0, capacity=50))
+
+
+def test_unknown_values_are_still():
+    tracker = VolatilityTracker({"x": (lambda value: [value.total], 1)})
+    tracker.moving("x", None)
+    # A value that can't be extracted counts as no value
+    assert not tracker.moving("x", "no total")
+    tracker = VolatilityTracker({"x": (lambda value: value, 1)})
+    tracker.moving("x", [math.nan])
+    assert not tracker.moving("x", [5])
+    assert not tracker.moving("x", [math.inf])
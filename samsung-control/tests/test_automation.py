@@ -0,0 +1,135 @@
+from collections import namedtuple
+
+import pytest
+
+from samsung_control import automation
+from samsung_control.automation import Automation, load_rules, parse_rule
+from samsung_control.fakehw import FakeGalaxyBook
+
+Cpu = namedtuple("Cpu", "total")
+Thermal = namedtuple("Thermal", "package")
+
+
+def values(profile="balanced", ac=True, cpu=None, temp=None, battery=None):
+    return {
+        "platform_profile": profile,
+        "ac": ac,
+        "cpu": Cpu(cpu) if cpu is not None else None,
+        "thermal": Thermal(temp) if temp is not None else None,
+        "battery": battery,
+    }
+
+
+def rules(*lines):
+    return [parse_rule(line, automation.HYSTERESIS) for line in lines]
+
+
+class Writes(list):
+    def __call__(self, profile):
+        self.append(profile)
+        return True
+
+
+def test_parse_rule():
+    (rule,) = rules("battery and cpu < 20% for 1m -> low-power")
+    assert rule.duration == 60
+    assert rule.profile == "low-power"
+    assert len(rule.conditions) == 2
+
+
+@pytest.mark.parametrize(
+    "text", ["ac", "ac -> ", "fan ~ 3 -> quiet", "rpm > 3 -> quiet", "cpu > x -> a"]
+)
+def test_parse_rule_errors(text):
+    with pytest.raises(ValueError):
+        parse_rule(text, automation.HYSTERESIS)
+
+
+def test_load_rules_skips_bad_lines(tmp_path):
+    path = tmp_path / "automation.conf"
+    path.write_text(
+        "# comment\n"
+        "dwell 5m\n"
+        "hysteresis temp 10\n"
+        "ac and temp > 85 -> balanced  # hot\n"
+        "nonsense\n"
+        "ac -> performance\n"
+    )
+    loaded_rules, dwell = load_rules(str(path))
+    assert dwell == 300
+    assert [rule.profile for rule in loaded_rules] == ["balanced", "performance"]
+    assert loaded_rules[0].conditions[1].hysteresis == 10
+    assert load_rules(str(tmp_path / "missing.conf")) is None
+
+
+def test_first_fired_rule_wins():
+    writes = Writes()
+    engine = Automation(
+        rules("ac and temp > 85 -> quiet", "ac -> performance"), writes, dwell=0
+    )
+    engine.update(values(temp=90), 0)
+    assert writes == ["quiet"]
+
+
+def test_hysteresis_keeps_a_comparison_true():
+    writes = Writes()
+    engine = Automation(rules("temp > 85 -> quiet"), writes, dwell=0)
+    engine.update(values(temp=86), 0)
+    engine.update(values(profile="quiet", temp=83), 1)  # Within 3 °C
+    assert engine.rules[0].conditions[0].state
+    engine.update(values(profile="quiet", temp=82), 2)
+    assert not engine.rules[0].conditions[0].state
+
+
+def test_duration_and_dwell():
+    writes = Writes()
+    engine = Automation(rules("cpu < 20 for 10 -> quiet"), writes, dwell=30)
+    engine.update(values(cpu=5), 0)
+    engine.update(values(cpu=5), 9)
+    assert writes == []
+    engine.update(values(cpu=5), 10)
+    assert writes == ["quiet"]
+
+    # The switch back from elsewhere starts a new dwell period
+    engine.update(values(profile="quiet", cpu=5), 11)
+    engine.update(values(profile="performance", cpu=5), 20)
+    engine.update(values(profile="performance", cpu=5), 49)
+    assert writes == ["quiet"]
+    engine.update(values(profile="performance", cpu=5), 50)
+    assert writes == ["quiet", "quiet"]
+
+
+def test_unknown_values_do_not_fire():
+    writes = Writes()
+    engine = Automation(rules("battery -> quiet", "cpu < 20 -> quiet"), writes)
+    engine.update(values(ac=None), 0)
+    engine.update(values(profile=None, ac=False), 1)
+    assert writes == []
+
+
+def test_failed_write_is_retried():
+    engine = Automation(rules("ac -> quiet"), lambda profile: False, dwell=30)
+    engine.update(values(), 0)
+    assert engine.last_switch < 0
+
+
+def test_create_from_fake_tree(tmp_path):
+    fake = FakeGalaxyBook(str(tmp_path / "root"), cpus=2)
+    fake.create()
+    path = tmp_path / "automation.conf"
+    path.write_text("ac -> turbo\nac -> quiet\n")
+    hw = fake.galaxybook()
+    try:
+        engine = automation.create(hw, str(path))
+        assert [rule.profile for rule in engine.rules] == ["quiet"]
+        engine.update(values(), 0)
+        assert fake.get("sys/firmware/acpi/platform_profile") == "quiet"
+
+        # A writer of its own replaces the hardware write
+        writes = Writes()
+        engine = automation.create(hw, str(path), write=writes)
+        engine.update(values(profile="balanced"), 0)
+        assert writes == ["quiet"]
+        assert automation.create(hw, str(tmp_path / "missing.conf")) is None
+    finally:
+        hw.close()
@@ -0,0 +1,143 @@
+import threading
+
+import pytest
+
+from samsung_control.battery import NO_BATTERY, Battery, parse_properties
+from samsung_control.fakehw import FakeGalaxyBook
+
+
+def properties(status="Discharging", capacity="50", **extra):
+    properties = {
+        "POWER_SUPPLY_STATUS": status,
+        "POWER_SUPPLY_PRESENT": "1",
+        "POWER_SUPPLY_ENERGY_NOW": "30000000",
+        "POWER_SUPPLY_ENERGY_FULL": "60000000",
+        "POWER_SUPPLY_POWER_NOW": "10000000",
+        "POWER_SUPPLY_VOLTAGE_NOW": "12000000",
+    }
+    if capacity is not None:
+        properties["POWER_SUPPLY_CAPACITY"] = capacity
+    properties.update(extra)
+    return properties
+
+
+@pytest.fixture
+def battery():
+    return Battery(reader=None, supplies=None)
+
+
+def test_parse_properties():
+    data = b"POWER_SUPPLY_NAME=BAT1\nPOWER_SUPPLY_CAPACITY=80\nno separator\n"
+    assert parse_properties(data) == {
+        "POWER_SUPPLY_NAME": "BAT1",
+        "POWER_SUPPLY_CAPACITY": "80",
+    }
+
+
+def test_discharging(battery):
+    info = battery.update("BAT1", properties(), now=0)
+    assert info.capacity == 50
+    assert not info.charging
+    assert (info.energy, info.energy_full, info.power) == (30, 60, 10)
+    assert info.rate == 10
+    assert info.time_to_empty == 3 * 3600
+    assert info.time_to_full is None
+
+
+def test_time_to_full_stops_at_the_threshold(battery):
+    battery.threshold = 80
+    info = battery.update("BAT1", properties("Charging"), now=0)
+    assert info.charging
+    assert info.time_to_full == pytest.approx((48 - 30) / 10 * 3600)
+
+
+def test_rate_from_charge_and_current(battery):
+    info = battery.update(
+        "BAT1",
+        properties(
+            POWER_SUPPLY_ENERGY_NOW=None,
+            POWER_SUPPLY_POWER_NOW=None,
+            POWER_SUPPLY_CHARGE_NOW="2500000",
+            POWER_SUPPLY_CURRENT_NOW="-1000000",
+        ),
+        now=0,
+    )
+    assert info.energy == pytest.approx(30)
+    assert info.power == pytest.approx(12)
+
+
+def test_rate_from_energy_counter(battery):
+    battery.update("BAT1", properties(POWER_SUPPLY_POWER_NOW="0"), now=0)
+    info = battery.update(
+        "BAT1",
+        properties(POWER_SUPPLY_POWER_NOW="0", POWER_SUPPLY_ENERGY_NOW="29000000"),
+        now=360,
+    )
+    assert info.rate == pytest.approx(10)
+
+
+def test_discharge_rate_per_profile(battery):
+    battery.profile = "performance"
+    battery.update("BAT1", properties(POWER_SUPPLY_POWER_NOW="20000000"), now=0)
+    battery.profile = "quiet"
+    assert battery.update("BAT1", properties(), now=1).rate == 10
+    battery.profile = "performance"
+    assert battery.update("BAT1", properties(), now=2).rate < 20
+
+
+def test_missing_capacity_is_unknown(battery):
+    info = battery.update("BAT1", properties(capacity=None), now=0)
+    assert info.capacity is None
+    assert info.time_to_empty == 3 * 3600
+
+
+def test_malformed_capacity_raises(battery):
+    with pytest.raises(ValueError):
+        battery.update("BAT1", properties(capacity="lots"), now=0)
+
+
+def test_two_batteries(battery):
+    battery.update("BAT0", properties(capacity="100"), now=0)
+    info = battery.update(
+        "BAT1",
+        properties("Charging", capacity=None, POWER_SUPPLY_ENERGY_NOW="0"),
+        now=0,
+    )
+    assert info.status == "Charging"
+    assert info.energy == 30
+    assert info.capacity == 25  # Share of the total energy
+
+    info = battery.update(
+        "BAT1", properties(capacity=None, POWER_SUPPLY_ENERGY_FULL=None), now=1
+    )
+    assert info.capacity == 100  # Average of the capacities known
+
+
+def test_absent_battery(battery):
+    assert battery.update("BAT1", {"POWER_SUPPLY_PRESENT": "0"}) == NO_BATTERY
+
+
+def test_concurrent_updates_keep_every_battery(battery):
+    def update(name):
+        for i in range(200):
+            battery.update(name, properties(), now=i)
+
+    threads = [threading.Thread(target=update, args=(f"BAT{i}",)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(battery.properties) == ["BAT0", "BAT1", "BAT2", "BAT3"]
+
+
+def test_sample_reads_the_uevent_file(tmp_path):
+    fake = FakeGalaxyBook(str(tmp_path), cpus=2)
+    fake.create()
+    fake.advance()
+    hw = fake.galaxybook()
+    try:
+        info = hw.read_battery_info()
+        assert info.capacity == 80
+        assert info.energy_full is not None
+    finally:
+        hw.close()
@@ -0,0 +1,104 @@
+import errno
+import json
+import os
+import select
+
+import pytest
+
+from samsung_control import cli
+from samsung_control.fakehw import FakeGalaxyBook
+from samsung_control.sysfs import SysfsAttribute
+
+
+@pytest.fixture
+def fake(tmp_path, monkeypatch):
+    fake = FakeGalaxyBook(str(tmp_path), cpus=2)
+    fake.create()
+    fake.advance()
+    monkeypatch.setenv("SAMSUNG_CONTROL_ROOT", fake.root)
+    return fake
+
+
+def run(capsys, *argv):
+    status = cli.main(list(argv))
+    return status, json.loads(capsys.readouterr().out)
+
+
+def test_get(fake, capsys):
+    status, values = run(capsys, "get", "kbd_backlight", "platform_profile")
+    assert status == 0
+    assert values == {"kbd_backlight/brightness": 1, "platform_profile": "balanced"}
+
+
+def test_get_everything(fake, capsys):
+    status, values = run(capsys, "get")
+    assert status == 0
+    assert values["usb_charge"] == 1
+    assert values["battery"]["capacity"] == 80
+    assert "samsung_galaxybook fan1" in values["sensors"]
+
+
+def test_set_applies_every_pair(fake, capsys):
+    status, results = run(
+        capsys, "set", "usb_charge=off", "platform_profile=quiet", "kbd_backlight=2"
+    )
+    assert status == 0
+    assert results["usb_charge"] == {"ok": True, "value": 0}
+    assert fake.get("dev/samsung-galaxybook/usb_charge") == "0"
+    assert fake.get("sys/firmware/acpi/platform_profile") == "quiet"
+
+
+@pytest.mark.parametrize(
+    "pair",
+    ["platform_profile=turbo", "kbd_backlight=9", "usb_charge=maybe", "sensors=1"],
+)
+def test_set_validates_before_writing(fake, capsys, pair):
+    with pytest.raises(SystemExit) as exit:
+        cli.main(["set", "usb_charge=off", pair])
+    assert exit.value.code == 2
+    assert fake.get("dev/samsung-galaxybook/usb_charge") == "1"
+
+
+def test_unknown_attribute(fake):
+    with pytest.raises(SystemExit):
+        cli.main(["get", "no_such_attribute"])
+
+
+def test_watch_polls_an_attribute_that_stops_notifying(fake, capsys, monkeypatch):
+    path = fake.path("sys/firmware/acpi/platform_profile")
+    read_into = SysfsAttribute.read_into
+    polls = []
+
+    def failing_read_into(attr):
+        if attr.path == path and polls:
+            raise OSError(errno.EIO, os.strerror(errno.EIO))
+        return read_into(attr)
+
+    class Poller:
+        def __init__(self):
+            self.fds = {}
+
+        def register(self, fd, events):
+            self.fds[fd] = events
+
+        def unregister(self, fd):
+            del self.fds[fd]
+
+        def poll(self, timeout):
+            polls.append((dict(self.fds), timeout))
+            if len(polls) == 1:
+                # The driver raises POLLPRI, then refuses every read
+                (fd,) = self.fds
+                return [(fd, select.POLLPRI)]
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(SysfsAttribute, "read_into", failing_read_into)
+    monkeypatch.setattr(cli.select, "poll", Poller)
+    assert cli.main(["watch", "platform_profile", "--interval", "50"]) == 0
+
+    (fds, timeout), (fds_after, timeout_after) = polls
+    assert len(fds) == 1 and timeout is None
+    # No longer watched, polled at the interval instead
+    assert fds_after == {} and timeout_after <= 50
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["value"] for line in lines] == ["balanced", None]
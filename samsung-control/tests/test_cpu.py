@@ -0,0 +1,67 @@
+import pytest
+
+from samsung_control.cpu import CpuStat
+from samsung_control.sysfs import SysfsReader
+
+
+def stat(lines):
+    return "\n".join(lines) + "\nintr 12345 0 0\nctxt 99\n"
+
+
+@pytest.fixture
+def cpu(tmp_path):
+    path = tmp_path / "stat"
+
+    def write(*lines):
+        path.write_text(stat(lines))
+
+    reader = SysfsReader()
+    write("cpu  0 0 0 0 0 0 0 0 0 0", "cpu0 0 0 0 0 0 0 0 0 0 0")
+    cpu = CpuStat(reader, str(path))
+    cpu.write = write
+    yield cpu
+    reader.close()
+
+
+def test_first_sample_is_none(cpu):
+    assert cpu.sample() is None
+
+
+def test_usage_per_core(cpu):
+    cpu.write(
+        "cpu  0 0 0 0 0 0 0 0 0 0",
+        "cpu0 0 0 0 0 0 0 0 0 0 0",
+        "cpu2 0 0 0 0 0 0 0 0 0 0",
+    )
+    assert cpu.sample() is None
+    cpu.write(
+        "cpu  40 10 30 100 20 0 0 0 0 0",
+        "cpu0 40 10 20 10 20 0 0 0 0 0",
+        "cpu2 0 0 10 90 0 0 0 0 0 0",
+    )
+    usage = cpu.sample()
+    assert usage.total == pytest.approx(40)
+    assert usage.cores == (0, 2)
+    assert list(usage.busy) == pytest.approx([0.7, 0.1])
+    assert list(usage.user) == pytest.approx([0.5, 0])
+    assert list(usage.iowait) == pytest.approx([0.2, 0])
+
+
+def test_core_going_offline_resets(cpu):
+    cpu.sample()
+    cpu.write("cpu  10 0 0 10 0 0 0 0 0 0")
+    assert cpu.sample() is None
+    cpu.write("cpu  20 0 0 10 0 0 0 0 0 0")
+    usage = cpu.sample()
+    assert usage.total == 100
+    assert usage.cores == ()
+
+
+def test_counters_going_backwards_and_short_lines(cpu):
+    cpu.write("cpu  0 0 0 0 5", "cpu0 0 0 0 0 5")
+    cpu.sample()
+    cpu.write("cpu  10 0 0 10 0", "cpu0 10 0 0 10 0")
+    usage = cpu.sample()
+    assert usage.total == 50
+    assert list(usage.iowait) == [0]
+    assert list(usage.steal) == [0]
@@ -0,0 +1,162 @@
+"""samsung-controld on a private bus, sampling a fake Galaxy Book tree."""
+
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import pytest
+
+gi = pytest.importorskip("gi")
+if shutil.which("dbus-daemon") is None:
+    pytest.skip("needs dbus-daemon", allow_module_level=True)
+
+from gi.repository import Gio, GLib  # noqa: E402
+
+from samsung_control.bus import BUS_NAME, connect_daemon  # noqa: E402
+from samsung_control.fakehw import FakeGalaxyBook  # noqa: E402
+
+PACKAGE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def wait_for(condition, timeout=10):
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        if not context.iteration(False):
+            time.sleep(0.01)
+
+
+@pytest.fixture
+def bus():
+    process = subprocess.Popen(
+        ["dbus-daemon", "--session", "--nofork", "--nopidfile", "--print-address=1"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+    )
+    address = process.stdout.readline().strip()
+    yield address
+    process.terminate()
+    process.wait()
+
+
+@pytest.fixture
+def fake(tmp_path):
+    fake = FakeGalaxyBook(str(tmp_path / "root"), cpus=2)
+    fake.create()
+    fake.advance()
+    return fake
+
+
+def start_daemon(bus, fake, tmp_path, *args):
+    env = dict(os.environ, SAMSUNG_CONTROL_ROOT=fake.root)
+    process = subprocess.Popen(
+        [sys.executable, "-m", "samsung_control.daemon", "--address", bus]
+        + ["--rules", str(tmp_path / "no-rules.conf")]
+        + ["--telemetry", str(tmp_path / "telemetry.rrd"), *args],
+        cwd=PACKAGE_ROOT,
+        env=env,
+    )
+    connection = Gio.DBusConnection.new_for_address_sync(
+        bus,
+        Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT
+        | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+        None,
+        None,
+    )
+
+    def has_owner():
+        assert process.poll() is None, "samsung-controld exited"
+        reply = connection.call_sync(
+            "org.freedesktop.DBus",
+            "/org/freedesktop/DBus",
+            "org.freedesktop.DBus",
+            "NameHasOwner",
+            GLib.Variant("(s)", (BUS_NAME,)),
+            None,
+            Gio.DBusCallFlags.NONE,
+            -1,
+            None,
+        )
+        return reply.unpack()[0]
+
+    wait_for(has_owner)
+    return process
+
+
+def connect(bus):
+    outcome = []
+    connect_daemon(bus, lambda client, error: outcome.append((client, error)))
+    wait_for(lambda: outcome)
+    client, error = outcome[0]
+    assert error is None
+    return client
+
+
+@pytest.fixture
+def daemon(bus, fake, tmp_path):
+    process = start_daemon(bus, fake, tmp_path, "--no-polkit")
+    yield process
+    process.terminate()
+    assert process.wait(5) == 0
+
+
+def test_client_loads_controls_and_values(bus, daemon):
+    client = connect(bus)
+    try:
+        assert {"kbd_backlight", "platform_profile", "usb_charge"} <= client.attrs
+        assert client.read_kbd_backlight_max() == 3
+        assert "performance" in client.get_platform_profile_choices()
+        assert client.read_platform_profile() == "balanced"
+        assert client.read_value("usb_charge") == "1"
+        assert client.values["battery"].capacity == 80
+    finally:
+        client.close()
+
+
+def test_set_writes_the_fake_tree(bus, daemon, fake):
+    client = connect(bus)
+    try:
+        assert client.write_value("usb_charge", 0) is True
+        assert fake.get("dev/samsung-galaxybook/usb_charge") == "0"
+        assert client.write_platform_profile("quiet") is True
+        assert fake.get("sys/firmware/acpi/platform_profile") == "quiet"
+        assert client.write_value("platform_profile", "turbo") is False
+        assert client.write_value("no_such_control", 1) is False
+    finally:
+        client.close()
+
+
+def test_requested_values_arrive_as_signals(bus, daemon, fake):
+    client = connect(bus)
+    snapshots = []
+    client.connect(snapshots.append)
+    try:
+        client.start()
+        fake.set("sys/firmware/acpi/platform_profile", "performance")
+        client.request("platform_profile")
+        wait_for(
+            lambda: snapshots
+            and snapshots[-1].values.get("platform_profile") == "performance"
+        )
+    finally:
+        client.pause()
+        client.close()
+
+
+def test_set_without_polkit_authorization_is_refused(bus, fake, tmp_path):
+    # The private bus has no polkit, so every check fails
+    process = start_daemon(bus, fake, tmp_path)
+    client = connect(bus)
+    try:
+        assert client.write_value("usb_charge", 0) == "not_authorized"
+        assert fake.get("dev/samsung-galaxybook/usb_charge") == "1"
+        assert client.write_platform_profile("quiet") == "not_authorized"
+        assert fake.get("sys/firmware/acpi/platform_profile") == "balanced"
+    finally:
+        client.close()
+        process.terminate()
+        process.wait(5)
@@ -0,0 +1,101 @@
+import os
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from samsung_control.battery import BatteryInfo
+from samsung_control.cpu import CpuUsage
+from samsung_control.exporter import CONTENT_TYPE, MetricsExporter, render
+from samsung_control.hwmon import FanSensor, TemperatureSensor
+from samsung_control.sampler import Snapshot
+
+VALUES = {
+    "sensors": [
+        (FanSensor(None, "samsung_galaxybook", 1, "", "fan1"), 2400),
+        (TemperatureSensor(None, "acpitz", 1, "", 'zone "1"\\'), 45.5),
+    ],
+    "cpu": CpuUsage(12.5, ["cpu0"], [0.25], 10, 2, 0, 0, 0),
+    "battery": BatteryInfo(
+        80, False, "Discharging", 40.0, 50.0, 8.0, 12.0, None, 8.0, 18000.0, None
+    ),
+    "ac": False,
+    "usb_charge": "1",
+    "kbd_backlight": 2,
+    "platform_profile": "quiet",
+}
+
+
+@pytest.fixture
+def unused_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def lines(body):
+    return body.decode().splitlines()
+
+
+def test_render():
+    body = lines(render(VALUES, ("quiet", "balanced"), now=1000))
+    assert body[-1] == "# EOF"
+    assert 'samsung_fan_speed_rpm{chip="samsung_galaxybook",sensor="fan1"} 2400' in body
+    assert "samsung_cpu_usage_percent 12.5" in body
+    assert 'samsung_cpu_core_busy_ratio{core="cpu0"} 0.25' in body
+    assert "samsung_battery_capacity_percent 80" in body
+    assert "samsung_battery_charging 0" in body
+    assert "samsung_ac_online 0" in body
+    assert "samsung_usb_charge 1" in body
+    assert 'samsung_platform_profile{profile="quiet"} 1' in body
+    assert 'samsung_platform_profile{profile="balanced"} 0' in body
+    assert "samsung_exporter_last_sample_timestamp_seconds 1000" in body
+    # Unknown values are left out, and so are families without samples
+    assert not any(line.startswith("samsung_battery_cycle_count") for line in body)
+    assert "# TYPE samsung_battery_cycle_count gauge" not in body
+    assert "# TYPE samsung_fan_speed_rpm gauge" in body
+
+
+def test_labels_are_escaped():
+    body = lines(render(VALUES, now=0))
+    assert (
+        'samsung_temperature_celsius{chip="acpitz",sensor="zone \\"1\\"\\\\"} 45.5'
+        in body
+    )
+
+
+def test_render_without_values():
+    assert lines(render({}, now=0))[-2:] == [
+        "samsung_exporter_last_sample_timestamp_seconds 0",
+        "# EOF",
+    ]
+
+
+def test_textfile_is_replaced(tmp_path):
+    path = tmp_path / "samsung.prom"
+    exporter = MetricsExporter(textfile=str(path))
+    exporter.on_snapshot(Snapshot(1, 0, VALUES, {}, set()))
+    assert path.read_bytes() == exporter.body
+    assert oct(path.stat().st_mode & 0o777) == "0o644"
+    assert os.listdir(tmp_path) == ["samsung.prom"]  # No temporary left behind
+
+
+def test_textfile_error_is_logged(tmp_path, caplog):
+    exporter = MetricsExporter(textfile=str(tmp_path / "missing" / "samsung.prom"))
+    exporter.on_snapshot(Snapshot(1, 0, VALUES, {}, set()))
+    assert "Error writing metrics" in caplog.text
+
+
+def test_http(unused_port):
+    exporter = MetricsExporter(port=unused_port)
+    try:
+        exporter.on_snapshot(Snapshot(1, 0, VALUES, {}, set()))
+        url = f"http://127.0.0.1:{unused_port}"
+        with urllib.request.urlopen(f"{url}/metrics") as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert response.read() == exporter.body
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other")
+    finally:
+        exporter.close()
@@ -0,0 +1,97 @@
+import os
+import subprocess
+import sys
+from array import array
+
+import pytest
+
+from samsung_control.history import MinMaxDecimator, RingBuffer, to_points
+
+PACKAGE_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def filled(capacity, times):
+    ring = RingBuffer(capacity)
+    for t in times:
+        ring.append(t, t * 10)
+    return ring
+
+
+def test_append_wraps_around():
+    ring = filled(4, range(6))
+    assert len(ring) == 4
+    assert ring.window(0) == (array("d", [2, 3, 4, 5]), array("d", [20, 30, 40, 50]))
+
+
+@pytest.mark.parametrize("count", [3, 4, 6, 7])
+def test_window_keeps_the_sample_before(count):
+    # Not yet full, full, and wrapped at different points
+    ring = filled(4, range(count))
+    times, values = ring.window(count - 1.5)
+    assert list(times) == [count - 2, count - 1]
+    assert list(values) == [t * 10 for t in times]
+
+
+@pytest.mark.parametrize("count", [3, 6, 7])
+def test_after_and_count_since(count):
+    ring = filled(4, range(count))
+    last = count - 1
+    assert list(ring.after(last - 2)[0]) == [last - 1, last]
+    assert list(ring.after(last)[0]) == []
+    assert ring.count_since(last - 1) == 2
+    assert ring.count_since(-1) == len(ring)
+
+
+def test_empty_and_clear():
+    ring = RingBuffer(4)
+    assert ring.window(0) == (array("d"), array("d"))
+    assert ring.after(0) == (array("d"), array("d"))
+    ring = filled(4, range(6))
+    ring.clear()
+    assert len(ring) == 0
+    ring.append(10, 1)
+    assert ring.window(0) == (array("d", [10]), array("d", [1]))
+
+
+def test_decimator_buckets_min_and_max():
+    ring = RingBuffer(16)
+    for t, v in ((0, 5), (1, 1), (2, 9), (3, 4), (4, 7)):
+        ring.append(t, v)
+    decimator = MinMaxDecimator()
+    decimator.update(ring, 0, 2)
+    assert decimator.series() == (
+        array("d", [1, 1, 3, 3, 5, 5]),
+        array("d", [1, 5, 4, 9, 7, 7]),
+    )
+
+
+def test_decimator_updates_incrementally():
+    ring = RingBuffer(64)
+    decimator = MinMaxDecimator()
+    for t in range(40):
+        ring.append(t, t % 7)
+        decimator.update(ring, t - 20, 4)
+        expected = MinMaxDecimator()
+        expected.update(ring, t - 20, 4)
+        # Only the bucket the window starts in may hold older samples
+        times, values = decimator.series()
+        expected_times, expected_values = expected.series()
+        assert times[2:] == expected_times[2:]
+        assert values[2:] == expected_values[2:]
+    # Buckets that scrolled out are dropped
+    assert decimator.buckets[0][0] == 19 // 4
+
+
+def test_to_points():
+    xs, ys = to_points(array("d", [10, 12]), array("d", [0, 50]), 10, 5, 100, 2)
+    assert list(xs) == [0, 10]
+    assert list(ys) == [100, 0]
+
+
+def test_numpy_is_imported_on_first_use():
+    code = (
+        "import sys\n"
+        "from samsung_control import history\n"
+        "assert 'numpy' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=PACKAGE_ROOT, check=True)
@@ -0,0 +1,82 @@
+import os
+
+import pytest
+
+from samsung_control.hwmon import HwmonRegistry
+from samsung_control.sysfs import SysfsReader
+
+TREE = {
+    "hwmon0/name": "samsung_galaxybook",
+    "hwmon0/fan1_input": 2400,
+    "hwmon1/name": "coretemp",
+    "hwmon1/temp1_label": "Package id 0",
+    "hwmon1/temp1_input": 45000,
+    "hwmon1/temp2_label": "Core 0",
+    "hwmon1/temp2_input": 44000,
+    "hwmon1/temp2_max": 100000,
+}
+
+
+def write(root, files):
+    for relative, value in files.items():
+        path = os.path.join(root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"{value}\n")
+
+
+@pytest.fixture
+def root(tmp_path):
+    write(str(tmp_path), TREE)
+    return str(tmp_path)
+
+
+@pytest.fixture
+def registry(root):
+    reader = SysfsReader()
+    yield HwmonRegistry(reader, root)
+    reader.close()
+
+
+def test_finds_and_reads_sensors(registry):
+    assert [s.name for s in registry.sensors()] == [
+        "samsung_galaxybook fan1",
+        "coretemp Package id 0",
+        "coretemp Core 0",
+    ]
+    (fan,) = registry.fans()
+    assert fan.read() == 2400
+    package = registry.get("coretemp", "Package id 0")
+    assert package.read() == 45
+    assert package.format(45.0) == "45.0 °C"
+    assert registry.get("coretemp", "Core 9") is None
+
+
+def test_scans_once_until_invalidated(registry, root):
+    registry.sensors()
+    assert registry.generation == 1
+    registry.temperatures()
+    registry.get("coretemp", "Core 0")
+    assert registry.generation == 1
+
+    write(root, {"hwmon10/name": "acpitz", "hwmon10/temp1_input": 40000})
+    write(root, {"hwmon2/name": "BAT1", "hwmon2/power1_input": 5000000})
+    registry.invalidate()
+    names = [s.name for s in registry.sensors()]
+    assert registry.generation == 2
+    # hwmon10 comes after hwmon2, inputs by kind and index
+    assert names[-2:] == ["BAT1 power1", "acpitz temp1"]
+    assert registry.powers()[0].read() == 5
+
+
+def test_missing_root(tmp_path, caplog):
+    reader = SysfsReader()
+    registry = HwmonRegistry(reader, str(tmp_path / "missing"))
+    assert registry.sensors() == []
+    assert "Error listing" in caplog.text
+    reader.close()
+
+
+def test_unlabelled_chip_uses_the_device_name(registry, root):
+    os.remove(os.path.join(root, "hwmon0/name"))
+    assert registry.fans()[0].name == "hwmon0 fan1"
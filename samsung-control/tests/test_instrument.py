@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from samsung_control import instrument
+from samsung_control.instrument import FrameStats, Histogram
+
+
+@pytest.fixture
+def histograms(monkeypatch):
+    monkeypatch.setattr(instrument, "histograms", {})
+    monkeypatch.setattr(instrument, "frames", FrameStats())
+    return instrument.histograms
+
+
+@pytest.fixture
+def recording(histograms):
+    instrument.enable()
+    yield histograms
+    instrument.disable()
+
+
+def test_histogram_buckets_and_percentiles():
+    histogram = Histogram()
+    assert histogram.percentile(0.5) == 0
+    for seconds in [0.000003] * 9 + [0.010]:
+        histogram.add(seconds)
+    # 3 µs falls in [2, 4), 10 ms in [8192, 16384)
+    assert histogram.counts[2] == 9
+    assert histogram.counts[14] == 1
+    assert histogram.percentile(0.5) == pytest.approx(0.000004)
+    assert histogram.percentile(0.99) == pytest.approx(0.010)  # Capped at max
+    summary = histogram.summary()
+    assert summary["count"] == 10
+    assert summary["buckets_us"] == {"<4": 9, "<16384": 1}
+
+
+def test_long_durations_go_to_the_last_bucket():
+    histogram = Histogram()
+    histogram.add(3600)
+    assert histogram.counts[-1] == 1
+
+
+def test_timed_records_only_while_enabled(histograms):
+    @instrument.timed("work")
+    def work(value):
+        return value * 2
+
+    assert work(2) == 4
+    assert "work" not in histograms
+
+    instrument.enable()
+    try:
+        assert work(3) == 6
+        failing = instrument.timed("fail", lambda: 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            failing()
+    finally:
+        instrument.disable()
+    assert histograms["work"].count == 1
+    assert histograms["fail"].count == 1  # Failures are timed too
+
+
+def test_frame_stats(recording):
+    refresh = 1 / 60
+    for frame_time in (0, refresh, 2 * refresh, 5 * refresh, 10):
+        instrument.frames.add(frame_time, refresh)
+    assert instrument.frames.frames == 5
+    # Two frames missed before the fourth, the pause before the last is idle
+    assert instrument.frames.missed == 2
+    assert recording["frame interval"].count == 3
+
+
+def test_dump(recording, tmp_path):
+    instrument.record("draw: fan graph", 0.002)
+    path = tmp_path / "report.json"
+    instrument.dump(str(path))
+    report = json.loads(path.read_text())
+    assert report["histograms"]["draw: fan graph"]["count"] == 1
+    assert "draw: fan graph" in instrument.format_report()
@@ -0,0 +1,42 @@
+import logging
+import queue
+
+from samsung_control.logs import RepeatSuppressingQueueHandler
+
+
+def record(msg, created, level=logging.ERROR):
+    record = logging.makeLogRecord(
+        {"name": "root", "levelno": level, "msg": msg, "created": created}
+    )
+    record.levelname = logging.getLevelName(level)
+    return record
+
+
+def emitted(records):
+    messages = []
+    while not records.empty():
+        messages.append(records.get().getMessage())
+    return messages
+
+
+def test_repeats_are_counted_not_logged():
+    records = queue.SimpleQueue()
+    handler = RepeatSuppressingQueueHandler(records)
+    for created in (0, 1, 2):
+        handler.emit(record("Error reading fan", created))
+    handler.emit(record("Error reading battery", 3))
+    assert emitted(records) == [
+        "Error reading fan",
+        "Previous message repeated 2 times",
+        "Error reading battery",
+    ]
+
+
+def test_repeats_get_through_after_the_interval():
+    records = queue.SimpleQueue()
+    handler = RepeatSuppressingQueueHandler(records, repeat_interval=60)
+    handler.emit(record("Error reading fan", 0))
+    handler.emit(record("Error reading fan", 61))
+    # A different level is a different message
+    handler.emit(record("Error reading fan", 62, logging.WARNING))
+    assert emitted(records) == ["Error reading fan"] * 3
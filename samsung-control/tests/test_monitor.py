@@ -0,0 +1,119 @@
+"""Monitor's uevent handling, driven through a FakeUeventSource."""
+
+import os
+
+import pytest
+
+pytest.importorskip("gi")
+
+from samsung_control.fakehw import FakeGalaxyBook  # noqa: E402
+from samsung_control.monitor import Monitor  # noqa: E402
+from samsung_control.uevent import FakeUeventSource  # noqa: E402
+
+POWER_SUPPLY = "/devices/LNXSYSTM:00/LNXSYBUS:00/PNP0C0A:00/power_supply"
+
+
+@pytest.fixture
+def fake(tmp_path):
+    fake = FakeGalaxyBook(str(tmp_path), cpus=2)
+    fake.create()
+    fake.advance()
+    return fake
+
+
+@pytest.fixture
+def monitor(fake):
+    hw = fake.galaxybook()
+    monitor = Monitor(hw, dispatch=lambda func: func())
+    monitor.snapshots = []
+    monitor.connect(monitor.snapshots.append)
+    monitor.source = FakeUeventSource()
+    assert monitor.listen_uevents(monitor.source)
+    yield monitor
+    monitor.close()
+    hw.close()
+
+
+def emit(monitor, action, name, **properties):
+    monitor.source.emit(
+        action,
+        f"{POWER_SUPPLY}/{name}",
+        SUBSYSTEM="power_supply",
+        POWER_SUPPLY_NAME=name,
+        **properties,
+    )
+    monitor.uevents.dispatch()
+
+
+def requested(monitor):
+    with monitor.engine.lock:
+        names, monitor.engine.requested = monitor.engine.requested, set()
+    return names
+
+
+def test_ac_plug_and_unplug(monitor):
+    emit(monitor, "change", "ADP1", POWER_SUPPLY_ONLINE="1")
+    assert monitor.on_ac is True
+    assert monitor.snapshots[-1].values["ac"] is True
+    # The charge state follows, even without an event from the battery
+    assert requested(monitor) == {"battery"}
+
+    emit(monitor, "change", "ADP1", POWER_SUPPLY_ONLINE="0")
+    assert monitor.on_ac is False
+    assert monitor.snapshots[-1].values["ac"] is False
+
+
+def test_adapter_event_without_state_is_read(monitor):
+    emit(monitor, "change", "ADP1")
+    assert monitor.on_ac is None
+    assert not monitor.snapshots
+    assert requested(monitor) == {"ac", "battery"}
+
+
+def test_battery_change_carries_its_values(monitor):
+    emit(
+        monitor,
+        "change",
+        "BAT1",
+        POWER_SUPPLY_STATUS="Charging",
+        POWER_SUPPLY_PRESENT="1",
+        POWER_SUPPLY_CAPACITY="42",
+    )
+    info = monitor.snapshots[-1].values["battery"]
+    assert info.capacity == 42
+    assert info.charging
+    assert requested(monitor) == set()
+
+
+def test_battery_add_and_remove_rescan(monitor, fake):
+    hw = monitor.hw
+    assert [s.name for s in hw.power_supplies.batteries()] == ["BAT1"]
+
+    os.makedirs(fake.path("sys/class/power_supply/BAT2"))
+    fake.set("sys/class/power_supply/BAT2/type", "Battery")
+    emit(monitor, "add", "BAT2")
+    assert requested(monitor) == {"battery", "ac"}
+    assert [s.name for s in hw.power_supplies.batteries()] == ["BAT1", "BAT2"]
+
+    os.remove(fake.path("sys/class/power_supply/BAT2/type"))
+    os.rmdir(fake.path("sys/class/power_supply/BAT2"))
+    emit(monitor, "remove", "BAT2")
+    assert requested(monitor) == {"battery", "ac"}
+    assert [s.name for s in hw.power_supplies.batteries()] == ["BAT1"]
+
+
+def test_malformed_battery_event_falls_back_to_reading(monitor):
+    emit(monitor, "change", "BAT1", POWER_SUPPLY_CAPACITY="lots")
+    assert not monitor.snapshots
+    assert requested(monitor) == {"battery"}
+
+    monitor.source.peer.send(b"garbage without an action")
+    monitor.uevents.dispatch()
+    assert not monitor.snapshots
+    assert requested(monitor) == set()
+
+
+def test_unknown_supplies_are_ignored(monitor):
+    emit(monitor, "change", "hidpp_battery_0", POWER_SUPPLY_CAPACITY="50")
+    assert not monitor.snapshots
+    assert requested(monitor) == set()
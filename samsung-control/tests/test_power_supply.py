@@ -0,0 +1,89 @@
+import os
+import threading
+
+import pytest
+
+from samsung_control.fakehw import FakeGalaxyBook
+from samsung_control.power_supply import PowerSupplyRegistry
+from samsung_control.sysfs import SysfsReader
+
+
+@pytest.fixture
+def fake(tmp_path):
+    fake = FakeGalaxyBook(str(tmp_path), cpus=1)
+    fake.create()
+    return fake
+
+
+@pytest.fixture
+def registry(fake):
+    reader = SysfsReader()
+    yield PowerSupplyRegistry(reader, fake.path("sys/class/power_supply"))
+    reader.close()
+
+
+def add_supply(fake, name, supply_type, scope=None):
+    os.makedirs(fake.path(f"sys/class/power_supply/{name}"))
+    fake.set(f"sys/class/power_supply/{name}/type", supply_type)
+    if scope is not None:
+        fake.set(f"sys/class/power_supply/{name}/scope", scope)
+
+
+def test_classifies_supplies(fake, registry):
+    add_supply(fake, "ucsi-source-psy-USBC000:001", "USB")
+    add_supply(fake, "hidpp_battery_0", "Battery", scope="Device")
+    add_supply(fake, "BAT10", "Battery")
+    registry.invalidate()
+
+    assert [s.name for s in registry.batteries()] == ["BAT1", "BAT10"]
+    assert [s.name for s in registry.adapters()] == [
+        "ADP1",
+        "ucsi-source-psy-USBC000:001",
+    ]
+    assert registry.is_battery("BAT10")
+    assert not registry.is_battery("hidpp_battery_0")
+    assert registry.is_adapter("ADP1")
+
+
+def test_battery_attr_path(fake, registry):
+    path = registry.battery_attr_path("charge_control_end_threshold")
+    assert path == fake.path("sys/class/power_supply/BAT1/charge_control_end_threshold")
+    assert registry.battery_attr_path("charge_control_start_threshold") is None
+
+
+def test_only_rescans_after_invalidate(fake, registry):
+    supplies = registry.supplies()
+    add_supply(fake, "BAT2", "Battery")
+    assert registry.supplies() is supplies
+    registry.invalidate()
+    assert [s.name for s in registry.batteries()] == ["BAT1", "BAT2"]
+
+
+def test_concurrent_rescans_and_reads(fake, registry):
+    # The battery and ac samplers rescan on their own threads after a
+    # hotplug uevent, while the other one may be reading
+    errors = []
+    stop = threading.Event()
+
+    def sample(kind):
+        while not stop.is_set():
+            try:
+                for supply in getattr(registry, kind)():
+                    name = "uevent" if kind == "batteries" else "online"
+                    registry.reader.read_bytes(os.path.join(supply.path, name))
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [
+        threading.Thread(target=sample, args=(kind,))
+        for kind in ("batteries", "adapters", "batteries", "adapters")
+    ]
+    for thread in threads:
+        thread.start()
+    for _ in range(300):
+        registry.invalidate()
+    stop.set()
+    for thread in threads:
+        thread.join()
+    assert errors == []
@@ -0,0 +1,160 @@
+import errno
+import os
+import threading
+
+import pytest
+
+from samsung_control.sampler import SamplingEngine
+from samsung_control.sysfs import SysfsReader
+
+
+class FakeNotifyAttribute:
+    """A brightness_hw_changed that has never changed: pollable, but every
+    read fails with ENODATA."""
+
+    def __init__(self, path):
+        self.path = path
+        self.fd = None
+        self.reads = 0
+        self.pipe = None
+
+    def open(self):
+        if self.fd is None:
+            self.pipe = os.pipe()
+            self.fd = self.pipe[0]
+        return self.fd
+
+    def read_into(self):
+        self.reads += 1
+        self.open()
+        raise OSError(errno.ENODATA, os.strerror(errno.ENODATA))
+
+    def close(self):
+        if self.pipe is not None:
+            for fd in self.pipe:
+                os.close(fd)
+            self.pipe = None
+            self.fd = None
+
+
+class FakeReader:
+    def __init__(self):
+        self.attributes = {}
+
+    def attribute(self, path):
+        if path not in self.attributes:
+            self.attributes[path] = FakeNotifyAttribute(path)
+        return self.attributes[path]
+
+
+@pytest.fixture
+def notify_path(tmp_path):
+    path = tmp_path / "brightness_hw_changed"
+    path.write_text("")
+    return str(path)
+
+
+def run_engine(reader, samplers):
+    engine = SamplingEngine(reader, lambda func: func())
+    snapshots = []
+    done = threading.Event()
+
+    def on_snapshot(snapshot):
+        snapshots.append(snapshot)
+        done.set()
+
+    engine.connect(on_snapshot)
+    watched = {name: engine.add_sampler(name, *args) for name, args in samplers}
+    engine.start()
+    engine.request(*watched)
+    try:
+        assert done.wait(2)
+    finally:
+        engine.stop()
+    return engine, watched, snapshots[-1]
+
+
+def test_failing_sampler_is_stale():
+    def broken():
+        raise OSError(errno.EIO, os.strerror(errno.EIO))
+
+    engine, watched, snapshot = run_engine(
+        SysfsReader(), [("usb_charge", (broken,)), ("cpu", (lambda: 1.0,))]
+    )
+    assert not any(watched.values())
+    assert snapshot.values == {"cpu": 1.0}
+    assert snapshot.stale == {"usb_charge"}
+
+
+def test_hanging_sampler_delivers_late():
+    release = threading.Event()
+    engine = SamplingEngine(SysfsReader(), lambda func: func(), timeout=0.05)
+    snapshots = []
+    first, late = threading.Event(), threading.Event()
+
+    def on_snapshot(snapshot):
+        snapshots.append(snapshot)
+        first.set()
+        if "fan" in snapshot.values:
+            late.set()
+
+    def hang():
+        release.wait(2)
+        return 2400
+
+    engine.connect(on_snapshot)
+    engine.add_sampler("fan", hang)
+    engine.start()
+    try:
+        engine.request("fan")
+        assert first.wait(2)
+        assert snapshots[0].stale == {"fan"}
+        release.set()
+        assert late.wait(2)
+    finally:
+        engine.stop()
+    assert snapshots[-1].values == {"fan": 2400}
+    assert snapshots[-1].stale == frozenset()
+
+
+def test_notify_attribute_is_watched_after_the_first_sample(tmp_path):
+    path = tmp_path / "brightness_hw_changed"
+    path.write_text("1\n")
+    reader = SysfsReader()
+    engine, watched, snapshot = run_engine(
+        reader, [("kbd_backlight", (lambda: 1, None, str(path)))]
+    )
+    assert watched == {"kbd_backlight": True}
+    assert snapshot.values == {"kbd_backlight": 1}
+    assert reader.attribute(str(path)).fd in engine.watched
+    reader.close()
+
+
+def test_enodata_on_notify_attribute_still_samples(notify_path):
+    reader = FakeReader()
+    engine, watched, snapshot = run_engine(
+        reader, [("kbd_backlight", (lambda: 2, None, notify_path))]
+    )
+
+    assert watched["kbd_backlight"]
+    # add_sampler() and run_engine() both request it, one or two rounds
+    assert reader.attributes[notify_path].reads >= 1
+    assert snapshot.values == {"kbd_backlight": 2}
+    assert snapshot.stale == frozenset()
+    # Still watched, the first Fn+F9 press raises POLLPRI
+    assert reader.attributes[notify_path].fd in engine.watched
+    reader.attributes[notify_path].close()
+
+
+def test_unopenable_notify_attribute_is_polled(notify_path):
+    reader = FakeReader()
+
+    def fail():
+        raise OSError(errno.EACCES, os.strerror(errno.EACCES))
+
+    reader.attribute(notify_path).open = fail
+    engine = SamplingEngine(reader, lambda func: func())
+    try:
+        assert not engine.add_sampler("kbd_backlight", lambda: 2, None, notify_path)
+    finally:
+        engine.stop()
@@ -0,0 +1,79 @@
+import os
+import threading
+
+from samsung_control.sysfs import SysfsAttribute, SysfsReader
+
+
+def write(path, text):
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def test_reads_follow_changes_on_one_descriptor(tmp_path):
+    path = str(tmp_path / "brightness")
+    write(path, "1\n")
+    attribute = SysfsAttribute(path)
+    assert attribute.read_int() == 1
+    fd = attribute.fd
+    write(path, "3\n")
+    assert attribute.read() == "3"
+    assert attribute.fd == fd
+    attribute.close()
+
+
+def test_buffer_grows_for_large_files(tmp_path):
+    path = str(tmp_path / "stat")
+    write(path, "x" * 10000)
+    assert len(SysfsAttribute(path, size=16).read_bytes()) == 10000
+
+
+def test_reopens_after_the_file_was_replaced(tmp_path):
+    path = str(tmp_path / "fan1_input")
+    write(path, "1000")
+    reader = SysfsReader()
+    assert reader.read_int(path) == 1000
+    os.close(reader.attribute(path).fd)  # As if the module was reloaded
+    write(path, "2000")
+    assert reader.read_int(path) == 2000
+    reader.close()
+
+
+def test_forgotten_attribute_keeps_no_descriptor(tmp_path):
+    path = str(tmp_path / "online")
+    write(path, "1")
+    reader = SysfsReader()
+    attribute = reader.attribute(path)
+    assert attribute.read_int() == 1
+    reader.forget(path)
+    assert attribute.fd is None
+    # Whoever still holds it reads the path, without leaking a descriptor
+    assert attribute.read_int() == 1
+    assert attribute.fd is None
+    assert reader.attribute(path) is not attribute
+
+
+def test_forget_while_reading(tmp_path):
+    path = str(tmp_path / "uevent")
+    write(path, "POWER_SUPPLY_CAPACITY=80\n")
+    reader = SysfsReader()
+    errors = []
+    stop = threading.Event()
+
+    def read():
+        while not stop.is_set():
+            try:
+                assert reader.read_bytes(path).startswith(b"POWER_SUPPLY")
+            except Exception as e:
+                errors.append(e)
+                return
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for _ in range(200):
+        reader.forget(path)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    reader.close()
+    assert errors == []
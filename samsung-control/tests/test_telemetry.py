@@ -0,0 +1,143 @@
+import os
+from collections import namedtuple
+
+import pytest
+
+from samsung_control.telemetry import (
+    PROFILES,
+    TelemetryRecorder,
+    TelemetryStore,
+)
+
+# Small tiers: 1 s for 10 s, 10 s for a minute
+TIERS = ((1, 10), (10, 6))
+METRICS = ("fan", "cpu")
+NOW = 1_000_000.0
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = TelemetryStore(str(tmp_path / "t.rrd"), TIERS, METRICS)
+    yield store
+    store.close()
+
+
+def test_consolidates_min_avg_max(store):
+    for offset, value in ((0.1, 10), (0.5, 30), (0.9, 20)):
+        store.add("fan", value, now=NOW + offset)
+    (slot,) = store.query("fan", NOW, NOW, now=NOW + 1)
+    assert (slot.time, slot.min, slot.avg, slot.max, slot.count) == (
+        NOW,
+        10,
+        20,
+        30,
+        3,
+    )
+    assert store.query("cpu", NOW, NOW, now=NOW + 1) == []
+
+
+def test_query_reads_the_finest_tier_covering_the_range(store):
+    for second in range(60):
+        store.add("fan", second, now=NOW + second)
+    now = NOW + 59
+
+    recent = store.query("fan", now - 5, now, now=now)
+    assert [s.avg for s in recent] == [54, 55, 56, 57, 58, 59]
+
+    older = store.query("fan", NOW, now, now=now)
+    assert store.tier_for(NOW, now) == (10, 6)
+    assert [s.time for s in older] == [NOW + 10 * i for i in range(6)]
+    assert [s.count for s in older] == [10] * 6
+    assert older[0].avg == pytest.approx(4.5)
+
+
+def test_old_slots_age_out(store):
+    store.add("fan", 1, now=NOW)
+    # Same ring position one wrap later
+    store.add("fan", 2, now=NOW + 10)
+    assert [s.avg for s in store.query("fan", NOW, NOW + 10, now=NOW + 10)] == [2]
+    # NOW + 21 falls on the slot NOW + 1 was written to, a wrap ago: it
+    # must not be read back
+    store.add("fan", 3, now=NOW + 1)
+    store.add("fan", 4, now=NOW + 25)
+    recent = store.query("fan", NOW + 20, NOW + 25, now=NOW + 25)
+    assert [(s.time, s.avg) for s in recent] == [(NOW + 25, 4)]
+
+
+def test_history_survives_reopening(tmp_path, store):
+    store.add("cpu", 42.0, now=NOW)
+    store.close()
+    reopened = TelemetryStore(store.path, TIERS, METRICS)
+    assert reopened.query("cpu", NOW, NOW, now=NOW)[0].avg == 42.0
+    reopened.close()
+
+
+def test_second_instance_and_readonly_only_read(tmp_path, store):
+    store.add("cpu", 1.0, now=NOW)
+    second = TelemetryStore(store.path, TIERS, METRICS)
+    readonly = TelemetryStore(store.path, TIERS, METRICS, readonly=True)
+    assert store.writable
+    assert not second.writable
+    assert not readonly.writable
+
+    second.add("cpu", 100.0, now=NOW)
+    readonly.add("cpu", 100.0, now=NOW)
+    store.add("cpu", 3.0, now=NOW)
+    # The writer's samples show up in the readers, theirs are dropped
+    for reader in (second, readonly):
+        assert reader.query("cpu", NOW, NOW, now=NOW)[0].avg == 2.0
+    second.close()
+    readonly.close()
+
+
+def test_readonly_needs_an_existing_file(tmp_path):
+    store = TelemetryStore(str(tmp_path / "missing.rrd"), TIERS, readonly=True)
+    assert store.query("fan", NOW, NOW, now=NOW) == []
+    assert not os.path.exists(tmp_path / "missing.rrd")
+
+
+def test_other_layouts_are_reinitialized(tmp_path, store):
+    store.add("fan", 1, now=NOW)
+    store.close()
+    other = TelemetryStore(store.path, ((1, 20),), METRICS)
+    assert other.query("fan", NOW, NOW, now=NOW) == []
+    other.close()
+
+
+Sensor = namedtuple("Sensor", "kind")
+Cpu = namedtuple("Cpu", "total")
+Battery = namedtuple("Battery", "capacity")
+Snapshot = namedtuple("Snapshot", "values stamps")
+
+
+def test_recorder_adds_new_samples_once(tmp_path):
+    store = TelemetryStore(str(tmp_path / "t.rrd"))
+    recorder = TelemetryRecorder(store)
+    values = {
+        "sensors": (
+            (Sensor("fan"), 2400),
+            (Sensor("fan"), 0),
+            (Sensor("temp"), 45.0),
+            (Sensor("temp"), 71.0),
+            (Sensor("temp"), None),
+        ),
+        "cpu": Cpu(12.5),
+        "battery": Battery(None),
+        "platform_profile": "quiet",
+        "usb_charge": "1",
+        "ac": None,
+    }
+    stamps = dict.fromkeys(values, 1.0)
+    recorder.on_snapshot(Snapshot(values, stamps))
+    recorder.on_snapshot(Snapshot(values, stamps))  # Nothing new
+
+    def latest(metric):
+        slots = store.query(metric, 0, None)
+        return [(s.avg, s.count) for s in slots]
+
+    assert latest("fan") == [(2400, 1)]
+    assert latest("temp") == [(71.0, 1)]
+    assert latest("cpu") == [(12.5, 1)]
+    assert latest("battery") == []
+    assert latest("profile") == [(PROFILES.index("quiet"), 1)]
+    store.close()
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+from samsung_control.sysfs import SysfsReader
+from samsung_control.thermal import ThermalSampler
+
+
+def write(root, files):
+    for relative, value in files.items():
+        path = os.path.join(root, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(f"{value}\n")
+
+
+def cpu(index, cur, limit=3000000, hw_max=4000000):
+    cpufreq = f"cpu/cpu{index}/cpufreq"
+    return {
+        f"{cpufreq}/scaling_cur_freq": cur,
+        f"{cpufreq}/scaling_max_freq": limit,
+        f"{cpufreq}/cpuinfo_max_freq": hw_max,
+    }
+
+
+@pytest.fixture
+def root(tmp_path):
+    write(str(tmp_path), {**cpu(0, 1000000), **cpu(1, 2000000)})
+    write(
+        str(tmp_path),
+        {
+            "thermal/thermal_zone0/type": "acpitz",
+            "thermal/thermal_zone0/temp": 40000,
+            "thermal/thermal_zone1/type": "x86_pkg_temp",
+            "thermal/thermal_zone1/temp": 55000,
+        },
+    )
+    return str(tmp_path)
+
+
+@pytest.fixture
+def sampler(root):
+    reader = SysfsReader()
+    yield ThermalSampler(reader, f"{root}/cpu", f"{root}/thermal")
+    reader.close()
+
+
+def test_frequencies_and_package_temperature(sampler):
+    thermal = sampler.sample()
+    assert (thermal.freq_min, thermal.freq_avg, thermal.freq_max) == (1000, 1500, 2000)
+    assert (thermal.limit, thermal.hw_max) == (3000, 4000)
+    # x86_pkg_temp is preferred over acpitz
+    assert thermal.package == 55
+    assert thermal.zones == (("acpitz", 40), ("x86_pkg_temp", 55))
+
+
+def test_new_cpu_is_found_after_invalidate(sampler, root):
+    sampler.sample()
+    write(root, cpu(2, 3000000))
+    assert sampler.sample().freq_max == 2000
+    sampler.invalidate()
+    assert sampler.sample().freq_max == 3000
+
+
+def test_no_cpufreq(tmp_path):
+    reader = SysfsReader()
+    sampler = ThermalSampler(reader, str(tmp_path / "cpu"), str(tmp_path / "thermal"))
+    thermal = sampler.sample()
+    assert thermal.freq_avg is None
+    assert thermal.package is None
+    assert thermal.zones == ()
+    reader.close()
@@ -0,0 +1,84 @@
+import pytest
+
+from samsung_control.uevent import (
+    FakeUeventSource,
+    UeventListener,
+    format_uevent,
+    parse_uevent,
+)
+
+ADAPTER = "/devices/LNXSYSTM:00/LNXSYBUS:00/ACPI0003:00/power_supply/ADP1"
+
+
+@pytest.fixture
+def source():
+    source = FakeUeventSource()
+    yield source
+    source.close()
+
+
+def test_parse_roundtrip():
+    data = format_uevent("change", ADAPTER, {"SUBSYSTEM": "power_supply"})
+    event = parse_uevent(data)
+    assert event.action == "change"
+    assert event.devpath == ADAPTER
+    assert event.subsystem == "power_supply"
+    assert event.get("DEVPATH") == ADAPTER
+    assert event.get("POWER_SUPPLY_ONLINE", "?") == "?"
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b"",
+        b"libudev\0\xfe\xed\xca\xfe",
+        b"no separator",
+    ],
+)
+def test_parse_rejects_non_kernel_messages(data):
+    assert parse_uevent(data) is None
+
+
+def test_parse_skips_fields_without_value():
+    event = parse_uevent(b"change@/x\0SUBSYSTEM=hwmon\0garbage\0\xff=1\0")
+    assert event.subsystem == "hwmon"
+    assert "garbage" not in event.properties
+    assert event.properties["\ufffd"] == "1"
+
+
+def test_listener_dispatches_by_subsystem(source):
+    listener = UeventListener(source)
+    power, hwmon = [], []
+    listener.connect("power_supply", lambda event, tag: power.append((tag, event)), 1)
+    listener.connect("hwmon", hwmon.append)
+
+    source.emit("change", ADAPTER, SUBSYSTEM="power_supply", POWER_SUPPLY_ONLINE=1)
+    source.emit("add", "/devices/platform/coretemp.0/hwmon/hwmon3", SUBSYSTEM="hwmon")
+    source.emit("add", "/devices/system/cpu/cpu3", SUBSYSTEM="cpu")
+    listener.dispatch()
+
+    assert [(tag, event.get("POWER_SUPPLY_ONLINE")) for tag, event in power] == [
+        (1, "1")
+    ]
+    assert [event.action for event in hwmon] == ["add"]
+    listener.close()
+
+
+def test_listener_survives_malformed_messages_and_failing_handlers(source):
+    listener = UeventListener(source)
+    seen = []
+
+    def broken(event):
+        raise ValueError("broken handler")
+
+    listener.connect("power_supply", broken)
+    listener.connect("power_supply", seen.append)
+    source.peer.send(b"libudev\0garbage")
+    source.peer.send(b"")
+    source.emit("change", ADAPTER, SUBSYSTEM="power_supply")
+    listener.dispatch()
+
+    assert len(seen) == 1
+    listener.dispatch()  # Nothing left, must not block
+    assert len(seen) == 1
+    listener.close()
@@ -0,0 +1,97 @@
+import threading
+import time
+
+import pytest
+
+from samsung_control.writequeue import WriteQueue
+
+
+class Results(list):
+    """Collects callback(key, value, result) and signals each one."""
+
+    def __init__(self):
+        super().__init__()
+        self.arrived = threading.Semaphore(0)
+
+    def __call__(self, key, value, result):
+        self.append((key, value, result))
+        self.arrived.release()
+
+    def wait(self, count=1):
+        for _ in range(count):
+            assert self.arrived.acquire(timeout=5), "no write finished"
+
+
+@pytest.fixture
+def results():
+    return Results()
+
+
+@pytest.fixture
+def queue():
+    queue = WriteQueue(lambda func, *args: func(*args), debounce=0.05, max_wait=0.3)
+    yield queue
+    queue.close()
+
+
+def writer(written, result=True):
+    def write(value):
+        written.append(value)
+        return result
+
+    return write
+
+
+def test_submissions_coalesce(queue, results):
+    written = []
+    for value in range(5):
+        queue.submit("kbd", value, writer(written), callback=results)
+    assert queue.busy("kbd")
+    results.wait()
+    assert written == [4]
+    assert results == [("kbd", 4, True)]
+    assert not queue.busy("kbd")
+
+
+def test_keys_are_written_separately(queue, results):
+    written = []
+    queue.submit("a", 1, writer(written), callback=results)
+    queue.submit("b", 2, writer(written), callback=results, delay=0)
+    results.wait(2)
+    assert written == [2, 1]
+
+
+def test_max_wait_bounds_a_long_drag(queue, results):
+    written = []
+    start = time.monotonic()
+    while not written and time.monotonic() - start < 2:
+        queue.submit("kbd", time.monotonic(), writer(written), callback=results)
+        time.sleep(0.01)
+    results.wait()
+    assert time.monotonic() - start < 1
+
+
+def test_verify_and_failures(queue, results):
+    queue.submit("a", 1, writer([]), verify=lambda value: False, callback=results)
+    queue.submit("b", 2, writer([], "permission_denied"), callback=results)
+    results.wait(2)
+
+    def broken(value):
+        raise OSError("gone")
+
+    queue.submit("c", 3, broken, callback=results)
+    results.wait()
+    assert sorted(results) == [
+        ("a", 1, False),
+        ("b", 2, "permission_denied"),
+        ("c", 3, False),
+    ]
+
+
+def test_close_flushes_pending_writes(results):
+    queue = WriteQueue(lambda func, *args: func(*args), debounce=60)
+    written = []
+    queue.submit("kbd", 1, writer(written), callback=results)
+    queue.close()
+    assert written == [1]
+    assert results == []  # No callbacks while closing